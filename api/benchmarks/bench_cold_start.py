@@ -0,0 +1,158 @@
+"""
+Benchmark: cold start of the function app.
+
+Every sample is a fresh interpreter, like a new Consumption-plan worker:
+- import: `python -X importtime -c "import function_app"`, reporting the
+  module's cumulative import time and the heaviest top-level imports
+- first response: process spawn to the first /api/health and /api/recommend
+  response (the model call goes to a local stand-in, so only the import and
+  client set-up cost shows up)
+
+--ref runs the same measurements on another commit (extracted with
+`git archive`) to compare against.
+
+Usage (from api/):
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --runs 10 --ref HEAD~1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from catalog import episodes_path  # noqa: E402
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in the fresh interpreter: import, then answer one request
+FIRST_RESPONSE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import azure.functions as func
+import function_app
+imported = time.perf_counter()
+if sys.argv[1] == "health":
+    response = function_app.health_check.build().get_user_function()(
+        func.HttpRequest(method="GET", url="/api/health", body=b""))
+else:
+    response = asyncio.run(function_app.recommend_episode.build().get_user_function()(
+        func.HttpRequest(method="POST", url="/api/recommend", body=json.dumps({"mood": "Calm"}).encode())))
+done = time.perf_counter()
+print(json.dumps({"status": response.status_code, "import_ms": (imported - start) * 1000,
+                  "request_ms": (done - imported) * 1000}))
+"""
+
+
+def child_env(openai_url: str) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("PYTHON", "AZURE_OPENAI", "TELEMETRY"))}
+    env.update({
+        "AZURE_OPENAI_ENDPOINT": openai_url,
+        "AZURE_OPENAI_API_KEY": "fake-key",
+        "MOOD_POOL_SIZE": "0",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def import_profile(api_dir: str, env: dict[str, str]) -> tuple[float, list[tuple[str, float]]]:
+    """Cumulative import time of function_app (ms) and its top-level imports."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import function_app"],
+                            cwd=api_dir, env=env, capture_output=True, text=True, check=True)
+    top, total = [], 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip() == "function_app":
+            total = int(cumulative) / 1000
+        elif name.startswith("   ") and not name.startswith("    "):
+            top.append((name.strip(), int(cumulative) / 1000))
+    return total, top
+
+
+def first_response(api_dir: str, env: dict[str, str], endpoint: str) -> dict[str, float]:
+    """Spawn-to-response wall time (ms) of one request in a fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", FIRST_RESPONSE, endpoint],
+                            cwd=api_dir, env=env, capture_output=True, text=True, check=True)
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["wall_ms"] = (time.perf_counter() - start) * 1000
+    return sample
+
+
+def interpreter_start(env: dict[str, str]) -> float:
+    """Wall time (ms) of an interpreter that imports nothing, for reference."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(label: str, api_dir: str, env: dict[str, str], runs: int) -> None:
+    # Warm the OS file cache and byte-compile once, so every run sees the same disk state
+    subprocess.run([sys.executable, "-c", "import function_app"], cwd=api_dir, env={**env, "PYTHONDONTWRITEBYTECODE": ""},
+                   capture_output=True, check=True)
+
+    profiles = [import_profile(api_dir, env) for _ in range(runs)]
+    totals = [total for total, _ in profiles]
+    print(f"\n{label}: import function_app  median {statistics.median(totals):7.1f} ms  "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+    heaviest = sorted(profiles[totals.index(statistics.median_low(totals))][1], key=lambda m: -m[1])[:6]
+    for name, ms in heaviest:
+        print(f"    {name:<28} {ms:7.1f} ms")
+
+    interpreter = statistics.median(interpreter_start(env) for _ in range(runs))
+    print(f"    {'bare interpreter start':<28} {interpreter:7.1f} ms")
+    for endpoint in ("health", "recommend"):
+        samples = [first_response(api_dir, env, endpoint) for _ in range(runs)]
+        if any(s["status"] != 200 for s in samples):
+            print(f"    first /api/{endpoint} response failed: {[s['status'] for s in samples]}")
+            continue
+        print(f"    first /api/{endpoint:<10} spawn-to-response median {statistics.median(s['wall_ms'] for s in samples):7.1f} ms  "
+              f"(import {statistics.median(s['import_ms'] for s in samples):.1f} ms + "
+              f"request {statistics.median(s['request_ms'] for s in samples):.1f} ms)")
+
+
+def extract_ref(ref: str, destination: str) -> str:
+    """Check out api/ (and data/) of a commit into destination; returns its api dir."""
+    repo = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=API_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    archive = os.path.join(destination, "tree.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", archive, ref, "api", "data"], cwd=repo, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(destination)
+    api_dir = os.path.join(destination, "api")
+    # The deployed episodes.json is not in git; use the same catalog for both runs
+    shutil.copy(episodes_path(), os.path.join(api_dir, "episodes.json"))
+    return api_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per measurement")
+    parser.add_argument("--ref", help="Also measure this git commit (e.g. HEAD~1) for comparison")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer() as server:
+        env = child_env(server.url)
+        if args.ref:
+            workdir = tempfile.mkdtemp(prefix="sedna-cold-start-")
+            try:
+                measure(args.ref, extract_ref(args.ref, workdir), env, args.runs)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        measure("working tree", API_DIR, env, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: compiled keyword scorer vs. the original nested-loop scoring.
+
+Scores every event of one "On this day" feed with both implementations,
+checks that the scores are identical and reports the speedup.
+
+Usage (from api/):
+    python benchmarks/bench_keyword_scorer.py                 # synthetic feed
+    python benchmarks/bench_keyword_scorer.py --date 07-20    # recorded feed from the onthisday cache
+    python benchmarks/bench_keyword_scorer.py --feed events.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import synthetic_onthisday_feed  # noqa: E402
+from keyword_scorer import KeywordScorer  # noqa: E402
+from onthisday import OnThisDayCache  # noqa: E402
+
+
+def nested_loop_score(event: dict, keywords: list[str]) -> int:
+    """The original fetch_wikipedia_events scoring."""
+    text = event.get("text", "").lower()
+    pages = event.get("pages", [])
+    score = 0
+    for keyword in keywords:
+        if keyword in text:
+            score += 2
+        for page in pages:
+            if keyword in page.get("description", "").lower():
+                score += 1
+            if keyword in page.get("extract", "").lower():
+                score += 1
+    return score
+
+
+def load_feed(args: argparse.Namespace) -> tuple[str, dict]:
+    if args.feed:
+        with open(args.feed, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Accept a raw payload or an onthisday cache entry
+        return args.feed, data.get("payload", data)
+    if args.date:
+        month, day = (int(part) for part in args.date.split("-"))
+        entry = OnThisDayCache().read("events", month, day)
+        if entry is None:
+            raise SystemExit(f"No cached feed for {args.date}; run `python onthisday.py prefetch` first")
+        return f"cached events/{args.date}", entry["payload"]
+    return "synthetic feed", synthetic_onthisday_feed(args.events)
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feed", help="Path to a recorded events payload")
+    parser.add_argument("--date", help="MM-DD of a feed in the onthisday cache")
+    parser.add_argument("--events", type=int, default=150, help="Events in the synthetic feed")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    label, feed = load_feed(args)
+    events = feed.get("events", [])
+    scorer = KeywordScorer.from_config()
+    keywords = list(scorer.weights)
+    if any(w != 1 for w in scorer.weights.values()):
+        raise SystemExit("Identity check needs all keyword weights at 1 in keywords.json")
+
+    legacy = [nested_loop_score(e, keywords) for e in events]
+    compiled = [scorer.score(e) for e in events]
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+
+    legacy_time = best_of(args.repeat, lambda: [nested_loop_score(e, keywords) for e in events])
+    compiled_time = best_of(args.repeat, lambda: [scorer.score(e) for e in events])
+
+    pages = sum(len(e.get("pages", [])) for e in events)
+    print(f"{label}: {len(events)} events, {pages} pages, {len(keywords)} keywords")
+    print(f"  nested loops   {legacy_time * 1000:8.2f} ms")
+    print(f"  compiled regex {compiled_time * 1000:8.2f} ms   ({legacy_time / compiled_time:.1f}x faster)")
+    print(f"  identical scores: {'yes' if not mismatches else f'NO ({mismatches} differ)'}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: mood prompt size and latency with vs. without local retrieval.
+
+Usage (from api/):
+    python benchmarks/bench_mood_retrieval.py
+    python benchmarks/bench_mood_retrieval.py --sizes 53 1000 5000 --top-k 12
+    python benchmarks/bench_mood_retrieval.py --live   # real Azure OpenAI (MOOD env vars)
+
+Without --live, end-to-end latency is modelled as local prompt-building time
+plus a simulated model latency of base + input-token prefill cost.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic import synthetic_catalog  # noqa: E402
+from function_app import MOOD_SYSTEM_PROMPT, build_mood_user_prompt, select_mood_candidates  # noqa: E402
+from benchmarks.sync_openai import get_openai_client  # noqa: E402
+from retrieval import MOOD_LEXICON, get_retriever  # noqa: E402
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return len(text) // 4
+
+
+def build_prompt(mood, catalog, top_k):
+    start = time.perf_counter()
+    candidates = select_mood_candidates(mood, catalog, set(), top_k=top_k)
+    prompt = MOOD_SYSTEM_PROMPT + build_mood_user_prompt(mood, candidates)
+    return prompt, time.perf_counter() - start
+
+
+def live_latency(prompt_user: str) -> float:
+    client = get_openai_client("MOOD")
+    start = time.perf_counter()
+    client.chat.completions.create(
+        model=os.environ.get("AZURE_OPENAI_MODEL_MOOD", "gpt-5-nano"),
+        messages=[
+            {"role": "system", "content": MOOD_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt_user}
+        ],
+        max_completion_tokens=16384,
+        reasoning_effort="minimal"
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[53, 1000, 5000])
+    parser.add_argument("--top-k", type=int, default=12)
+    parser.add_argument("--base-ms", type=float, default=400.0, help="Simulated fixed model latency")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=120.0, help="Simulated prefill cost")
+    parser.add_argument("--live", action="store_true", help="Call the real Azure OpenAI deployment")
+    args = parser.parse_args()
+
+    print(f"{'episodes':>8} {'mode':>10} {'prompt tok':>11} {'build ms':>9} {'e2e ms':>9}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        index_start = time.perf_counter()
+        get_retriever(catalog)
+        index_ms = (time.perf_counter() - index_start) * 1000
+
+        for mode, top_k in (("full", 0), (f"top-{args.top_k}", args.top_k)):
+            tokens, build, e2e = [], [], []
+            for mood in MOOD_LEXICON:
+                prompt, build_s = build_prompt(mood, catalog, top_k)
+                tokens.append(approx_tokens(prompt))
+                build.append(build_s * 1000)
+                if args.live:
+                    e2e.append(build_s * 1000 + live_latency(prompt[len(MOOD_SYSTEM_PROMPT):]) * 1000)
+                else:
+                    e2e.append(build_s * 1000 + args.base_ms + tokens[-1] / 1000 * args.ms_per_1k_tokens)
+            print(f"{size:>8} {mode:>10} {statistics.mean(tokens):>11.0f} "
+                  f"{statistics.median(build):>9.2f} {statistics.median(e2e):>9.0f}")
+        print(f"{'':>8} {'index build':>10} {index_ms:>20.1f} ms (once per catalog version)")
+
+
+if __name__ == "__main__":
+    main()
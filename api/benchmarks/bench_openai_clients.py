@@ -0,0 +1,81 @@
+"""
+Benchmark: per-call AsyncAzureOpenAI construction vs. the pooled client registry.
+
+Runs sequential chat completions against a local fake endpoint and reports
+latency percentiles for a fresh client per request (the old behaviour) and
+for the warm pooled client from openai_clients.get_async_openai_client.
+
+Usage (from api/):
+    python benchmarks/bench_openai_clients.py
+    python benchmarks/bench_openai_clients.py --requests 200 --tls
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from openai import AsyncAzureOpenAI  # noqa: E402
+
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+import openai_clients  # noqa: E402
+
+
+async def timed_calls(make_client, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client = make_client()
+        await client.chat.completions.create(
+            model="gpt-5-nano",
+            messages=[{"role": "user", "content": "ping"}],
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    q = statistics.quantiles(samples, n=100)
+    print(f"{label:>14}  p50 {q[49]:7.2f} ms   p95 {q[94]:7.2f} ms   mean {statistics.mean(samples):7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated server latency")
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS so handshakes are included")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency_ms / 1000, tls=args.tls) as server:
+        os.environ["AZURE_OPENAI_ENDPOINT_MOOD"] = server.url
+        os.environ["AZURE_OPENAI_API_KEY_MOOD"] = "fake-key"
+        if server.cert_file:
+            os.environ["SSL_CERT_FILE"] = server.cert_file
+
+        def fresh_client():
+            return AsyncAzureOpenAI(
+                api_key="fake-key",
+                api_version=openai_clients.API_VERSION,
+                azure_endpoint=server.url,
+            )
+
+        def pooled_client():
+            return openai_clients.get_async_openai_client("MOOD")
+
+        async def run() -> None:
+            # Warm the pool so only steady-state requests are measured
+            await timed_calls(pooled_client, 3)
+
+            print(f"{args.requests} sequential requests against {server.url} (http2={openai_clients.HTTP2})")
+            report("fresh client", await timed_calls(fresh_client, args.requests))
+            report("pooled client", await timed_calls(pooled_client, args.requests))
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
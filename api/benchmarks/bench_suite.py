@@ -0,0 +1,358 @@
+"""
+Benchmark suite: the main api/ paths against local stand-ins for Azure OpenAI,
+Wikipedia and GitHub.
+
+For each synthetic catalog size it runs recommend_episode, recommend_playlist
+(PLAYLIST_LENGTH episodes along a two-mood arc) and get_daily_match (single
+fact and 24-hour batch); fetch_wikipedia_events (cold and cached),
+commit_to_github and hourly_fact_publisher don't depend on the catalog and
+run once. Each path reports latency percentiles, throughput and prompt tokens
+per model call. Latency and failure rates of every fake service can be set,
+to see how retries, fallbacks and deadlines behave under load.
+
+--save writes the results as JSON; --baseline compares p95 latencies and
+prompt tokens against such a file and exits non-zero on a regression.
+
+Usage (from api/):
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 100 1000 --iterations 50 --openai-latency-ms 800
+    python benchmarks/bench_suite.py --openai-failure-rate 0.1 --wikipedia-failure-rate 0.2 --github-failure-rate 0.05
+    python benchmarks/bench_suite.py --save before.json
+    python benchmarks/bench_suite.py --baseline before.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_github import FakeGitHubServer  # noqa: E402
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from benchmarks.fake_wikipedia import FakeWikipediaServer  # noqa: E402
+from benchmarks.synthetic import install_catalog, synthetic_catalog  # noqa: E402
+from prompt_encoder import count_tokens, preload_encoding  # noqa: E402
+
+SIZES = [100, 1000, 10000]
+
+_COUNT_RE = re.compile(r"containing exactly (\d+) objects")
+_EPISODE_ID_RE = re.compile(r'"i(?:d)?":\s*(\d+)')
+_SHORTLIST_RE = re.compile(r"Choose from these episode IDs only: ([\d, ]+)")
+_SNIPPET_ID_RE = re.compile(r"^ID: (\d+)$", re.MULTILINE)
+_URL_RE = re.compile(r'"(https://en\.wikipedia\.org/wiki/[^"]+)"')
+_PLAYLIST_RE = re.compile(r"Build a playlist of (\d+) DIFFERENT episodes")
+
+# Episodes per recommend_playlist call
+PLAYLIST_LENGTH = 5
+
+
+def fake_reply(body: dict) -> str:
+    """Answer mood and daily-match prompts with well-formed picks from the prompt itself.
+
+    Lists are wrapped in an object when the request sends a JSON schema, as
+    structured outputs require an object root.
+    """
+    system, user = (m.get("content") or "" for m in body["messages"][:2])
+    structured = "response_format" in body
+
+    if "listener is feeling" in user:
+        shortlist = _SHORTLIST_RE.search(user)
+        ids = shortlist.group(1).split(", ") if shortlist else _SNIPPET_ID_RE.findall(user)
+        playlist = _PLAYLIST_RE.search(user) or _PLAYLIST_RE.search(system)
+        if playlist:
+            picks = [{"episode_id": int(i), "reason": "Fits the arc."} for i in ids[:int(playlist.group(1))]]
+            return json.dumps({"recommendations": picks} if structured else picks)
+        return json.dumps({"episode_id": int(ids[0]), "reason": "Matches the mood."})
+
+    ids = [int(i) for i in _EPISODE_ID_RE.findall(user)] or [1]
+    urls = _URL_RE.findall(user) or ["https://en.wikipedia.org/wiki/Sedna"]
+    count = _COUNT_RE.search(system)
+    matches = [{
+        "hour": hour,
+        "fact_text": f"Synthetic fact number {hour} about {urls[hour % len(urls)].rsplit('/', 1)[-1]}.",
+        "fact_year": 1900 + hour,
+        "fact_wikipedia_url": urls[hour % len(urls)],
+        "episode": {"id": ids[hour % len(ids)], "title": "Synthetic"},
+        "match_reason": "It fits the vibe.",
+    } for hour in range(int(count.group(1)) if count else 1)]
+    if not count:
+        return json.dumps(matches[0])
+    return json.dumps({"matches": matches} if structured else matches)
+
+
+@dataclass
+class PathResult:
+    path: str
+    catalog: int | None
+    calls: int
+    errors: int
+    elapsed: float
+    latencies_ms: list[float] = field(repr=False)
+    prompt_tokens: list[int] = field(repr=False)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    @property
+    def key(self) -> str:
+        return f"{self.path}@{self.catalog or '-'}"
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "catalog": self.catalog,
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "throughput": round(self.calls / self.elapsed, 2) if self.elapsed else 0.0,
+            "model_calls": len(self.prompt_tokens),
+            "prompt_tokens_mean": round(sum(self.prompt_tokens) / len(self.prompt_tokens)) if self.prompt_tokens else 0,
+            "prompt_tokens_max": max(self.prompt_tokens, default=0),
+        }
+
+
+async def measure(path: str, catalog: int | None, call: Callable[[], Awaitable[bool]], iterations: int,
+                  concurrency: int, openai: FakeOpenAIServer,
+                  setup: Callable[[], None] | None = None) -> PathResult:
+    """Run `call` `iterations` times, at most `concurrency` at once.
+
+    `call` returns False (or raises) for a failed request. `setup` runs
+    before every call, outside the timed section.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    tokens_before = len(openai.prompt_tokens)
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            if setup:
+                setup()
+            start = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"{path} failed: {e}")
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    elapsed = time.perf_counter() - start
+    return PathResult(path, catalog, iterations, errors, elapsed, latencies, openai.prompt_tokens[tokens_before:])
+
+
+class Timer:
+    past_due = False
+
+
+async def run_suite(args: argparse.Namespace, openai: FakeOpenAIServer, wikipedia: FakeWikipediaServer,
+                    github: FakeGitHubServer) -> list[PathResult]:
+    # Imported late: module-level settings are read from the environment set up in main()
+    import azure.functions as func
+    import function_app
+    import onthisday
+    from schedule import build_schedule
+    from state_store import get_state_store
+
+    logging.getLogger().setLevel(logging.ERROR if not args.verbose else logging.INFO)
+    function_app.mood_pools.size = 0  # measure the live model path
+    function_app.HOURLY_PUBLISHER_ENABLED = True
+
+    recommend = function_app.recommend_episode.build().get_user_function()
+    playlist = function_app.recommend_playlist.build().get_user_function()
+    hourly = function_app.hourly_fact_publisher.build().get_user_function()
+    moods = function_app.VALID_MOODS
+    now = datetime.now(timezone.utc)
+    results = []
+
+    def report(result: PathResult) -> None:
+        results.append(result)
+        s = result.summary()
+        print(f"{result.path:>20} {s['catalog'] or '-':>7} {s['calls']:>5} {s['errors']:>4} "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['throughput']:>8.1f} "
+              f"{s['prompt_tokens_mean']:>9} {s['prompt_tokens_max']:>9}")
+
+    print(f"{'path':>20} {'catalog':>7} {'calls':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'calls/s':>8} {'tok mean':>9} {'tok max':>9}")
+
+    # Wikipedia: every call a different date (cold cache), then one date over and over (cached)
+    dates = onthisday.all_dates()
+    cold = iter(dates)
+    report(await measure(
+        "wikipedia_cold", None, lambda: fetch_events(function_app, *next(cold)),
+        min(args.iterations, len(dates)), args.concurrency, openai))
+    await fetch_events(function_app, now.month, now.day)
+    report(await measure(
+        "wikipedia_cached", None, lambda: fetch_events(function_app, now.month, now.day),
+        args.iterations, args.concurrency, openai))
+    events = await function_app.fetch_wikipedia_events(now.month, now.day)
+
+    batch = None
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        install_catalog(catalog)
+        # Warm-up: retrieval index and prompt catalog are built once per catalog version
+        await recommend(mood_request(func, moods[0]))
+
+        async def recommend_call(i=iter(range(10 ** 9))) -> bool:
+            response = await recommend(mood_request(func, moods[next(i) % len(moods)]))
+            return response.status_code == 200 and json.loads(response.get_body())["engine"] == "llm"
+
+        async def playlist_call(i=iter(range(10 ** 9))) -> bool:
+            n = next(i)
+            arc = [moods[n % len(moods)], moods[(n + 1) % len(moods)]]
+            response = await playlist(playlist_request(func, arc, PLAYLIST_LENGTH))
+            result = json.loads(response.get_body())
+            return response.status_code == 200 and result["engine"] == "llm" and len(result["playlist"]) == PLAYLIST_LENGTH
+
+        async def single_call() -> bool:
+            return bool((await function_app.get_daily_match(events, catalog.episodes, count=1)).get("fact_text"))
+
+        async def batch_call() -> bool:
+            nonlocal batch
+            batch = await function_app.get_daily_match(events, catalog.episodes, count=24)
+            return len(batch) == 24
+
+        report(await measure("recommend", size, recommend_call, args.iterations, args.concurrency, openai))
+        report(await measure("playlist", size, playlist_call, args.iterations, args.concurrency, openai))
+        report(await measure("daily_single", size, single_call, args.batch_iterations, args.concurrency, openai))
+        report(await measure("daily_batch", size, batch_call, args.batch_iterations, 1, openai))
+
+    # GitHub writes go to one file, so they run one at a time like the timers do
+    schedule = build_schedule(batch or [], now.strftime("%Y-%m-%d"))
+
+    async def commit_call() -> bool:
+        return await asyncio.to_thread(function_app.commit_to_github, dict(schedule), schedule["date"])
+
+    report(await measure("commit_to_github", None, commit_call, args.batch_iterations, 1, openai))
+
+    # The publisher pops from a legacy queue; reset it before every run
+    legacy = {"date": schedule["date"], "current_hour": None, "current_fact": None,
+              "queue": [function_app.hydrate_episodes(dict(f), catalog.episodes) for f in batch or []], "published": []}
+
+    async def hourly_call() -> bool:
+        round_trips = len(github.requests)
+        await hourly(Timer())
+        return len(github.requests) > round_trips
+
+    if now.hour == 0:
+        print(f"{'hourly_publisher':>20} skipped: the publisher leaves hour 0 to the midnight job")
+    else:
+        report(await measure(
+            "hourly_publisher", None, hourly_call, args.batch_iterations, 1, openai,
+            setup=lambda: get_state_store().replace(function_app.SCHEDULE_STATE_KEY, legacy)))
+
+    return results
+
+
+async def fetch_events(function_app, month: int, day: int) -> bool:
+    return bool(await function_app.fetch_wikipedia_events(month, day))
+
+
+def mood_request(func, mood: str):
+    return func.HttpRequest(method="POST", url="/api/recommend", body=json.dumps({"mood": mood}).encode())
+
+
+def playlist_request(func, moods: list[str], length: int):
+    return func.HttpRequest(method="POST", url="/api/recommend/playlist",
+                            body=json.dumps({"moods": moods, "length": length}).encode())
+
+
+def compare(results: list[PathResult], baseline_file: str, tolerance: float) -> bool:
+    """Print regressions against a saved run; True when there are none."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {f"{r['path']}@{r['catalog'] or '-'}": r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nAgainst {baseline_file} (tolerance {tolerance:.0%}):")
+    for result in results:
+        old = baseline.get(result.key)
+        if old is None:
+            continue
+        new = result.summary()
+        for metric, slack in (("p95_ms", 1.0), ("prompt_tokens_mean", 0)):
+            if new[metric] > old[metric] * (1 + tolerance) + slack:
+                ok = False
+                print(f"  REGRESSION {result.key} {metric}: {old[metric]} -> {new[metric]}")
+    if ok:
+        print("  no regressions")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Synthetic catalog sizes")
+    parser.add_argument("--iterations", type=int, default=40, help="Calls per path (recommend, Wikipedia)")
+    parser.add_argument("--batch-iterations", type=int, default=5, help="Calls per path (daily match, GitHub)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument("--openai-failure-rate", type=float, default=0.0)
+    parser.add_argument("--wikipedia-latency-ms", type=float, default=50.0)
+    parser.add_argument("--wikipedia-failure-rate", type=float, default=0.0)
+    parser.add_argument("--github-latency-ms", type=float, default=50.0)
+    parser.add_argument("--github-failure-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="Keep the functions' info logs")
+    args = parser.parse_args()
+    # Exact token counts from the first request on, as on a deployed host
+    preload_encoding(wait=True)
+
+    workdir = tempfile.mkdtemp(prefix="sedna-bench-")
+    try:
+        with FakeOpenAIServer(latency=args.openai_latency_ms / 1000, reply=fake_reply,
+                              failure_rate=args.openai_failure_rate, count_tokens=count_tokens) as openai, \
+                FakeWikipediaServer(latency=args.wikipedia_latency_ms / 1000,
+                                    failure_rate=args.wikipedia_failure_rate) as wikipedia, \
+                FakeGitHubServer(latency=args.github_latency_ms / 1000, failure_rate=args.github_failure_rate) as github:
+            os.environ.update({
+                "AZURE_OPENAI_ENDPOINT": openai.url,
+                "AZURE_OPENAI_API_KEY": "fake-key",
+                "AZURE_OPENAI_ENDPOINT_MOOD": openai.url,
+                "AZURE_OPENAI_API_KEY_MOOD": "fake-key",
+                "AZURE_OPENAI_ENDPOINT_DAILY": openai.url,
+                "AZURE_OPENAI_API_KEY_DAILY": "fake-key",
+                "WIKIPEDIA_API_BASE": wikipedia.url,
+                "WIKIPEDIA_CACHE_DIR": os.path.join(workdir, "onthisday"),
+                "GITHUB_TOKEN": "fake-token",
+                "GITHUB_API_URL": github.url,
+                "SCHEDULE_STATE_BACKEND": "file",
+                "SCHEDULE_STATE_DIR": os.path.join(workdir, "state"),
+            })
+            print(f"Fakes: OpenAI {args.openai_latency_ms:.0f} ms/{args.openai_failure_rate:.0%} failures, "
+                  f"Wikipedia {args.wikipedia_latency_ms:.0f} ms/{args.wikipedia_failure_rate:.0%}, "
+                  f"GitHub {args.github_latency_ms:.0f} ms/{args.github_failure_rate:.0%}")
+            results = asyncio.run(run_suite(args, openai, wikipedia, github))
+            print(f"\nUpstream requests: OpenAI {openai.requests} ({openai.failures} failed), "
+                  f"Wikipedia {len(wikipedia.requests)}, GitHub {len(github.requests)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": [r.summary() for r in results]}, f, indent=2)
+        print(f"Saved results to {args.save}")
+    if args.baseline and not compare(results, args.baseline, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
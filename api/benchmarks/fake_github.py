@@ -0,0 +1,162 @@
+"""
+Local stand-in for the GitHub contents API.
+
+Serves GET/PUT /repos/<owner>/<repo>/contents/<path> from memory with blob
+shas, ETags (304 on If-None-Match), sha conflict checks and rate-limit
+headers, injects 502s on request, and counts requests, so the GitHub
+persistence layer can be exercised offline.
+"""
+
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def blob_sha(content: bytes) -> str:
+    """Git blob sha of a file's content, as GitHub reports it."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHubServer:
+    """Threaded fake GitHub contents API running in the background.
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        rate_limit: Requests allowed before 403s with X-RateLimit-Remaining: 0
+        rate_limit_reset: Seconds until the rate limit window resets
+        failure_rate: Fraction of requests answered with 502 Bad Gateway
+        seed: Seed for the failure injection
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit: int = 5000, rate_limit_reset: float = 1.0,
+                 failure_rate: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_reset = rate_limit_reset
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str, int]] = []
+        self._used = 0
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _path(self) -> str | None:
+                parts = urlsplit(self.path).path.split("/contents/", 1)
+                return parts[1] if len(parts) == 2 else None
+
+            def _send(self, status: int, body: dict | None = None, headers: dict | None = None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                for name, value in server._rate_headers().items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                server.requests.append((self.command, self.path, status))
+
+            def _limited(self) -> bool:
+                if server.latency:
+                    time.sleep(server.latency)
+                if not server._consume():
+                    self._send(403, {"message": "API rate limit exceeded"})
+                    return True
+                with server._lock:
+                    failed = server._random.random() < server.failure_rate
+                if failed:
+                    self._send(502, {"message": "Server Error"})
+                    return True
+                return False
+
+            def do_GET(self):
+                if self._limited():
+                    return
+                path = self._path()
+                content = server.files.get(path)
+                if content is None:
+                    return self._send(404, {"message": "Not Found"})
+                sha = blob_sha(content)
+                etag = f'"{sha}"'
+                # Conditional hits are free on the real API too
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, headers={"ETag": etag})
+                self._send(200, {
+                    "type": "file",
+                    "path": path,
+                    "sha": sha,
+                    "encoding": "base64",
+                    "content": base64.encodebytes(content).decode("ascii"),
+                }, {"ETag": etag})
+
+            def do_PUT(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self._limited():
+                    return
+                path = self._path()
+                existing = server.files.get(path)
+                if existing is not None and "sha" not in body:
+                    return self._send(422, {"message": "\"sha\" wasn't supplied."})
+                if existing is not None and body["sha"] != blob_sha(existing):
+                    return self._send(409, {"message": f"{path} does not match {body['sha']}"})
+                content = base64.b64decode(body["content"])
+                server.files[path] = content
+                self._send(201 if existing is None else 200, {
+                    "content": {"path": path, "sha": blob_sha(content)},
+                    "commit": {"message": body.get("message")},
+                })
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _consume(self) -> bool:
+        with self._lock:
+            if time.time() - self._window_start >= self.rate_limit_reset:
+                self._window_start, self._used = time.time(), 0
+            if self._used >= self.rate_limit:
+                return False
+            self._used += 1
+            return True
+
+    def _rate_headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - self._used)),
+            "X-RateLimit-Reset": str(int(self._window_start + self.rate_limit_reset + 0.999)),
+        }
+
+    def put_file(self, path: str, data) -> None:
+        """Seed or change a file behind the client's back."""
+        self.files[path] = json.dumps(data, indent=2).encode()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FakeGitHubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the Azure OpenAI chat completions endpoint.
+
+Serves POST /openai/deployments/<model>/chat/completions over HTTP/1.1
+keep-alive (optionally TLS with a throwaway self-signed certificate), with
+configurable latency, failure injection and streamed (SSE) responses, so
+client-side overheads can be measured offline. Prompt tokens are counted per
+request and reported back in `usage`.
+"""
+
+import json
+import os
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def default_reply(body: dict) -> str:
+    return json.dumps({"episode_id": 1, "reason": "A fake recommendation."})
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class FakeOpenAIServer:
+    """Threaded fake chat-completions server running in the background.
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        reply: Callable producing the assistant message content from the request body
+        tls: Serve HTTPS with a self-signed certificate (needs the openssl CLI)
+        chunk_size: Characters per streamed delta (for stream=True requests)
+        chunk_delay: Seconds between streamed deltas
+        cut_stream_at: Drop the connection after this many streamed characters
+        failure_rate: Fraction of requests answered with failure_status instead
+        failure_status: HTTP status of injected failures (500, 429, ...)
+        count_tokens: Token counter applied to each request's messages
+        seed: Seed for the failure injection
+    """
+
+    def __init__(self, latency: float = 0.0, reply: Callable[[dict], str] = default_reply, tls: bool = False,
+                 chunk_size: int = 64, chunk_delay: float = 0.0, cut_stream_at: int | None = None,
+                 failure_rate: float = 0.0, failure_status: int = 500,
+                 count_tokens: Callable[[str], int] = estimate_tokens, seed: int = 42):
+        self.latency = latency
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.cut_stream_at = cut_stream_at
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.count_tokens = count_tokens
+        self.requests = 0
+        self.failures = 0
+        self.prompt_tokens: list[int] = []
+        self.cert_file = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    failed = server._random.random() < server.failure_rate
+                    server.failures += failed
+                if server.latency:
+                    time.sleep(server.latency)
+                if failed:
+                    return self._fail()
+                prompt_tokens = sum(server.count_tokens(m.get("content") or "") for m in body.get("messages", []))
+                server.prompt_tokens.append(prompt_tokens)
+                if body.get("stream"):
+                    return self._stream(body, prompt_tokens)
+                content = server.reply(body)
+                completion_tokens = server.count_tokens(content)
+                payload = json.dumps({
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _fail(self):
+                payload = json.dumps({"error": {"code": str(server.failure_status), "message": "Injected failure"}}).encode()
+                self.send_response(server.failure_status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                # Keep the client from backing off for long on injected 429s
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body, prompt_tokens: int):
+                """Send the reply as server-sent chat.completion.chunk events."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                content = server.reply(body)
+                if server.cut_stream_at is not None:
+                    content = content[:server.cut_stream_at]
+                base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", "fake")}
+                for i in range(0, len(content), server.chunk_size):
+                    delta = {"index": 0, "delta": {"content": content[i:i + server.chunk_size]}, "finish_reason": None}
+                    self.wfile.write(f"data: {json.dumps({**base, 'choices': [delta]})}\n\n".encode())
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                if server.cut_stream_at is not None:
+                    return
+                completion_tokens = server.count_tokens(content)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                self.wfile.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _Server(("127.0.0.1", 0), Handler)
+        if tls:
+            self.cert_file = self._self_signed_cert()
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(self.cert_file)
+            self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+        self.scheme = "https" if tls else "http"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @staticmethod
+    def _self_signed_cert() -> str:
+        path = os.path.join(tempfile.mkdtemp(), "fake-openai.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+             "-keyout", path, "-out", path],
+            check=True, capture_output=True,
+        )
+        return path
+
+    @property
+    def url(self) -> str:
+        return f"{self.scheme}://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,114 @@
+"""
+Local stand-in for Wikipedia's "On this day" feed API.
+
+Serves GET /feed/onthisday/<feed>/<MM>/<DD> with synthetic payloads of
+realistic size, ETags (304 on If-None-Match), configurable latency and
+failure injection, and counts requests, so the feed fetch and cache can be
+exercised offline.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import synthetic_onthisday_feed
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+# Entries per feed, roughly as large as the real ones
+FEED_SIZES = {"events": 150, "births": 200, "deaths": 120, "selected": 20, "holidays": 15}
+
+
+class FakeWikipediaServer:
+    """Threaded fake "On this day" API running in the background.
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        failure_rate: Fraction of requests answered with failure_status instead
+        failure_status: HTTP status of injected failures (503, 429, ...)
+        seed: Seed for payloads and failure injection
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, failure_status: int = 503, seed: int = 42):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.seed = seed
+        self.requests: list[tuple[str, int]] = []
+        self._payloads: dict[str, bytes] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _send(self, status: int, payload: bytes = b"", headers: dict | None = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.requests.append((self.path, status))
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                with server._lock:
+                    failed = server._random.random() < server.failure_rate
+                if failed:
+                    return self._send(server.failure_status, b'{"title":"Injected failure"}', {"Retry-After": "0"})
+
+                parts = urlsplit(self.path).path.strip("/").split("/")
+                if len(parts) < 5 or parts[-5:-3] != ["feed", "onthisday"] or parts[-3] not in FEED_SIZES:
+                    return self._send(404, b'{"title":"Not found."}')
+                feed, month, day = parts[-3:]
+
+                payload = server.payload(feed, int(month), int(day))
+                etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, headers={"ETag": etag})
+                self._send(200, payload, {"ETag": etag})
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def payload(self, feed: str, month: int, day: int) -> bytes:
+        """The (stable) response body for one feed and date."""
+        key = f"{feed}/{month:02d}/{day:02d}"
+        with self._lock:
+            cached = self._payloads.get(key)
+        if cached is None:
+            seed = self.seed + month * 100 + day + list(FEED_SIZES).index(feed) * 10000
+            entries = synthetic_onthisday_feed(FEED_SIZES[feed], seed=seed)["events"]
+            cached = json.dumps({feed: entries}).encode()
+            with self._lock:
+                self._payloads[key] = cached
+        return cached
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FakeWikipediaServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,103 @@
+"""
+Load test: blocking vs. async /api/recommend against a local stand-in LLM.
+
+The blocking baseline runs the same prompt through the sync pooled client on
+a fixed thread pool (like a Functions worker with PYTHON_THREADPOOL_THREAD_COUNT
+threads); the async run fires every request at once through the real
+recommend_episode handler on a single event loop.
+
+Usage (from api/):
+    python benchmarks/load_recommend.py
+    python benchmarks/load_recommend.py --requests 200 --latency-ms 800 --threads 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import azure.functions as func  # noqa: E402
+
+from benchmarks.fake_openai import FakeOpenAIServer  # noqa: E402
+from catalog import get_catalog  # noqa: E402
+import function_app  # noqa: E402
+from benchmarks.sync_openai import get_openai_client  # noqa: E402
+
+MOODS = function_app.VALID_MOODS
+
+
+def blocking_recommend(mood: str) -> None:
+    """The pre-async request path: one blocking model call per worker thread."""
+    catalog = get_catalog()
+    candidates = function_app.select_mood_candidates(mood, catalog, set())
+    get_openai_client("MOOD", max_retries=0).chat.completions.create(
+        model="gpt-5-nano",
+        messages=[
+            {"role": "system", "content": function_app.MOOD_SYSTEM_PROMPT},
+            {"role": "user", "content": function_app.build_mood_user_prompt(mood, candidates)}
+        ],
+    )
+
+
+def run_blocking(n: int, threads: int) -> tuple[float, list[float]]:
+    def one(i):
+        start = time.perf_counter()
+        blocking_recommend(MOODS[i % len(MOODS)])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(n)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(n: int) -> tuple[float, list[float]]:
+    handler = function_app.recommend_episode.build().get_user_function()
+    # Measure the live LLM path only
+    function_app.mood_pools.size = 0
+
+    async def one(i):
+        req = func.HttpRequest(
+            method="POST",
+            url="/api/recommend",
+            body=json.dumps({"mood": MOODS[i % len(MOODS)]}).encode(),
+        )
+        start = time.perf_counter()
+        response = await handler(req)
+        assert json.loads(response.get_body())["engine"] == "llm"
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n)))
+    return time.perf_counter() - start, list(latencies)
+
+
+def report(label: str, n: int, elapsed: float, latencies: list[float]) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    print(f"{label:>22}  {n / elapsed:8.1f} req/s   p50 {q[49] * 1000:7.0f} ms   p95 {q[94] * 1000:7.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Simulated LLM round trip")
+    parser.add_argument("--threads", type=int, default=4, help="Worker threads for the blocking baseline")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency_ms / 1000) as server:
+        os.environ["AZURE_OPENAI_ENDPOINT_MOOD"] = server.url
+        os.environ["AZURE_OPENAI_API_KEY_MOOD"] = "fake-key"
+
+        print(f"{args.requests} concurrent mood requests, {args.latency_ms:.0f} ms stand-in LLM")
+        report(f"blocking ({args.threads} threads)", args.requests, *run_blocking(args.requests, args.threads))
+        report("async (1 event loop)", args.requests, *asyncio.run(run_async(args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Contention check: several processes popping one schedule queue through a state store.
+
+Each worker process repeatedly pops the next queued fact with
+StateStore.update() until the queue is empty. Every fact must be popped
+exactly once; the run reports throughput and how often a compare-and-swap
+had to be retried.
+
+Usage (from api/):
+    python benchmarks/state_store_contention.py
+    python benchmarks/state_store_contention.py --backends file sqlite --workers 8 --facts 200
+    python benchmarks/state_store_contention.py --backends blob --connection-string "UseDevelopmentStorage=true"   # Azurite
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from schedule import publish_next_fact  # noqa: E402
+from state_store import BlobStateStore, FileStateStore, SQLiteStateStore, StateStore  # noqa: E402
+
+KEY = "contention-test"
+
+
+def make_store(backend: str, location: str) -> StateStore:
+    if backend == "file":
+        return FileStateStore(location)
+    if backend == "sqlite":
+        return SQLiteStateStore(os.path.join(location, "state.db"))
+    return BlobStateStore(location, container="sedna-contention")
+
+
+def worker(backend: str, location: str, results) -> None:
+    store = make_store(backend, location)
+    popped, attempts = [], 0
+
+    def pop(state):
+        nonlocal attempts
+        attempts += 1
+        return publish_next_fact(state, hour=0, once_per_hour=False)
+
+    while True:
+        state, written = store.update(KEY, pop, retries=1000)
+        if not written:
+            break
+        popped.append(state["current_fact"]["id"])
+    results.put((popped, attempts))
+
+
+def run(backend: str, location: str, workers: int, facts: int) -> None:
+    store = make_store(backend, location)
+    store.replace(KEY, {"date": "2026-01-01", "current_hour": None, "current_fact": None,
+                        "queue": [{"id": i} for i in range(facts)], "published": []})
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(backend, location, results)) for _ in range(workers)]
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+    outcomes = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    popped = [fact_id for ids, _ in outcomes for fact_id in ids]
+    attempts = sum(a for _, a in outcomes)
+    ok = sorted(popped) == list(range(facts))
+    print(f"{backend:>7}: {len(popped)} pops by {workers} processes in {elapsed:.2f}s "
+          f"({len(popped) / elapsed:.0f} pops/s, {attempts - len(popped) - workers} CAS retries) "
+          f"- {'each fact exactly once' if ok else 'DUPLICATES OR LOSSES'}")
+    if not ok:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["file", "sqlite"], choices=["file", "sqlite", "blob"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--facts", type=int, default=100)
+    parser.add_argument("--connection-string", default="UseDevelopmentStorage=true", help="Blob backend (Azurite by default)")
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        location = args.connection_string if backend == "blob" else tempfile.mkdtemp()
+        run(backend, location, args.workers, args.facts)
+
+
+if __name__ == "__main__":
+    main()
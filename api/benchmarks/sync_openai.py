@@ -0,0 +1,43 @@
+"""
+Blocking pooled AzureOpenAI client for benchmark baselines.
+
+The function app only uses the async clients from openai_clients; this is
+the pre-async request path (one blocking call per worker thread), kept so
+load_recommend.py and bench_mood_retrieval.py --live can compare against it.
+"""
+
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import openai_clients  # noqa: E402
+
+if TYPE_CHECKING:
+    from openai import AzureOpenAI
+
+_lock = threading.Lock()
+_clients: dict[tuple, "AzureOpenAI"] = {}
+
+
+def get_openai_client(feature: str, max_retries: int = 2) -> "AzureOpenAI":
+    """Return the pooled blocking client for a feature, keyed like the async registry."""
+    import httpx
+    from openai import AzureOpenAI
+
+    endpoint, api_key = openai_clients.openai_settings(feature)
+    key = (endpoint, api_key, openai_clients.API_VERSION, max_retries)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = AzureOpenAI(
+                api_key=api_key,
+                api_version=openai_clients.API_VERSION,
+                azure_endpoint=endpoint,
+                max_retries=max_retries,
+                http_client=httpx.Client(**openai_clients._pool_options()),
+            )
+            _clients[key] = client
+        return client
@@ -0,0 +1,88 @@
+"""
+Synthetic episode catalogs for benchmarks.
+
+Episodes are cloned from the real catalog with fresh ids and shuffled
+description sentences, so text statistics stay realistic at any size.
+"""
+
+import os
+import random
+import sys
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import catalog as catalog_cache  # noqa: E402
+from catalog import EpisodeCatalog, get_catalog  # noqa: E402
+
+
+def synthetic_episodes(size: int, seed: int = 42) -> list[dict[str, Any]]:
+    """Return `size` realistic episodes derived from the real catalog."""
+    rng = random.Random(seed)
+    base = get_catalog().episodes
+    episodes = []
+    for i in range(size):
+        src = base[i % len(base)]
+        sentences = src["description"].split(". ")
+        rng.shuffle(sentences)
+        episodes.append({
+            **src,
+            "id": i + 1,
+            "title": f"{src['title']} (variant {i // len(base)})",
+            "description": ". ".join(sentences),
+            "songs": rng.sample(src.get("songs", []), k=len(src.get("songs", []))),
+        })
+    return episodes
+
+
+def synthetic_catalog(size: int, seed: int = 42) -> EpisodeCatalog:
+    """Return an EpisodeCatalog of `size` synthetic episodes."""
+    return EpisodeCatalog(synthetic_episodes(size, seed), version=f"synthetic-{size}-{seed}")
+
+
+def install_catalog(catalog: EpisodeCatalog) -> None:
+    """Serve `catalog` from get_catalog()/get_catalog_async() instead of episodes.json."""
+    with catalog_cache._lock:
+        catalog_cache._catalog = catalog
+        # Never due for a change check, so the file is left alone
+        catalog_cache._checked_at = float("inf")
+
+
+_FEED_WORDS = (
+    "the a of in and was were is by for to on at from with as during after first "
+    "new city king queen war treaty signed opened founded released launched born "
+    "died elected army battle church university railway bridge company empire "
+    "republic president parliament ship island river mountain century government "
+    "national state capital law court election prime minister general troops "
+    "independence declared united kingdom france germany russia china japan "
+    "american british french spanish emperor dynasty revolution province "
+    "known became largest history later built museum station building members"
+).split()
+# Roughly one word in twenty is a scoring keyword, as in real feeds
+_FEED_KEYWORDS = (
+    "album song band orchestra radio film moon rocket satellite telescope star "
+    "earthquake volcano ocean storm species rainforest expedition explorer nobel atom"
+).split()
+
+
+def synthetic_onthisday_feed(n_events: int = 150, seed: int = 42) -> dict[str, Any]:
+    """Return a Wikipedia "On this day" events payload with realistic field sizes."""
+    rng = random.Random(seed)
+
+    def sentence(n):
+        words = (rng.choice(_FEED_KEYWORDS if rng.random() < 0.05 else _FEED_WORDS) for _ in range(n))
+        return " ".join(words).capitalize() + "."
+
+    events = []
+    for i in range(n_events):
+        pages = []
+        for j in range(rng.randint(1, 5)):
+            title = f"{sentence(3)[:-1]} {i}-{j}"
+            pages.append({
+                "title": title,
+                "description": sentence(rng.randint(3, 10)),
+                "extract": " ".join(sentence(rng.randint(8, 25)) for _ in range(rng.randint(2, 6))),
+                "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}},
+            })
+        events.append({"text": sentence(rng.randint(8, 30)), "year": rng.randint(1000, 2024), "pages": pages})
+    return {"events": events}
@@ -0,0 +1,272 @@
+"""
+Sedna FM Episode Catalog
+- Process-wide, warm copy of the catalog shared by all functions
+- Loaded from the compiled episodes.msgpack artifact when deployed (see
+  catalog_compiler.py), from episodes.json otherwise
+- Reloaded only when the file's mtime or content hash changes
+- Prebuilt lookup maps by id, series, genre and artist, and prompt snippets
+- Session exclusions resolved as bit operations on a played-episodes token
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from functools import cached_property
+from typing import Any
+
+from prompt_encoder import count_tokens
+from session_token import SessionToken
+
+logger = logging.getLogger(__name__)
+
+
+# Series are derived from the SoundCloud URL, mirroring the channel rules
+# in scripts/modules/channels.js (Sedna FM is "everything else").
+SERIES_PATTERNS = {
+    "Morning Drops": "/morning-drops",
+    "Evening Flows": "/evening-flows",
+    "On The Go": "/on-the-go",
+}
+DEFAULT_SERIES = "Sedna FM"
+SERIES = ("Sedna FM", "Morning Drops", "Evening Flows", "On The Go")
+
+# How often (seconds) the hot path is allowed to stat the file for changes
+CHECK_INTERVAL = float(os.environ.get("CATALOG_CHECK_INTERVAL", "30"))
+
+# Compiled catalog written by catalog_compiler.py during deployment
+ARTIFACT_NAME = "episodes.msgpack"
+ARTIFACT_FORMAT = 1
+
+
+def episodes_path() -> str:
+    """Resolve the episodes.json path (deployed copy first, then data folder)."""
+    path = os.path.join(os.path.dirname(__file__), "episodes.json")
+
+    # Fallback to data folder path
+    if not os.path.exists(path):
+        path = os.path.join(os.path.dirname(__file__), "..", "data", "episodes.json")
+    return path
+
+
+def catalog_path() -> str:
+    """Resolve the file to load: the compiled artifact when present (and msgpack is installed), else episodes.json."""
+    path = os.path.join(os.path.dirname(__file__), ARTIFACT_NAME)
+    if os.path.exists(path) and importlib.util.find_spec("msgpack") is not None:
+        return path
+    return episodes_path()
+
+
+def series_for(episode: dict[str, Any]) -> str:
+    """Return the series name an episode belongs to."""
+    url = episode.get("soundcloudUrl", "").lower()
+    for series, pattern in SERIES_PATTERNS.items():
+        if pattern in url:
+            return series
+    return DEFAULT_SERIES
+
+
+def artist_of(song: str) -> str | None:
+    """Artist part of an "Artist - Title" song entry."""
+    artist, separator, _ = song.partition(" - ")
+    return artist.strip() if separator and artist.strip() else None
+
+
+def prompt_snippet(episode: dict[str, Any]) -> str:
+    """Render an episode the way the mood prompts list it."""
+    return (
+        f"ID: {episode['id']}\nTitle: {episode['title']}\nDescription: {episode['description']}\n"
+        f"Songs: {', '.join(episode.get('songs', []))}\n"
+    )
+
+
+def build_indexes(episodes: list[dict[str, Any]]) -> dict[str, dict]:
+    """Positions of the episodes by id, series, genre and artist (lower-case)."""
+    indexes: dict[str, dict] = {"id": {}, "series": {name: [] for name in SERIES}, "genre": {}, "artist": {}}
+    for position, ep in enumerate(episodes):
+        indexes["id"][ep["id"]] = position
+        indexes["series"].setdefault(series_for(ep), []).append(position)
+        for genre in ep.get("music-genres", []):
+            indexes["genre"].setdefault(genre.lower(), []).append(position)
+        artists = dict.fromkeys(artist_of(song) for song in ep.get("songs", []))
+        for artist in filter(None, artists):
+            indexes["artist"].setdefault(artist.lower(), []).append(position)
+    return indexes
+
+
+class EpisodeCatalog:
+    """Immutable snapshot of the episode catalog with lookup maps.
+
+    Episode dicts are shared between requests - callers must copy before mutating.
+
+    Args:
+        episodes: Episode dicts as in episodes.json
+        version: Content hash of the source episodes.json
+        indexes: Precomputed build_indexes() output (built here when omitted)
+        snippets: Precomputed prompt snippets, aligned with episodes
+    """
+
+    def __init__(self, episodes: list[dict[str, Any]], version: str = "",
+                 indexes: dict[str, dict] | None = None, snippets: list[str] | None = None):
+        self.episodes = episodes
+        self.version = version
+        indexes = indexes or build_indexes(episodes)
+
+        def lookup(index: dict) -> dict[str, list[dict[str, Any]]]:
+            return {key: [episodes[p] for p in positions] for key, positions in index.items()}
+
+        self.by_id: dict[int, dict[str, Any]] = {episode_id: episodes[p] for episode_id, p in indexes["id"].items()}
+        self.by_series = lookup(indexes["series"])
+        self.by_genre = lookup(indexes["genre"])
+        self.by_artist = lookup(indexes["artist"])
+        self._snippets = {ep["id"]: snippet for ep, snippet in zip(episodes, snippets)} if snippets else {}
+
+    @classmethod
+    def from_artifact(cls, artifact: dict[str, Any]) -> "EpisodeCatalog":
+        """Build the catalog from a compiled artifact (see catalog_compiler.py)."""
+        if artifact.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported catalog artifact format {artifact.get('format')!r}")
+        return cls(artifact["episodes"], artifact["version"], artifact["indexes"], artifact["snippets"])
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def get(self, episode_id: int) -> dict[str, Any] | None:
+        """Look up an episode by id."""
+        return self.by_id.get(episode_id)
+
+    @cached_property
+    def id_bits(self) -> int:
+        """Bitmap of every episode id in the catalog (bit n = episode n)."""
+        return SessionToken.from_ids(self.by_id).bits
+
+    def session_exclusions(self, played: SessionToken | list | None) -> tuple[SessionToken, bool]:
+        """Resolve a session's played episodes against the catalog.
+
+        Accepts a session token or a legacy list of ids. Returns (excluded,
+        memory_reset), with excluded re-issued for this catalog version.
+        When every episode has been played the session memory resets and
+        nothing is excluded.
+        """
+        if not isinstance(played, SessionToken):
+            played = SessionToken.from_ids(played or [])
+        excluded = played.restrict(self.id_bits, self.version)
+        if excluded and len(excluded) == len(self.by_id):
+            return SessionToken(version=self.version), True
+        return excluded, False
+
+    def snippet(self, episode: dict[str, Any]) -> str:
+        """Prompt snippet of an episode, precomputed when loaded from the artifact."""
+        snippet = self._snippets.get(episode["id"])
+        return snippet if snippet is not None else prompt_snippet(episode)
+
+    @cached_property
+    def prompt_catalog(self) -> str:
+        """All episodes rendered in canonical (id) order - a stable, cacheable prompt prefix."""
+        return "\n".join(self.snippet(ep) for ep in sorted(self.episodes, key=lambda ep: ep["id"]))
+
+    @cached_property
+    def prompt_catalog_tokens(self) -> int:
+        """Token count of prompt_catalog (counted once per catalog version)."""
+        return count_tokens(self.prompt_catalog)
+
+    def genre(self, name: str) -> list[dict[str, Any]]:
+        """Episodes tagged with a genre (case-insensitive)."""
+        return self.by_genre.get(name.lower(), [])
+
+    def artist(self, name: str) -> list[dict[str, Any]]:
+        """Episodes featuring an artist (case-insensitive)."""
+        return self.by_artist.get(name.lower(), [])
+
+
+# ==============================================================================
+# Process-wide cache
+# ==============================================================================
+
+_lock = threading.Lock()
+_catalog: EpisodeCatalog | None = None
+_path: str | None = None
+_mtime_ns: int | None = None
+_checked_at = 0.0
+
+
+def _refresh(force: bool) -> None:
+    """Reload the catalog if the file changed. Caller holds _lock."""
+    global _catalog, _path, _mtime_ns, _checked_at
+
+    if _path is None:
+        _path = catalog_path()
+
+    mtime_ns = os.stat(_path).st_mtime_ns
+    _checked_at = time.monotonic()
+    if not force and _catalog is not None and mtime_ns == _mtime_ns:
+        return
+
+    with open(_path, "rb") as f:
+        raw = f.read()
+    _mtime_ns = mtime_ns
+
+    try:
+        artifact = None
+        if _path.endswith(ARTIFACT_NAME):
+            import msgpack
+            artifact = msgpack.unpackb(raw, strict_map_key=False)
+            version = artifact["version"]
+        else:
+            version = hashlib.sha256(raw).hexdigest()[:16]
+
+        # Touched but unchanged - keep the warm catalog and its indexes
+        if not force and _catalog is not None and version == _catalog.version:
+            return
+
+        if artifact is not None:
+            catalog = EpisodeCatalog.from_artifact(artifact)
+        else:
+            catalog = EpisodeCatalog(json.loads(raw)["episodes"], version=version)
+    except (ValueError, KeyError, TypeError) as e:  # JSONDecodeError and msgpack's errors are ValueErrors
+        if _catalog is None:
+            raise
+        # Keep serving the last good catalog rather than failing every request
+        logger.error(f"Failed to reload {_path}, keeping catalog {_catalog.version}: {e}")
+        return
+
+    _catalog = catalog
+    logger.info(f"Loaded episode catalog {_catalog.version} ({len(_catalog)} episodes) from {_path}")
+
+
+def get_catalog(force_reload: bool = False) -> EpisodeCatalog:
+    """Return the warm catalog, reloading it only when episodes.json changed.
+
+    The file is stat'ed at most once every CHECK_INTERVAL seconds, so the
+    hot path does no file I/O and no JSON parsing.
+    """
+    if (
+        not force_reload
+        and _catalog is not None
+        and time.monotonic() - _checked_at < CHECK_INTERVAL
+    ):
+        return _catalog
+
+    with _lock:
+        if (
+            force_reload
+            or _catalog is None
+            or time.monotonic() - _checked_at >= CHECK_INTERVAL
+        ):
+            _refresh(force_reload)
+        return _catalog
+
+
+async def get_catalog_async() -> EpisodeCatalog:
+    """Async variant of get_catalog for the event loop.
+
+    Returns the warm catalog directly; only a due change check (stat and
+    possible reload) is pushed to a worker thread so the loop never blocks.
+    """
+    if _catalog is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return _catalog
+    return await asyncio.to_thread(get_catalog)
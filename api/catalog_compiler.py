@@ -0,0 +1,148 @@
+"""
+Sedna FM Catalog Compiler
+- Build step for data/episodes.json: checks the JSON syntax, the episode
+  schema and duplicate ids, and fails with every problem listed
+- Compiles the catalog into episodes.msgpack: the episodes plus id, series,
+  genre and artist indexes and the prompt snippets, so workers load it
+  without parsing pretty-printed JSON or rebuilding indexes
+- The artifact keeps the catalog version (content hash of episodes.json),
+  so everything keyed on it behaves the same whichever file was loaded
+
+Usage (from api/):
+    python catalog_compiler.py ../data/episodes.json --check
+    python catalog_compiler.py ../data/episodes.json -o episodes.msgpack
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any
+
+from catalog import ARTIFACT_FORMAT, ARTIFACT_NAME, build_indexes, prompt_snippet
+
+
+# Field -> expected type; songs and music-genres are lists of strings
+REQUIRED_FIELDS: dict[str, type] = {
+    "id": int,
+    "title": str,
+    "description": str,
+    "soundcloudUrl": str,
+    "songs": list,
+    "music-genres": list,
+}
+SOUNDCLOUD_PREFIX = "https://soundcloud.com/"
+
+
+class CatalogError(ValueError):
+    """episodes.json is not a valid catalog."""
+
+    def __init__(self, problems: list[str]):
+        super().__init__(f"{len(problems)} problem(s) in the episode catalog:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+def validate_episodes(data: Any) -> list[str]:
+    """Return every schema problem of a parsed episodes.json (empty when valid)."""
+    if not isinstance(data, dict) or not isinstance(data.get("episodes"), list):
+        return ['top level must be an object with an "episodes" list']
+
+    problems = []
+    seen: dict[int, int] = {}
+    for position, ep in enumerate(data["episodes"]):
+        where = f"episodes[{position}]"
+        if not isinstance(ep, dict):
+            problems.append(f"{where}: not an object")
+            continue
+        if isinstance(ep.get("id"), int) and not isinstance(ep["id"], bool):
+            where = f"episodes[{position}] (id {ep['id']})"
+
+        for field, kind in REQUIRED_FIELDS.items():
+            value = ep.get(field)
+            if field not in ep:
+                problems.append(f"{where}: missing '{field}'")
+            elif not isinstance(value, kind) or isinstance(value, bool):
+                problems.append(f"{where}: '{field}' must be {kind.__name__}, got {type(value).__name__}")
+            elif kind is str and not value.strip():
+                problems.append(f"{where}: '{field}' is empty")
+            elif kind is list and not all(isinstance(item, str) and item.strip() for item in value):
+                problems.append(f"{where}: '{field}' must only contain non-empty strings")
+
+        episode_id = ep.get("id")
+        if isinstance(episode_id, int) and not isinstance(episode_id, bool):
+            if episode_id < 0:
+                problems.append(f"{where}: 'id' must not be negative")
+            elif episode_id in seen:
+                problems.append(f"{where}: duplicate id, already used by episodes[{seen[episode_id]}]")
+            else:
+                seen[episode_id] = position
+        url = ep.get("soundcloudUrl")
+        if isinstance(url, str) and url.strip() and not url.startswith(SOUNDCLOUD_PREFIX):
+            problems.append(f"{where}: 'soundcloudUrl' must start with {SOUNDCLOUD_PREFIX}")
+    return problems
+
+
+def load_source(raw: bytes) -> list[dict[str, Any]]:
+    """Parse and validate episodes.json, raising CatalogError on any problem."""
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise CatalogError([f"invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"]) from e
+    problems = validate_episodes(data)
+    if problems:
+        raise CatalogError(problems)
+    return data["episodes"]
+
+
+def compile_catalog(raw: bytes) -> dict[str, Any]:
+    """Build the artifact for the bytes of episodes.json."""
+    episodes = load_source(raw)
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": hashlib.sha256(raw).hexdigest()[:16],
+        "episodes": episodes,
+        "indexes": build_indexes(episodes),
+        "snippets": [prompt_snippet(ep) for ep in episodes],
+    }
+
+
+def write_artifact(artifact: dict[str, Any], path: str) -> int:
+    """Write the artifact atomically; returns its size in bytes."""
+    import msgpack
+
+    packed = msgpack.packb(artifact, use_bin_type=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(packed)
+    os.replace(tmp_path, path)
+    return len(packed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Path to episodes.json")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(__file__), ARTIFACT_NAME),
+                        help=f"Artifact path (default: {ARTIFACT_NAME} next to this script)")
+    parser.add_argument("--check", action="store_true", help="Only validate, don't write the artifact")
+    args = parser.parse_args()
+
+    with open(args.source, "rb") as f:
+        raw = f.read()
+    try:
+        artifact = compile_catalog(raw)
+    except CatalogError as e:
+        print(f"{args.source}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    summary = (f"{len(artifact['episodes'])} episodes, {len(artifact['indexes']['genre'])} genres, "
+               f"{len(artifact['indexes']['artist'])} artists, version {artifact['version']}")
+    if args.check:
+        print(f"{args.source}: OK ({summary})")
+        return
+    size = write_artifact(artifact, args.output)
+    print(f"Wrote {args.output} ({size} bytes; {summary})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Sedna FM Fast Recommender
+- LLM-free mood recommendation from the precomputed mood x episode affinity matrix
+- Local playlist ranker along a mood arc (e.g. Calm -> Energetic)
+- Circuit breaker that routes around a slow or failing Azure OpenAI deployment
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from catalog import EpisodeCatalog
+from session_token import SessionToken
+
+logger = logging.getLogger(__name__)
+
+
+# Deadline for the LLM call before the fast path answers instead
+MOOD_LLM_DEADLINE = float(os.environ.get("MOOD_LLM_DEADLINE_SECONDS", "8"))
+
+
+def fast_recommendation(mood: str, catalog: EpisodeCatalog, exclude_ids: SessionToken | list = None) -> dict:
+    """Recommend an episode without calling the model.
+
+    Picks a weighted random episode from the mood's affinity row, honouring
+    exclude_ids, and resets the session memory once everything was played.
+
+    Args:
+        mood: The mood to match
+        catalog: The episode catalog
+        exclude_ids: Session token (or legacy list of IDs) of episodes already played
+    """
+    # numpy comes with the retriever; imported on first use to keep cold starts light
+    from retrieval import get_retriever
+    retriever = get_retriever(catalog)
+    excluded, memory_reset = catalog.session_exclusions(exclude_ids)
+
+    episode = retriever.sample(mood, excluded)
+    return {
+        "success": True,
+        "episode": episode,
+        "reason": fast_reason(episode, mood),
+        "memoryReset": memory_reset
+    }
+
+
+def fast_reason(episode: dict[str, Any], mood: str) -> str:
+    """Short, template-based reason for a locally picked episode."""
+    genres = episode.get("music-genres", [])[:2]
+    if genres:
+        return f"{' and '.join(genres)} picked to fit your {mood.lower()} mood."
+    return f"Picked to fit your {mood.lower()} mood."
+
+
+def mood_arc(moods: list[str], length: int) -> list[tuple[str, str, float]]:
+    """Spread a mood arc over a playlist as (from mood, to mood, blend) per position.
+
+    ["Calm", "Energetic"] over 5 tracks blends 0, 0.25, 0.5, 0.75 and 1 of
+    the way; a single mood gives the same step throughout.
+    """
+    steps = []
+    for position in range(length):
+        x = position * (len(moods) - 1) / (length - 1) if length > 1 else 0.0
+        start = min(int(x), len(moods) - 1)
+        steps.append((moods[start], moods[min(start + 1, len(moods) - 1)], x - start))
+    return steps
+
+
+def step_mood(step: tuple[str, str, float]) -> str:
+    """The mood a playlist step is closest to."""
+    start, end, blend = step
+    return start if blend < 0.5 else end
+
+
+def rank_playlist(steps: list[tuple[str, str, float]], catalog: EpisodeCatalog, excluded: SessionToken) -> list[dict[str, Any]]:
+    """Local ranker: one affinity-weighted, non-repeating pick per step.
+
+    Returns fewer entries than steps when the unplayed episodes run out.
+    """
+    from retrieval import get_retriever
+    episodes = get_retriever(catalog).playlist(steps, excluded)
+    return [
+        {"episode": episode, "reason": fast_reason(episode, step_mood(step)), "mood": step_mood(step)}
+        for episode, step in zip(episodes, steps)
+    ]
+
+
+def complete_playlist(playlist: list[dict[str, Any]], steps: list[tuple[str, str, float]], catalog: EpisodeCatalog,
+                      excluded: SessionToken) -> tuple[list[dict[str, Any]], bool]:
+    """Fill the steps after `playlist` with the local ranker.
+
+    When the unplayed episodes run out the session memory resets and only
+    the playlist itself stays excluded. Returns (playlist, memory_reset).
+    """
+    playlist = playlist + rank_playlist(steps[len(playlist):], catalog, excluded.add(*(e["episode"]["id"] for e in playlist)))
+    if len(playlist) >= len(steps):
+        return playlist, False
+    in_playlist = SessionToken.from_ids((e["episode"]["id"] for e in playlist), catalog.version)
+    return playlist + rank_playlist(steps[len(playlist):], catalog, in_playlist), True
+
+
+def fast_playlist(moods: list[str], catalog: EpisodeCatalog, exclude_ids: SessionToken | list, length: int) -> dict:
+    """Build an ordered playlist along a mood arc without calling the model.
+
+    Args:
+        moods: The mood, or the moods of the arc in order
+        catalog: The episode catalog
+        exclude_ids: Session token (or legacy list of IDs) of episodes already played
+        length: Number of episodes
+    """
+    excluded, memory_reset = catalog.session_exclusions(exclude_ids)
+    playlist, ran_out = complete_playlist([], mood_arc(moods, length), catalog, excluded)
+    return {"success": True, "playlist": playlist, "memoryReset": memory_reset or ran_out}
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for an upstream dependency.
+
+    The circuit opens when the error rate over the last `window` seconds
+    reaches `error_rate` (with at least `min_calls` samples) and stays open
+    for `cooldown` seconds. Afterwards a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, error_rate: float = 0.5, min_calls: int = 4, window: float = 60.0, cooldown: float = 30.0):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._calls: deque[tuple[float, bool]] = deque()
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Return True if a call to the upstream may be attempted."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give up a half-open trial without an outcome (the upstream was never asked, or the call was cancelled).
+
+        The next allow() after the cooldown starts a new trial. A no-op once
+        record() has taken the outcome.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of an upstream call."""
+        now = time.monotonic()
+        with self._lock:
+            if self._trial_in_flight:
+                self._trial_in_flight = False
+                if ok:
+                    logger.info(f"Circuit '{self.name}' closed")
+                    self._opened_at = None
+                    self._calls.clear()
+                else:
+                    self._opened_at = now
+                return
+
+            self._calls.append((now, ok))
+            while self._calls and now - self._calls[0][0] > self.window:
+                self._calls.popleft()
+
+            failures = sum(1 for _, success in self._calls if not success)
+            if (
+                self._opened_at is None
+                and len(self._calls) >= self.min_calls
+                and failures / len(self._calls) >= self.error_rate
+            ):
+                logger.warning(f"Circuit '{self.name}' opened ({failures}/{len(self._calls)} failures)")
+                self._opened_at = now
+
+
+mood_llm_breaker = CircuitBreaker(
+    "mood-llm",
+    error_rate=float(os.environ.get("MOOD_BREAKER_ERROR_RATE", "0.5")),
+    min_calls=int(os.environ.get("MOOD_BREAKER_MIN_CALLS", "4")),
+    window=float(os.environ.get("MOOD_BREAKER_WINDOW_SECONDS", "60")),
+    cooldown=float(os.environ.get("MOOD_BREAKER_COOLDOWN_SECONDS", "30")),
+)
@@ -9,88 +9,56 @@ import json
 import logging
 import os
 import random
-import httpx
+import time
+import asyncio
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any
-from openai import AzureOpenAI
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from catalog import EpisodeCatalog, get_catalog, get_catalog_async, prompt_snippet
+from fast_recommender import MOOD_LLM_DEADLINE, complete_playlist, fast_playlist, fast_recommendation, mood_arc, mood_llm_breaker, step_mood
+from openai_clients import get_async_openai_client
+from mood_pools import MoodPools
+from prompt_encoder import encode_daily_prompt, preload_encoding
+from streaming_json import JSONArrayStreamParser
+from onthisday import fetch_feeds
+from keyword_scorer import get_keyword_scorer
+from schedule import build_schedule, compressed_siblings, is_time_indexed, publish_next_fact, resolve_current_fact, serialize_schedule
+from state_store import get_state_store
+from schedule_engine import BATCH_DAYS, MAX_RANGE_DAYS, RangeGenerator, date_range
+from session_token import SessionToken
 
 # GitHub API for committing results
-from github import Github
+from github_store import get_github_store
+from structured_output import InvalidModelOutput, MATCH_SCHEMA, MOOD_LIST_SCHEMA, MOOD_SCHEMA, SCHEDULE_SCHEMA, extract_json, parse_outcome, salvage_entries, salvage_int_field, structured_output, valid_match
+from telemetry import record_parse, record_regenerated, record_usage, span
 
 # Create single FunctionApp instance for all functions
 app = func.FunctionApp()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# The Functions worker installs the log handler and level; configuring
+# logging here would only add work (and a stray handler) to every cold start
 logger = logging.getLogger(__name__)
 
+# Load the tokenizer in the background while the host starts, not on a request
+preload_encoding()
+
 
 # ==============================================================================
 # SHARED: Episode Loading
 # ==============================================================================
 
 def load_episodes() -> list[dict[str, Any]]:
-    """Load episodes from the JSON file."""
-    episodes_path = os.path.join(os.path.dirname(__file__), "episodes.json")
-    
-    # Fallback to data folder path
-    if not os.path.exists(episodes_path):
-        episodes_path = os.path.join(os.path.dirname(__file__), "..", "data", "episodes.json")
-    
-    with open(episodes_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["episodes"]
+    """Return the episode list from the warm process-wide catalog."""
+    with span("catalog_load"):
+        return get_catalog().episodes
 
 
 # ==============================================================================
 # MOOD RECOMMENDATION API
 # ==============================================================================
 
-def get_mood_recommendation(mood: str, episodes: list, exclude_ids: list = None) -> dict:
-    """Use GPT-5-nano to recommend an episode based on mood.
-    
-    Args:
-        mood: The mood to match
-        episodes: List of all episodes
-        exclude_ids: List of episode IDs to exclude (already played in session)
-    """
-    if exclude_ids is None:
-        exclude_ids = []
-    
-    # Filter out excluded episodes
-    available_episodes = [ep for ep in episodes if ep['id'] not in exclude_ids]
-    
-    # If all episodes have been played, reset and use all episodes
-    memory_reset = False
-    if len(available_episodes) == 0:
-        available_episodes = episodes
-        memory_reset = True
-        logging.info(f"All episodes played for mood '{mood}', resetting memory")
-    
-    # Use dedicated env vars for mood API (falls back to shared vars)
-    client = AzureOpenAI(
-        api_key=os.environ.get("AZURE_OPENAI_API_KEY_MOOD", os.environ.get("AZURE_OPENAI_API_KEY")),
-        api_version="2025-01-01-preview",
-        azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT_MOOD", os.environ.get("AZURE_OPENAI_ENDPOINT"))
-    )
-    
-    # Shuffle available episodes to present them in random order - encourages variety
-    shuffled_episodes = available_episodes.copy()
-    random.shuffle(shuffled_episodes)
-    
-    # Build episode catalog for the prompt (in random order, excluding already played)
-    episode_catalog = "\n".join([
-        f"ID: {ep['id']}\nTitle: {ep['title']}\nDescription: {ep['description']}\nSongs: {', '.join(ep.get('songs', []))}\n"
-        for ep in shuffled_episodes
-    ])
-    
-    # Add randomness hint to encourage variety
-    random_seed = random.randint(1, 1000)
-    
-    # Pick a random subset hint to encourage exploration
-    random_series = random.choice(["Sedna FM main series", "Morning Drops", "Evening Flows", "On The Go", "any series"])
-    
-    system_prompt = """You are Sedna FM's mood-based music curator. Your job is to recommend the perfect episode based on the listener's current mood.
+MOOD_CURATOR_PROMPT = """You are Sedna FM's mood-based music curator. Your job is to recommend the perfect episode based on the listener's current mood.
 
 Analyze each episode's description and song list to understand its emotional atmosphere, then match it to the requested mood.
 
@@ -102,12 +70,81 @@ CRITICAL GUIDELINES FOR VARIETY:
 5. If an episode mentions a specific emotion, that's just ONE signal - other episodes without that keyword might fit even better
 6. BE CREATIVE in your selections!
 
-You must respond with ONLY a valid JSON object in this exact format:
+"""
+
+MOOD_RESPONSE_FORMAT = """You must respond with ONLY a valid JSON object in this exact format:
 {"episode_id": <number>, "reason": "<brief explanation of why this episode matches the mood>"}
 
 Do not include any other text, markdown, or explanation outside the JSON."""
 
-    user_prompt = f"""The listener is feeling: {mood}
+# Batch variant used to pre-generate pooled recommendations
+MOOD_POOL_RESPONSE_FORMAT = """You must respond with ONLY a valid JSON object whose "recommendations" array holds {count} objects, each for a DIFFERENT episode, in this exact format:
+{{"recommendations": [{{"episode_id": <number>, "reason": "<brief explanation of why this episode matches the mood>"}}, ...]}}
+
+Do not include any other text, markdown, or explanation outside the JSON object."""
+
+# Ordered playlist of {count} episodes, optionally along a mood arc
+MOOD_PLAYLIST_RESPONSE_FORMAT = """Build a playlist of {count} DIFFERENT episodes in play order{arc}.
+You must respond with ONLY a valid JSON object whose "recommendations" array holds {count} objects, in play order, in this exact format:
+{{"recommendations": [{{"episode_id": <number>, "reason": "<brief explanation of why this episode fits at this point of the playlist>"}}, ...]}}
+
+Do not include any other text, markdown, or explanation outside the JSON object."""
+
+MOOD_SYSTEM_PROMPT = MOOD_CURATOR_PROMPT + MOOD_RESPONSE_FORMAT
+
+# Prompt layout for mood requests:
+# - "shuffled" (default): shuffled top-K candidate episodes in the user
+#   message, so the prompt stays a fixed size however large the catalog
+# - "cached": stable system prefix (instructions + whole catalog in canonical
+#   order) so Azure OpenAI prompt caching applies; mood, shortlist and
+#   variety hint go at the end of the user message. Opt-in: the prefix grows
+#   with the catalog and is only worth it for small catalogs
+MOOD_PROMPT_LAYOUT = os.environ.get("MOOD_PROMPT_LAYOUT", "shuffled")
+
+# Above this size (tokens) the catalog is too big for the cached prefix. The
+# current catalog is ~7k tokens; a cache hit bills it at the cached-input
+# rate, which is cheaper than the ~2k uncached tokens of the shuffled layout
+MOOD_CACHED_PREFIX_MAX_TOKENS = int(os.environ.get("MOOD_CACHED_PREFIX_MAX_TOKENS", "12000"))
+
+MOOD_VARIETY_HINTS = ["Sedna FM main series", "Morning Drops", "Evening Flows", "On The Go", "any series"]
+
+VALID_MOODS = ["Happy", "Calm", "Reflective", "Sad", "Energetic", "Intimate", "Moody", "Carefree"]
+
+# Number of locally retrieved candidates sent to the model (0 = whole catalog)
+MOOD_RETRIEVAL_TOP_K = int(os.environ.get("MOOD_RETRIEVAL_TOP_K", "12"))
+
+# Playlist endpoint: default and maximum length, and the deadline of its single model call
+PLAYLIST_DEFAULT_LENGTH = int(os.environ.get("PLAYLIST_DEFAULT_LENGTH", "5"))
+PLAYLIST_MAX_LENGTH = int(os.environ.get("PLAYLIST_MAX_LENGTH", "10"))
+PLAYLIST_LLM_DEADLINE = float(os.environ.get("PLAYLIST_LLM_DEADLINE_SECONDS", "20"))
+
+
+def select_mood_candidates(mood: str, catalog: EpisodeCatalog, excluded: SessionToken | set, top_k: int = MOOD_RETRIEVAL_TOP_K) -> list[dict[str, Any]]:
+    """Pick the episodes to show the model for a mood.
+    
+    With retrieval enabled only the top_k best-scoring episodes (TF-IDF vs.
+    mood lexicon) are returned, so the prompt size no longer grows with the catalog.
+    """
+    if top_k <= 0:
+        return [ep for ep in catalog.episodes if ep['id'] not in excluded]
+    from retrieval import get_retriever  # numpy is only needed by the mood features
+    return get_retriever(catalog).top_k(mood, top_k, excluded)
+
+
+def build_mood_user_prompt(mood: str, candidates: list[dict[str, Any]], catalog: EpisodeCatalog | None = None) -> str:
+    """Build the user prompt listing candidate episodes in random order.
+    
+    Uses the catalog's precomputed prompt snippets when one is given.
+    """
+    render = catalog.snippet if catalog is not None else prompt_snippet
+    # Shuffle candidates to present them in random order - encourages variety
+    shuffled_episodes = candidates.copy()
+    random.shuffle(shuffled_episodes)
+    
+    # Build episode catalog for the prompt (in random order, excluding already played)
+    episode_catalog = "\n".join([render(ep) for ep in shuffled_episodes])
+    
+    return f"""The listener is feeling: {mood}
 
 
 Available episodes:
@@ -115,63 +152,332 @@ Available episodes:
 
 Select the best matching episode. IMPORTANT: Vary your selection - don't always pick the most obvious episode!"""
 
-    response = client.chat.completions.create(
-        model=os.environ.get("AZURE_OPENAI_MODEL_MOOD", "gpt-5-nano"),
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        max_completion_tokens=16384,
-        reasoning_effort="minimal"  # Use minimal reasoning for fastest response
-    )
+
+_cached_layout_warned: set[str] = set()
+
+
+def mood_prompt_layout(catalog: EpisodeCatalog) -> str:
+    """The layout mood prompts actually use for a catalog ("cached" or "shuffled").
+    
+    "cached" falls back to "shuffled" while the catalog is above
+    MOOD_CACHED_PREFIX_MAX_TOKENS, with a warning once per catalog version.
+    """
+    if MOOD_PROMPT_LAYOUT != "cached":
+        return "shuffled"
+    tokens = catalog.prompt_catalog_tokens
+    if tokens > MOOD_CACHED_PREFIX_MAX_TOKENS:
+        if catalog.version not in _cached_layout_warned:
+            _cached_layout_warned.add(catalog.version)
+            logger.warning(f"MOOD_PROMPT_LAYOUT=cached is disabled: the catalog is {tokens} tokens, above MOOD_CACHED_PREFIX_MAX_TOKENS={MOOD_CACHED_PREFIX_MAX_TOKENS}; sending the shuffled layout")
+        return "shuffled"
+    return "cached"
+
+
+def build_mood_messages(mood: str, catalog: EpisodeCatalog, candidates: list[dict[str, Any]], response_format: str = MOOD_RESPONSE_FORMAT) -> list[dict[str, str]]:
+    """Assemble the chat messages for a mood request in the configured layout.
+    
+    In the cached layout the system message is identical for every request
+    on a catalog version; variety comes from a server-side shuffled shortlist
+    and a random series hint instead of shuffling the catalog.
+    """
+    if mood_prompt_layout(catalog) != "cached":
+        return [
+            {"role": "system", "content": MOOD_CURATOR_PROMPT + response_format},
+            {"role": "user", "content": build_mood_user_prompt(mood, candidates, catalog)}
+        ]
+    
+    shortlist = [str(ep["id"]) for ep in candidates]
+    random.shuffle(shortlist)
+    
+    system_prompt = f"""{MOOD_CURATOR_PROMPT}Sedna FM episode catalog:
+
+{catalog.prompt_catalog}"""
+
+    user_prompt = f"""The listener is feeling: {mood}
+
+Choose from these episode IDs only: {', '.join(shortlist)}
+Variety hint: consider {random.choice(MOOD_VARIETY_HINTS)} (request #{random.randint(1, 1000)})
+
+Select the best matching episode. IMPORTANT: Vary your selection - don't always pick the most obvious episode!
+
+{response_format}"""
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def log_prompt_usage(label: str, response: Any, operation: str, layout: str) -> None:
+    """Log prompt tokens and how many were served from the prompt cache, and record them as metrics."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    record_usage(operation, usage)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    share = cached / usage.prompt_tokens if usage.prompt_tokens else 0
+    logger.info(f"{label} prompt tokens: {usage.prompt_tokens}, cached_tokens: {cached} ({share:.0%}, layout={layout})")
+
+
+async def get_mood_recommendation(mood: str, catalog: EpisodeCatalog, exclude_ids: SessionToken | list = None) -> dict:
+    """Use GPT-5-nano to recommend an episode based on mood.
+    
+    Args:
+        mood: The mood to match
+        catalog: The episode catalog
+        exclude_ids: Session token (or legacy list of IDs) of episodes already played
+    """
+    # If all episodes have been played, reset and use all episodes
+    excluded, memory_reset = catalog.session_exclusions(exclude_ids)
+    if memory_reset:
+        logging.info(f"All episodes played for mood '{mood}', resetting memory")
+    
+    # Local retrieval narrows the catalog to the best candidates for this mood
+    candidates = select_mood_candidates(mood, catalog, excluded)
+    
+    # Pooled async client for the mood env vars (falls back to shared vars).
+    # No retries: past the deadline the fast recommender answers instead
+    client = get_async_openai_client("MOOD", max_retries=0)
+    
+    with span("llm_call", operation="mood", candidates=len(candidates)):
+        response = await client.chat.completions.create(
+            model=os.environ.get("AZURE_OPENAI_MODEL_MOOD", "gpt-5-nano"),
+            messages=build_mood_messages(mood, catalog, candidates),
+            max_completion_tokens=16384,
+            reasoning_effort="minimal",  # Use minimal reasoning for fastest response
+            timeout=MOOD_LLM_DEADLINE,
+            **structured_output("mood_recommendation", MOOD_SCHEMA)
+        )
+        log_prompt_usage("Mood recommendation", response, "mood", mood_prompt_layout(catalog))
+    
+    # Parse the AI response; a damaged object still yields its episode_id
+    ai_response = response.choices[0].message.content or ""
+    with span("json_parse", operation="mood"):
+        try:
+            recommendation, intact = extract_json(ai_response), True
+        except ValueError:
+            recommendation, intact = {"episode_id": salvage_int_field(ai_response, "episode_id")}, False
+    if not isinstance(recommendation, dict):
+        recommendation, intact = {}, False
+    
+    episode_id = recommendation.get("episode_id")
+    episode = catalog.get(episode_id)
+    usable = episode is not None and episode_id not in excluded
+    record_parse("mood", parse_outcome(intact, int(usable), 1), 1, int(usable))
+    if not usable:
+        raise InvalidModelOutput(f"No usable episode in mood response: {ai_response[:200]!r}")
+    
+    return {
+        "success": True,
+        "episode": episode,
+        "reason": recommendation.get("reason") or f"Picked to fit your {mood.lower()} mood.",
+        "memoryReset": memory_reset
+    }
+
+
+async def generate_mood_pool_entries(mood: str, catalog: EpisodeCatalog, count: int, exclude_ids: set[int]) -> list[dict[str, Any]]:
+    """Ask GPT-5-nano for several distinct recommendations for a mood in one call.
+    
+    Used by the mood pools; runs in the background so it is not bound by
+    the interactive deadline.
+    """
+    top_k = max(MOOD_RETRIEVAL_TOP_K, 2 * count) if MOOD_RETRIEVAL_TOP_K > 0 else 0
+    candidates = select_mood_candidates(mood, catalog, exclude_ids, top_k=top_k)
+    count = min(count, len(candidates))
+    if count <= 0:
+        return []
+    
+    client = get_async_openai_client("MOOD")
+    with span("llm_call", operation="mood_pool", count=count):
+        response = await client.chat.completions.create(
+            model=os.environ.get("AZURE_OPENAI_MODEL_MOOD", "gpt-5-nano"),
+            messages=build_mood_messages(mood, catalog, candidates, MOOD_POOL_RESPONSE_FORMAT.format(count=count)),
+            max_completion_tokens=16384,
+            reasoning_effort="minimal",
+            **structured_output("mood_recommendations", MOOD_LIST_SCHEMA)
+        )
+        log_prompt_usage("Mood pool refill", response, "mood_pool", mood_prompt_layout(catalog))
+    
+    with span("json_parse", operation="mood_pool"):
+        entries, intact = salvage_entries(response.choices[0].message.content or "", "recommendations")
+    entries = [entry for entry in entries if isinstance(entry, dict) and catalog.get(entry.get("episode_id")) is not None]
+    record_parse("mood_pool", parse_outcome(intact, len(entries), count), count, min(len(entries), count))
+    return entries
+
+
+# Per-worker pools of ready-made recommendations (MOOD_POOL_SIZE=0 disables)
+mood_pools = MoodPools(generate_mood_pool_entries)
+
+
+async def recommend_with_fallback(mood: str, catalog: EpisodeCatalog, exclude_ids: SessionToken | list = None, mode: str = "auto") -> dict:
+    """Recommend an episode, reporting which engine answered.
+    
+    Args:
+        mood: The mood to match
+        catalog: The episode catalog
+        exclude_ids: Session token (or legacy list of IDs) of episodes already played
+        mode: "fast" for the local recommender only, "auto" for a pooled
+            recommendation or the LLM, with the local recommender as
+            circuit-breaker fallback
+    """
+    if mode == "fast":
+        return {**fast_recommendation(mood, catalog, exclude_ids), "engine": "fast"}
+    
+    # Serve a pre-generated recommendation when one fits the exclusions
+    if mood_pools.enabled:
+        excluded, memory_reset = catalog.session_exclusions(exclude_ids)
+        pooled = mood_pools.take(mood, catalog, excluded)
+        if not mood_llm_breaker.is_open:
+            mood_pools.schedule_refill(mood, catalog)
+        if pooled:
+            return {"success": True, **pooled, "memoryReset": memory_reset, "engine": "pool"}
     
-    # Parse the AI response
-    ai_response = response.choices[0].message.content.strip()
+    if not mood_llm_breaker.allow():
+        return {**fast_recommendation(mood, catalog, exclude_ids), "engine": "fast", "fallback": "circuit_open"}
     
     try:
-        recommendation = json.loads(ai_response)
-        episode_id = recommendation.get("episode_id")
-        reason = recommendation.get("reason", "")
-        
-        # Find the full episode details
-        episode = next((ep for ep in episodes if ep["id"] == episode_id), None)
-        
-        if episode:
-            return {
-                "success": True,
-                "episode": episode,
-                "reason": reason,
-                "memoryReset": memory_reset
-            }
-        else:
-            # Fallback to first available episode if ID not found
-            return {
-                "success": True,
-                "episode": available_episodes[0],
-                "reason": "Here's a great episode for you!",
-                "memoryReset": memory_reset
-            }
-            
-    except json.JSONDecodeError:
-        logging.error(f"Failed to parse AI response: {ai_response}")
-        # Return first available episode as fallback
-        return {
-            "success": True,
-            "episode": available_episodes[0],
-            "reason": "Here's a recommended episode for your mood!",
-            "memoryReset": memory_reset
-        }
+        result = await get_mood_recommendation(mood, catalog, exclude_ids)
+        mood_llm_breaker.record(True)
+    except InvalidModelOutput as e:
+        # The deployment answered, so the circuit stays healthy
+        mood_llm_breaker.record(True)
+        logging.warning(f"{e}; using fast recommender")
+        return {**fast_recommendation(mood, catalog, exclude_ids), "engine": "fast", "fallback": "invalid_response"}
+    except Exception as e:
+        mood_llm_breaker.record(False)
+        logging.warning(f"Mood LLM call failed, using fast recommender: {e}")
+        return {**fast_recommendation(mood, catalog, exclude_ids), "engine": "fast", "fallback": "llm_error"}
+    finally:
+        # A cancelled call records nothing; don't leave a half-open trial stuck
+        mood_llm_breaker.release()
+    
+    return {**result, "engine": "llm"}
+
+
+async def get_mood_playlist(moods: list[str], catalog: EpisodeCatalog, exclude_ids: SessionToken | list, length: int) -> dict:
+    """Ask GPT-5-nano for an ordered playlist along a mood arc in a single call.
+    
+    Entries that are unknown, already played or repeated are dropped, and
+    the playlist is completed by the local ranker. With fewer candidates
+    than `length` the local ranker answers alone (engine "fast", no call).
+    
+    Args:
+        moods: The mood, or the moods of the arc in order
+        catalog: The episode catalog
+        exclude_ids: Session token (or legacy list of IDs) of episodes already played
+        length: Number of episodes
+    """
+    excluded, memory_reset = catalog.session_exclusions(exclude_ids)
+    steps = mood_arc(moods, length)
+    
+    # Shortlist the best candidates of every mood on the arc
+    top_k = max(MOOD_RETRIEVAL_TOP_K, 2 * length) if MOOD_RETRIEVAL_TOP_K > 0 else 0
+    candidates = list({ep["id"]: ep for mood in dict.fromkeys(moods) for ep in select_mood_candidates(mood, catalog, excluded, top_k=top_k)}.values())
+    if len(candidates) < length:
+        playlist, ran_out = complete_playlist([], steps, catalog, excluded)
+        return {"success": True, "playlist": playlist, "memoryReset": memory_reset or ran_out, "engine": "fast"}
+    
+    arc = f" that moves gradually from {' to '.join(moods)}" if len(moods) > 1 else ""
+    response_format = MOOD_PLAYLIST_RESPONSE_FORMAT.format(count=length, arc=arc)
+    client = get_async_openai_client("MOOD", max_retries=0)
+    with span("llm_call", operation="mood_playlist", count=length, candidates=len(candidates)):
+        response = await client.chat.completions.create(
+            model=os.environ.get("AZURE_OPENAI_MODEL_MOOD", "gpt-5-nano"),
+            messages=build_mood_messages(" → ".join(moods), catalog, candidates, response_format),
+            max_completion_tokens=16384,
+            reasoning_effort="minimal",
+            timeout=PLAYLIST_LLM_DEADLINE,
+            **structured_output("mood_recommendations", MOOD_LIST_SCHEMA)
+        )
+        log_prompt_usage("Mood playlist", response, "mood_playlist", mood_prompt_layout(catalog))
+    
+    with span("json_parse", operation="mood_playlist"):
+        entries, intact = salvage_entries(response.choices[0].message.content or "", "recommendations")
+    
+    playlist, chosen = [], set()
+    for entry in entries:
+        episode_id = entry.get("episode_id") if isinstance(entry, dict) else None
+        episode = catalog.get(episode_id)
+        if episode is None or episode_id in excluded or episode_id in chosen or len(playlist) >= length:
+            continue
+        chosen.add(episode_id)
+        playlist.append({"episode": episode, "reason": entry.get("reason", ""), "mood": step_mood(steps[len(playlist)])})
+    record_parse("mood_playlist", parse_outcome(intact, len(playlist), length), length, len(playlist))
+    if len(playlist) < length:
+        logging.warning(f"Mood playlist returned {len(playlist)}/{length} usable entries, completing locally")
+    
+    playlist, ran_out = complete_playlist(playlist, steps, catalog, excluded)
+    return {"success": True, "playlist": playlist, "memoryReset": memory_reset or ran_out}
+
+
+async def playlist_with_fallback(moods: list[str], catalog: EpisodeCatalog, exclude_ids: SessionToken | list, length: int, mode: str = "auto") -> dict:
+    """Build a playlist, reporting which engine answered.
+    
+    Same modes and circuit breaker as recommend_with_fallback; there are
+    no pooled playlists.
+    """
+    if mode == "fast":
+        return {**fast_playlist(moods, catalog, exclude_ids, length), "engine": "fast"}
+    
+    if not mood_llm_breaker.allow():
+        return {**fast_playlist(moods, catalog, exclude_ids, length), "engine": "fast", "fallback": "circuit_open"}
+    
+    try:
+        result = await get_mood_playlist(moods, catalog, exclude_ids, length)
+        if result.get("engine") != "fast":
+            mood_llm_breaker.record(True)
+    except Exception as e:
+        mood_llm_breaker.record(False)
+        logging.warning(f"Mood playlist LLM call failed, using fast recommender: {e}")
+        return {**fast_playlist(moods, catalog, exclude_ids, length), "engine": "fast", "fallback": "llm_error"}
+    finally:
+        # Answered locally (no model call) or cancelled: no outcome to record,
+        # but a half-open trial must not stay in flight
+        mood_llm_breaker.release()
+    
+    return {**result, "engine": result.get("engine", "llm")}
+
+
+def parse_session(req_body: dict) -> SessionToken:
+    """Read the played episodes of a request: the session token plus any legacy "exclude" list.
+
+    A malformed token starts a fresh session rather than failing the request.
+    """
+    played = SessionToken()
+    token = req_body.get("session")
+    if isinstance(token, str) and token:
+        try:
+            played = SessionToken.decode(token)
+        except ValueError as e:
+            logging.warning(f"Ignoring malformed session token: {e}")
+    
+    # Older clients still send the ids they played
+    exclude_ids = req_body.get("exclude", [])
+    if not isinstance(exclude_ids, list):
+        exclude_ids = []
+    return played.add(*(int(id) for id in exclude_ids if isinstance(id, (int, str)) and str(id).isdigit()))
+
+
+def next_session(catalog: EpisodeCatalog, played: SessionToken, result: dict) -> SessionToken:
+    """The token to hand back: the played episodes plus this recommendation (or playlist)."""
+    if result.get("memoryReset"):
+        played = SessionToken()
+    session, _ = catalog.session_exclusions(played)
+    return session.add(*(entry["episode"]["id"] for entry in result.get("playlist") or [result]))
 
 
 @app.route(route="recommend", methods=["POST", "OPTIONS"], auth_level=func.AuthLevel.ANONYMOUS)
-def recommend_episode(req: func.HttpRequest) -> func.HttpResponse:
+async def recommend_episode(req: func.HttpRequest) -> func.HttpResponse:
     """
     HTTP endpoint to get mood-based episode recommendations.
     
     POST /api/recommend
-    Body: {"mood": "Happy"}
+    Body: {"mood": "Happy", "session": "<token>", "mode": "auto" | "fast"}
+    ("exclude": [1, 2] is still accepted from older clients)
     
-    Returns: {"success": true, "episode": {...}, "reason": "..."}
+    Returns: {"success": true, "episode": {...}, "reason": "...", "session": "<token>",
+              "engine": "pool" | "llm" | "fast"}
     """
     
     # Handle CORS preflight
@@ -195,12 +501,8 @@ def recommend_episode(req: func.HttpRequest) -> func.HttpResponse:
         # Parse request body
         req_body = req.get_json()
         mood = req_body.get("mood")
-        exclude_ids = req_body.get("exclude", [])  # List of episode IDs to exclude
-        
-        # Ensure exclude_ids is a list of integers
-        if not isinstance(exclude_ids, list):
-            exclude_ids = []
-        exclude_ids = [int(id) for id in exclude_ids if isinstance(id, (int, str)) and str(id).isdigit()]
+        played = parse_session(req_body)  # Episodes already played this session
+        mode = req_body.get("mode", "auto")
         
         if not mood:
             return func.HttpResponse(
@@ -210,17 +512,21 @@ def recommend_episode(req: func.HttpRequest) -> func.HttpResponse:
             )
         
         # Validate mood
-        valid_moods = ["Happy", "Calm", "Reflective", "Sad", "Energetic", "Intimate", "Moody", "Carefree"]
-        if mood not in valid_moods:
+        if mood not in VALID_MOODS:
             return func.HttpResponse(
-                json.dumps({"success": False, "error": f"Invalid mood. Must be one of: {', '.join(valid_moods)}"}),
+                json.dumps({"success": False, "error": f"Invalid mood. Must be one of: {', '.join(VALID_MOODS)}"}),
                 status_code=400,
                 headers=headers
             )
         
-        # Load episodes and get recommendation
-        episodes = load_episodes()
-        result = get_mood_recommendation(mood, episodes, exclude_ids)
+        # Get recommendation from the warm catalog
+        with span("recommend", mood=mood, mode=mode) as current:
+            with span("catalog_load"):
+                catalog = await get_catalog_async()
+            result = await recommend_with_fallback(mood, catalog, played, mode)
+            result["session"] = next_session(catalog, played, result).encode()
+            if current is not None:
+                current.set_attribute("engine", result.get("engine", ""))
         
         return func.HttpResponse(
             json.dumps(result),
@@ -244,6 +550,106 @@ def recommend_episode(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
+
+def parse_moods(req_body: dict) -> list[str]:
+    """Read the mood arc of a playlist request: "moods": [...] or "mood": "Calm" / "Calm→Energetic"."""
+    moods = req_body.get("moods")
+    if moods is None:
+        mood = req_body.get("mood") or ""
+        moods = [part.strip() for part in mood.replace("->", "→").split("→")] if isinstance(mood, str) and mood else []
+    return moods if isinstance(moods, list) else []
+
+
+@app.route(route="recommend/playlist", methods=["POST", "OPTIONS"], auth_level=func.AuthLevel.ANONYMOUS)
+async def recommend_playlist(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    HTTP endpoint for an ordered playlist of mood-matched episodes in one call.
+    
+    POST /api/recommend/playlist
+    Body: {"mood": "Calm" | "Calm→Energetic", "length": 5, "session": "<token>", "mode": "auto" | "fast"}
+    ("moods": ["Calm", "Energetic"] works too, as does the legacy "exclude": [1, 2])
+    
+    Returns: {"success": true, "playlist": [{"episode": {...}, "reason": "...", "mood": "Calm"}, ...],
+              "session": "<token>", "memoryReset": false, "engine": "llm" | "fast"}
+    """
+    
+    # Handle CORS preflight
+    if req.method == "OPTIONS":
+        return func.HttpResponse(
+            status_code=200,
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "POST, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type"
+            }
+        )
+    
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Content-Type": "application/json"
+    }
+    
+    def bad_request(error: str) -> func.HttpResponse:
+        return func.HttpResponse(json.dumps({"success": False, "error": error}), status_code=400, headers=headers)
+    
+    try:
+        req_body = req.get_json()
+        moods = parse_moods(req_body)
+        length = req_body.get("length", PLAYLIST_DEFAULT_LENGTH)
+        mode = req_body.get("mode", "auto")
+        played = parse_session(req_body)
+        
+        if not moods:
+            return bad_request("Missing 'mood' in request body")
+        if any(mood not in VALID_MOODS for mood in moods):
+            return bad_request(f"Invalid mood. Must be one of: {', '.join(VALID_MOODS)}")
+        if not isinstance(length, int) or isinstance(length, bool) or not 1 <= length <= PLAYLIST_MAX_LENGTH:
+            return bad_request(f"'length' must be an integer from 1 to {PLAYLIST_MAX_LENGTH}")
+        
+        with span("playlist", mood=" → ".join(moods), length=length, mode=mode) as current:
+            with span("catalog_load"):
+                catalog = await get_catalog_async()
+            length = min(length, len(catalog))
+            result = await playlist_with_fallback(moods, catalog, played, length, mode)
+            result["session"] = next_session(catalog, played, result).encode()
+            if current is not None:
+                current.set_attribute("engine", result.get("engine", ""))
+        
+        return func.HttpResponse(
+            json.dumps(result),
+            status_code=200,
+            headers=headers
+        )
+        
+    except ValueError as e:
+        logging.error(f"Invalid JSON in request: {e}")
+        return bad_request("Invalid JSON in request body")
+    except Exception as e:
+        logging.error(f"Error processing playlist request: {e}")
+        return func.HttpResponse(
+            json.dumps({"success": False, "error": "Internal server error"}),
+            status_code=500,
+            headers=headers
+        )
+
+
+# Timer Trigger: Tops up the per-mood recommendation pools every 30 minutes
+# (pools are also refilled in the background as /api/recommend drains them)
+@app.timer_trigger(
+    schedule="0 */30 * * * *",
+    arg_name="timer",
+    run_on_startup=False,
+    use_monitor=False
+)
+async def mood_pool_refresher(timer: func.TimerRequest) -> None:
+    """Timer-triggered function that refills the mood recommendation pools."""
+    if not mood_pools.enabled:
+        return
+    
+    await mood_pools.refill_all(VALID_MOODS, await get_catalog_async())
+    logger.info(f"Mood pools refreshed: { {mood: mood_pools.level(mood) for mood in VALID_MOODS} }")
+
+
 @app.route(route="health", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
 def health_check(req: func.HttpRequest) -> func.HttpResponse:
     """Health check endpoint."""
@@ -258,11 +664,20 @@ def health_check(req: func.HttpRequest) -> func.HttpResponse:
 # DAILY FACT & MATCH FEATURE
 # ==============================================================================
 
+# Labels for feeds whose entries don't read as events on their own
+FEED_LABELS = {"births": "Born: ", "deaths": "Died: ", "holidays": "Observance: "}
+# Top-scored entries handed to the model
+DAILY_EVENT_POOL_SIZE = int(os.environ.get("DAILY_EVENT_POOL_SIZE", "30"))
+
+
 async def fetch_wikipedia_events(month: int, day: int) -> list[dict[str, Any]]:
     """
     Fetch historical events from Wikipedia's "On this day" API.
     Focus on music, science, or space events when possible.
     
+    The events, births, deaths, selected and holidays feeds are fetched
+    concurrently (WIKIPEDIA_FEEDS) and merged into one scored pool.
+    
     Args:
         month: Month (1-12)
         day: Day of month (1-31)
@@ -270,74 +685,28 @@ async def fetch_wikipedia_events(month: int, day: int) -> list[dict[str, Any]]:
     Returns:
         List of historical events with text, year, and pages info
     """
-    url = f"https://en.wikipedia.org/api/rest_v1/feed/onthisday/events/{month:02d}/{day:02d}"
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers={"User-Agent": "SednaFM/1.0"})
-        response.raise_for_status()
-        data = response.json()
-    
-    events = data.get("events", [])
-    
-    # Filter for music, science, space related events if possible
-    # Keywords to prioritize
-    priority_keywords = [
-        # Music & Arts
-        "music", "song", "album", "band", "singer", "composer", "symphony", "concert",
-        "radio", "broadcast", "television", "film", "artist", "record", "orchestra",
-        
-        # Space & Astronomy
-        "space", "nasa", "astronaut", "moon", "mars", "satellite", "rocket", "mission",
-        "asteroid", "comet", "meteor", "probe", "lander", "rover", "spacecraft",
-        "telescope", "observatory", "planetary", "solar", "lunar", "eclipse",
-        "galaxy", "nebula", "cosmos", "esa", "jaxa", "spacex", "venus", "jupiter",
-        "saturn", "mercury", "orbit", "gravity", "hubble", "star", "supernova",
-        
-        # Science & Physics
-        "science", "discovery", "physicist", "scientist", "nobel", "experiment",
-        "quantum", "particle", "atom", "nuclear", "fusion", "laser", "radiation",
-        "relativity", "einstein", "energy", "electromagnetic", "theory",
-        
-        # Earth & Geology
-        "earth", "planet", "rotation", "axis", "equinox", "solstice",
-        "earthquake", "volcano", "tectonic", "magnetic", "pole", "glacier",
-        "continental", "geology", "fossil", "mineral", "ocean", "deep sea",
-        
-        # Nature & Environment
-        "nature", "wildlife", "species", "animal", "marine", "coral", "reef",
-        "ecosystem", "biodiversity", "forest", "rainforest", "arctic", "antarctic",
-        "climate", "weather", "storm", "hurricane", "endangered", "extinction",
-        
-        # Exploration & Discovery
-        "expedition", "explorer", "voyage", "submarine", "summit", "everest",
-        "cave", "underwater", "pioneer", "adventurer"
-    ]
+    # Served from the on-disk cache when fresh, revalidated with its ETag otherwise
+    with span("wikipedia_fetch", month=month, day=day):
+        feeds = await fetch_feeds(month, day)
     
-    # Score events based on relevance
-    scored_events = []
-    for event in events:
-        text = event.get("text", "").lower()
-        pages = event.get("pages", [])
-        
-        # Check event text and linked pages for keywords
-        score = 0
-        for keyword in priority_keywords:
-            if keyword in text:
-                score += 2
-            for page in pages:
-                if keyword in page.get("description", "").lower():
-                    score += 1
-                if keyword in page.get("extract", "").lower():
-                    score += 1
-        
-        scored_events.append({
-            "event": event,
-            "score": score
-        })
-    
-    # Sort by score (highest first) and take top 20 events
-    scored_events.sort(key=lambda x: x["score"], reverse=True)
-    top_events = [se["event"] for se in scored_events[:20]]
+    # Merge the feeds; "selected" mostly repeats entries from "events"
+    events, seen = [], set()
+    for feed, entries in feeds.items():
+        for entry in entries:
+            key = (entry.get("year"), entry.get("text"))
+            if key in seen:
+                continue
+            seen.add(key)
+            events.append({**entry, "text": FEED_LABELS.get(feed, "") + entry.get("text", "")})
+    
+    # Score events based on relevance (weighted keyword categories from keywords.json)
+    with span("scoring", events=len(events)):
+        scorer = get_keyword_scorer()
+        scored_events = [{"event": event, "score": scorer.score(event)} for event in events]
+        
+        # Sort by score (highest first) and keep the top of the pool
+        scored_events.sort(key=lambda x: x["score"], reverse=True)
+        top_events = [se["event"] for se in scored_events[:DAILY_EVENT_POOL_SIZE]]
     
     # Format events for the AI
     formatted_events = []
@@ -364,30 +733,33 @@ async def fetch_wikipedia_events(month: int, day: int) -> list[dict[str, Any]]:
     return formatted_events
 
 
-async def get_daily_match(events: list[dict], episodes: list[dict], count: int = 1) -> dict[str, Any] | list[dict[str, Any]]:
-    """
-    Use Azure OpenAI GPT-5.1 to select intriguing facts and match them with episodes.
+def hydrate_episodes(result: dict[str, Any] | list[dict[str, Any]], episodes: list[dict]) -> dict[str, Any] | list[dict[str, Any]]:
+    """Replace the model's episode references with full episode objects.
     
-    Args:
-        events: List of historical events from Wikipedia
-        episodes: List of Sedna FM episodes
-        count: Number of fact/episode pairs to generate (1 for single, 24 for batch)
-        
-    Returns:
-        Single match dict if count=1, or list of matches if count>1
+    The model only returns the episode id and title; description, songs,
+    genres and SoundCloud URL come from the catalog so the schedule schema
+    stays unchanged.
     """
-    # Use dedicated env vars for daily fact API (falls back to shared vars)
-    client = AzureOpenAI(
-        api_key=os.environ.get("AZURE_OPENAI_API_KEY_DAILY", os.environ.get("AZURE_OPENAI_API_KEY")),
-        api_version="2025-01-01-preview",
-        azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT_DAILY", os.environ.get("AZURE_OPENAI_ENDPOINT"))
+    by_id = {ep["id"]: ep for ep in episodes}
+    for match in result if isinstance(result, list) else [result]:
+        episode = match.get("episode") if isinstance(match, dict) else None
+        if isinstance(episode, dict) and episode.get("id") in by_id:
+            match["episode"] = dict(by_id[episode["id"]])
+    return result
+
+
+def build_daily_messages(events: list[dict], episodes: list[dict], count: int = 1, target_date: datetime | None = None) -> list[dict[str, str]]:
+    """Build the GPT-5.1 chat messages for a single fact (count=1) or a schedule."""
+    # Build the prompt with events and episodes, compactly encoded within the token budget
+    encoded = encode_daily_prompt(events, episodes, min_events=min(count, len(events)))
+    events_text = encoded.events_text
+    episodes_text = encoded.episodes_text
+    logger.info(
+        f"Daily prompt: {encoded.tokens} tokens for {encoded.events_used} events + {len(episodes)} episodes "
+        f"(saved {encoded.tokens_saved} of {encoded.legacy_tokens})"
     )
     
-    # Build the prompt with events and episodes
-    events_text = json.dumps(events, indent=2)
-    episodes_text = json.dumps(episodes, indent=2)
-    
-    today = datetime.now(timezone.utc)
+    today = target_date or datetime.now(timezone.utc)
     
     # Different prompts for single vs batch mode
     if count == 1:
@@ -416,11 +788,7 @@ You must respond with ONLY a valid JSON object in this exact format:
     "fact_wikipedia_url": "<URL of the most relevant Wikipedia page for this fact from the pages array>",
     "episode": {
         "id": <episode id>,
-        "title": "<episode title>",
-        "description": "<episode description>",
-        "soundcloudUrl": "<soundcloud url>",
-        "songs": ["<song1>", "<song2>", ...],
-        "music-genres": ["<genre1>", "<genre2>", ...]
+        "title": "<episode title>"
     },
     "match_reason": "<Brief explanation of why this episode matches the fact's vibe>"
 }
@@ -445,8 +813,8 @@ Selection criteria for episodes:
 - Consider the music genres and description of each episode
 - Be creative in finding unexpected but meaningful connections
 
-You must respond with ONLY a valid JSON array containing exactly {count} objects, each in this format:
-[
+You must respond with ONLY a valid JSON object with a "matches" array containing exactly {count} objects, each in this format:
+{{"matches": [
   {{
     "hour": 0,
     "fact_text": "<A well-written, engaging description (2-3 sentences)>",
@@ -454,18 +822,14 @@ You must respond with ONLY a valid JSON array containing exactly {count} objects
     "fact_wikipedia_url": "<URL of the most relevant Wikipedia page>",
     "episode": {{
         "id": <episode id>,
-        "title": "<episode title>",
-        "description": "<episode description>",
-        "soundcloudUrl": "<soundcloud url>",
-        "songs": ["<song1>", "<song2>", ...],
-        "music-genres": ["<genre1>", "<genre2>", ...]
+        "title": "<episode title>"
     }},
     "match_reason": "<Brief explanation of why this episode matches>"
   }},
   ... (continue for hours 1-{count-1})
-]
+]}}
 
-Do not include any other text, markdown, or explanation outside the JSON array."""
+Do not include any other text, markdown, or explanation outside the JSON object."""
 
     if count == 1:
         user_prompt = f"""Today is {today.strftime('%B %d')}. 
@@ -489,37 +853,270 @@ Here is the Sedna FM episode catalog:
 Create a schedule of {count} DIFFERENT facts (one for each hour 0-{count-1}), each matched with an episode.
 Ensure maximum variety - use different events and try to vary the episodes too!"""
 
-    response = client.chat.completions.create(
-        model=os.environ.get("AZURE_OPENAI_MODEL_DAILY", "gpt-5.1"),
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        max_completion_tokens=16384 if count > 1 else 4096  # More tokens for batch
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+# Stream batch generations so each hourly match is usable as soon as it is complete
+DAILY_STREAMING = os.environ.get("DAILY_STREAMING", "true").lower() == "true"
+
+
+async def stream_daily_matches(events: list[dict], episodes: list[dict], count: int, target_date: datetime | None = None) -> AsyncIterator[dict[str, Any]]:
+    """Stream a batch generation, yielding each hourly match once its object is complete.
+    
+    Args:
+        events: List of historical events from Wikipedia
+        episodes: List of Sedna FM episodes
+        count: Number of fact/episode pairs to generate
+    """
+    client = get_async_openai_client("DAILY")
+    # The "matches" array of the schedule object is parsed element by element
+    parser = JSONArrayStreamParser()
+    episode_ids = {ep["id"] for ep in episodes}
+    kept = invalid = 0
+    # The JSON is parsed while it streams, so parsing is part of the LLM call span
+    with span("llm_call", operation="daily_stream", count=count):
+        stream = await client.chat.completions.create(
+            model=os.environ.get("AZURE_OPENAI_MODEL_DAILY", "gpt-5.1"),
+            messages=build_daily_messages(events, episodes, count, target_date),
+            max_completion_tokens=16384,
+            stream=True,
+            stream_options={"include_usage": True},
+            **structured_output("daily_schedule", SCHEDULE_SCHEMA)
+        )
+        
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    logger.info(f"Daily stream usage: {chunk.usage.prompt_tokens} prompt / {chunk.usage.completion_tokens} completion tokens")
+                    record_usage("daily", chunk.usage)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for match in parser.feed(chunk.choices[0].delta.content):
+                    if not valid_match(match, episode_ids):
+                        invalid += 1
+                        continue
+                    kept += 1
+                    yield hydrate_episodes(match, episodes)
+        finally:
+            intact = parser.finished and not parser.errors and not invalid
+            record_parse("daily", parse_outcome(intact, min(kept, count), count), count, min(kept, count))
+    
+    if parser.errors or invalid:
+        logger.warning(f"Skipped {parser.errors} malformed and {invalid} invalid entries in the daily stream")
+    if not parser.started:
+        raise InvalidModelOutput("Daily stream did not contain a JSON array")
+    if not parser.finished:
+        logger.warning("Daily stream ended before the JSON array was complete")
+
+
+# Split batch generation into concurrent shards of hours (1 = one sequential call)
+DAILY_SHARDS = int(os.environ.get("DAILY_SHARDS", "4"))
+DAILY_SHARD_CONCURRENCY = int(os.environ.get("DAILY_SHARD_CONCURRENCY", "4"))
+# Times one episode may appear in a sharded day; extra matches are regenerated
+DAILY_EPISODE_MAX_REPEATS = int(os.environ.get("DAILY_EPISODE_MAX_REPEATS", "2"))
+
+
+def split_evenly(items: list, parts: int) -> list[list]:
+    """Split items into `parts` contiguous chunks whose sizes differ by at most one."""
+    size, extra = divmod(len(items), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+async def get_sharded_daily_matches(events: list[dict], episodes: list[dict], count: int, shards: int = DAILY_SHARDS, concurrency: int = DAILY_SHARD_CONCURRENCY, on_match: Callable[[dict], Awaitable[None]] | None = None, target_date: datetime | None = None) -> list[dict[str, Any]]:
+    """Generate a batch schedule as several smaller generations running concurrently.
+    
+    The hours are split into contiguous shards. Each shard gets a disjoint,
+    round-robin slice of the scored events (so every shard sees some of the
+    best ones) and the whole catalog, so every fact is matched against every
+    episode. Results are merged in hour order with duplicate facts dropped;
+    matches that would use an episode more than DAILY_EPISODE_MAX_REPEATS
+    times are regenerated with the episodes still available.
+    
+    Args:
+        events: Scored events from fetch_wikipedia_events (best first)
+        episodes: List of Sedna FM episodes
+        count: Total number of fact/episode pairs to generate
+        shards: Number of shards (capped by count and the number of events)
+        concurrency: Max shards generating at the same time
+        on_match: Optional coroutine called with each of the first shard's
+            matches as soon as it has been streamed (hour 0 lives there)
+        target_date: Day the schedule is for (defaults to today, UTC)
+    """
+    shards = max(1, min(shards, count, len(events)))
+    hours = split_evenly(list(range(count)), shards)
+    event_slices = [events[i::shards] for i in range(shards)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def generate_shard(i: int) -> list[dict[str, Any]]:
+        async with semaphore:
+            start = time.perf_counter()
+            with span("shard", index=i, hours=len(hours[i])):
+                # Short shards are repaired once, after the merge
+                matches = await get_daily_match(
+                    event_slices[i], episodes, count=len(hours[i]),
+                    on_match=on_match if i == 0 else None, shards=1, target_date=target_date, repair=False
+                )
+                matches = matches if isinstance(matches, list) else [matches]
+            logger.info(
+                f"Shard {i + 1}/{shards}: {len(matches)} matches for hours {hours[i][0]}-{hours[i][-1]} "
+                f"from {len(event_slices[i])} events in {time.perf_counter() - start:.1f}s"
+            )
+            return matches
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(generate_shard(i) for i in range(shards)), return_exceptions=True)
+    
+    # Shards can't see each other's picks, so variety is enforced here
+    merged, seen_facts, episode_uses = [], set(), Counter()
+    for i, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Shard {i + 1}/{shards} failed: {result}")
+            continue
+        for match in result:
+            key, episode_id = fact_key(match), match["episode"].get("id")
+            if key in seen_facts or episode_uses[episode_id] >= DAILY_EPISODE_MAX_REPEATS:
+                continue
+            seen_facts.add(key)
+            episode_uses[episode_id] += 1
+            merged.append(match)
+    
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if not merged and failures:
+        raise failures[0]
+    
+    # Shards number their hours from 0; renumber across the merged schedule,
+    # regenerating the hours of failed shards and dropped duplicates
+    hydrate_episodes(merged, episodes)
+    available = [ep for ep in episodes if episode_uses[ep["id"]] < DAILY_EPISODE_MAX_REPEATS]
+    merged = await fill_missing_matches(merged[:count], events, available or episodes, count, target_date)
+    
+    episode_ids = {m["episode"].get("id") for m in merged if isinstance(m.get("episode"), dict)}
+    logger.info(
+        f"Merged {len(merged)} matches ({len(episode_ids)} distinct episodes) from {shards} shards "
+        f"in {time.perf_counter() - start:.1f}s"
     )
+    return merged
+
+
+# Follow-up generations for hours missing from a partial batch (0 = keep the partial batch)
+DAILY_REPAIR_ROUNDS = int(os.environ.get("DAILY_REPAIR_ROUNDS", "1"))
+
+
+def fact_key(match: dict[str, Any]) -> str | None:
+    """Identity of a match's fact, for de-duplication."""
+    return match.get("fact_wikipedia_url") or match.get("fact_text")
+
+
+async def fill_missing_matches(matches: list[dict[str, Any]], events: list[dict], episodes: list[dict], count: int, target_date: datetime | None = None) -> list[dict[str, Any]]:
+    """Regenerate only the hours a partial batch is missing, then number the hours.
     
-    # Parse the JSON response
-    response_text = response.choices[0].message.content.strip()
+    Each follow-up asks for just the missing number of facts from the events
+    not used yet, so one malformed entry costs a small generation instead of
+    the whole batch.
+    """
+    for _ in range(DAILY_REPAIR_ROUNDS):
+        missing = count - len(matches)
+        if missing <= 0:
+            break
+        used = {fact_key(m) for m in matches}
+        fresh = [e for e in events if not used & {page.get("url") for page in e.get("pages", [])}]
+        logger.warning(f"Regenerating {missing} of {count} hourly matches")
+        try:
+            with span("repair", missing=missing):
+                extra = await get_daily_match(fresh if len(fresh) >= missing else events, episodes, count=missing,
+                                              shards=1, target_date=target_date, repair=False)
+        except Exception as e:
+            logger.warning(f"Regenerating the missing matches failed, keeping {len(matches)}: {e}")
+            break
+        added = [m for m in (extra if isinstance(extra, list) else [extra]) if fact_key(m) not in used][:missing]
+        record_regenerated("daily", len(added))
+        matches = matches + added
     
-    try:
-        # Clean up potential markdown code blocks
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
-        
-        result = json.loads(response_text.strip())
-        return result
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse AI response as JSON: {e}")
-        logger.error(f"Response was: {response_text}")
-        raise
+    for hour, match in enumerate(matches):
+        match["hour"] = hour
+    return matches
+
+
+async def get_daily_match(events: list[dict], episodes: list[dict], count: int = 1, on_match: Callable[[dict], Awaitable[None]] | None = None, shards: int = DAILY_SHARDS, target_date: datetime | None = None, repair: bool = True) -> dict[str, Any] | list[dict[str, Any]]:
+    """
+    Use Azure OpenAI GPT-5.1 to select intriguing facts and match them with episodes.
+    
+    Args:
+        events: List of historical events from Wikipedia
+        episodes: List of Sedna FM episodes
+        count: Number of fact/episode pairs to generate (1 for single, 24 for batch)
+        on_match: Optional coroutine called with each batch match as soon as
+            it has been streamed (e.g. to commit hour 0 early)
+        shards: Batch generations are split into this many concurrent shards
+        target_date: Day the facts are for (defaults to today, UTC)
+        repair: Regenerate the hours missing from a partial batch
+        
+    Returns:
+        Single match dict if count=1, or list of matches if count>1
+    """
+    if count > 1 and shards > 1:
+        return await get_sharded_daily_matches(events, episodes, count, shards, on_match=on_match, target_date=target_date)
+    
+    if count > 1 and DAILY_STREAMING:
+        matches = []
+        try:
+            async for match in stream_daily_matches(events, episodes, count, target_date):
+                matches.append(match)
+                if on_match:
+                    await on_match(match)
+        except Exception as e:
+            if not matches:
+                raise
+            # Keep everything parsed before the stream was cut off
+            logger.warning(f"Daily stream failed after {len(matches)} matches, keeping them: {e}")
+        return await fill_missing_matches(matches[:count], events, episodes, count, target_date) if repair else matches[:count]
+    
+    # Pooled client for the daily fact env vars (falls back to shared vars)
+    client = get_async_openai_client("DAILY")
+    with span("llm_call", operation="daily", count=count):
+        response = await client.chat.completions.create(
+            model=os.environ.get("AZURE_OPENAI_MODEL_DAILY", "gpt-5.1"),
+            messages=build_daily_messages(events, episodes, count, target_date),
+            max_completion_tokens=16384 if count > 1 else 4096,  # More tokens for batch
+            **structured_output("daily_schedule" if count > 1 else "daily_match", SCHEDULE_SCHEMA if count > 1 else MATCH_SCHEMA)
+        )
+        record_usage("daily", response.usage)
+    
+    # Keep every valid match, even from a damaged response
+    response_text = response.choices[0].message.content or ""
+    with span("json_parse", operation="daily"):
+        entries, intact = salvage_entries(response_text, "matches")
+        episode_ids = {ep["id"] for ep in episodes}
+        matches = [match for match in entries if valid_match(match, episode_ids)][:count]
+    record_parse("daily", parse_outcome(intact and len(matches) == len(entries), len(matches), count), count, len(matches))
+    
+    if not matches:
+        logger.error(f"No usable match in AI response: {response_text[:1000]}")
+        raise InvalidModelOutput("Daily response contained no usable match")
+    if len(matches) < len(entries) or not intact:
+        logger.warning(f"Salvaged {len(matches)} of {count} matches from a damaged daily response")
+    
+    hydrate_episodes(matches, episodes)
+    if count == 1:
+        return matches[0]
+    return await fill_missing_matches(matches, events, episodes, count, target_date) if repair else matches
 
 
 def commit_to_github(data: dict[str, Any], date_str: str, commit_message: str = None) -> bool:
     """
     Commit the daily match JSON to GitHub.
     
+    Blocking (the store can sleep through a rate limit), so async callers
+    run it with asyncio.to_thread to keep the event loop free.
+    
     Args:
         data: The data to commit (can be full schedule or single fact)
         date_str: Date string for the file (YYYY-MM-DD)
@@ -528,52 +1125,30 @@ def commit_to_github(data: dict[str, Any], date_str: str, commit_message: str =
     Returns:
         True if successful, False otherwise
     """
-    github_token = os.environ.get("GITHUB_TOKEN")
-    repo_name = os.environ.get("GITHUB_REPO", "yasminSarbaoui93/yasminSarbaoui93.github.io")
-    branch = os.environ.get("GITHUB_BRANCH", "main")
-    
-    if not github_token:
+    store = get_github_store()
+    if store is None:
         logger.error("GITHUB_TOKEN environment variable not set")
         return False
     
     try:
-        g = Github(github_token)
-        repo = g.get_repo(repo_name)
-        
         # Add metadata
         data["date"] = date_str
         data["updated_at"] = datetime.now(timezone.utc).isoformat()
         
-        # Convert to JSON string
-        content = json.dumps(data, indent=2, ensure_ascii=False)
-        
-        # File path in repo
-        file_path = "data/daily_match.json"
         if not commit_message:
             commit_message = f"🌟 Daily fact & match for {date_str}"
         
-        try:
-            # Try to get existing file
-            existing_file = repo.get_contents(file_path, ref=branch)
-            # Update existing file
-            repo.update_file(
-                path=file_path,
-                message=commit_message,
-                content=content,
-                sha=existing_file.sha,
-                branch=branch
-            )
-            logger.info(f"Updated {file_path} in {repo_name}")
-        except Exception:
-            # File doesn't exist, create it
-            repo.create_file(
-                path=file_path,
-                message=commit_message,
-                content=content,
-                branch=branch
-            )
-            logger.info(f"Created {file_path} in {repo_name}")
-        
+        # Normalized schedules are written minified (precompressed siblings only with SCHEDULE_COMPRESSION)
+        file_path = "data/daily_match.json"
+        content = serialize_schedule(data)
+        with span("github_commit", path=file_path, size=len(content)):
+            store.write_bytes(file_path, content, commit_message)
+            if data.get("schema_version", 0) >= 3:
+                for suffix, compressed in compressed_siblings(content).items():
+                    try:
+                        store.write_bytes(file_path + suffix, compressed, commit_message)
+                    except Exception as e:
+                        logger.warning(f"Failed to commit {file_path}{suffix}: {e}")
         return True
         
     except Exception as e:
@@ -591,23 +1166,71 @@ def get_github_file(file_path: str) -> dict[str, Any] | None:
     Returns:
         Parsed JSON content or None if not found
     """
-    github_token = os.environ.get("GITHUB_TOKEN")
-    repo_name = os.environ.get("GITHUB_REPO", "yasminSarbaoui93/yasminSarbaoui93.github.io")
-    branch = os.environ.get("GITHUB_BRANCH", "main")
-    
-    if not github_token:
+    store = get_github_store()
+    if store is None:
         return None
     
     try:
-        g = Github(github_token)
-        repo = g.get_repo(repo_name)
-        file_content = repo.get_contents(file_path, ref=branch)
-        return json.loads(file_content.decoded_content.decode('utf-8'))
+        return store.read_json(file_path)
     except Exception as e:
         logger.warning(f"Could not get {file_path} from GitHub: {e}")
         return None
 
 
+# Schedule state lives in the state store; GitHub is only where it is published
+SCHEDULE_STATE_KEY = "daily_match"
+
+
+def load_schedule() -> dict[str, Any] | None:
+    """Return the current schedule from the state store (blocking).
+    
+    An empty store is seeded once from the published GitHub file.
+    """
+    store = get_state_store()
+    current = store.get(SCHEDULE_STATE_KEY)
+    if current is not None:
+        return current[0]
+    
+    published = get_github_file("data/daily_match.json")
+    if not published:
+        return None
+    schedule, _ = store.update(SCHEDULE_STATE_KEY, lambda existing: existing or published)
+    return schedule
+
+
+def pop_next_fact(current_hour: int, once_per_hour: bool = True) -> tuple[dict[str, Any], bool]:
+    """Pop the next queued fact with a compare-and-swap (blocking).
+    
+    Returns (schedule, popped); only one instance pops each hour.
+    """
+    return get_state_store().update(
+        SCHEDULE_STATE_KEY, lambda state: publish_next_fact(state, current_hour, once_per_hour=once_per_hour)
+    )
+
+
+def publish_schedule(schedule: dict[str, Any], date_str: str, commit_message: str = None) -> bool:
+    """Store a new schedule as the current state, then publish it to GitHub (blocking)."""
+    try:
+        get_state_store().replace(SCHEDULE_STATE_KEY, schedule)
+    except Exception as e:
+        logger.error(f"Failed to store schedule state: {e}")
+    return commit_to_github(schedule, date_str, commit_message)
+
+
+async def generate_schedule(target_date: datetime) -> dict[str, Any]:
+    """Generate the full 24-hour schedule for one date."""
+    with span("generate_schedule", date=target_date.strftime("%Y-%m-%d")):
+        events = await fetch_wikipedia_events(target_date.month, target_date.day)
+        if not events:
+            raise ValueError(f"No events fetched for {target_date.strftime('%m-%d')}")
+        hourly_matches = await get_daily_match(events, load_episodes(), count=24, target_date=target_date)
+        return build_schedule(hourly_matches, target_date.strftime("%Y-%m-%d"))
+
+
+# Pre-generates upcoming schedules so midnight only has to promote one
+range_generator = RangeGenerator(generate_schedule)
+
+
 # Timer Trigger: Runs at midnight UTC to generate all 24 facts for the day
 # CRON expression: second minute hour day month day-of-week
 # 0 0 0 * * * = At 00:00 UTC every day
@@ -621,6 +1244,9 @@ async def daily_batch_generator(timer: func.TimerRequest) -> None:
     """
     Timer-triggered function that runs at midnight UTC to generate
     all 24 hourly facts for the day using GPT-5.1.
+    
+    If schedule_lookahead already staged today's schedule, it is just
+    promoted; generating it here is the fallback.
     """
     logger.info("Daily Batch Generator function started (midnight)")
     
@@ -631,57 +1257,114 @@ async def daily_batch_generator(timer: func.TimerRequest) -> None:
         # Get current date
         now = datetime.now(timezone.utc)
         date_str = now.strftime("%Y-%m-%d")
-        month = now.month
-        day = now.day
-        
-        logger.info(f"Generating 24 hourly facts for {date_str} ({month}/{day})")
-        
-        # Step A: Fetch historical events from Wikipedia
-        logger.info("Fetching historical events from Wikipedia...")
-        events = await fetch_wikipedia_events(month, day)
-        logger.info(f"Fetched {len(events)} events")
-        
-        if not events:
-            logger.warning("No events fetched from Wikipedia")
-            return
-        
-        # Step B: Load episodes
-        logger.info("Loading Sedna FM episodes...")
-        episodes = load_episodes()
-        logger.info(f"Loaded {len(episodes)} episodes")
-        
-        # Step C: Use GPT-5.1 to generate 24 fact/episode pairs
-        logger.info("Generating 24 hourly matches with GPT-5.1...")
-        hourly_matches = await get_daily_match(events, episodes, count=24)
-        logger.info(f"Generated {len(hourly_matches)} hourly matches")
-        
-        # Step D: Create schedule structure
-        # First fact (hour 0) becomes current, rest go to queue
-        current_fact = hourly_matches[0] if hourly_matches else None
-        queue = hourly_matches[1:] if len(hourly_matches) > 1 else []
-        
-        schedule_data = {
-            "current_hour": 0,
-            "current_fact": current_fact,
-            "queue": queue,
-            "published": [current_fact] if current_fact else [],
-            "generated_at": now.isoformat()
-        }
-        
-        # Step E: Commit to GitHub
-        logger.info("Committing schedule to GitHub...")
-        success = commit_to_github(schedule_data, date_str, f"🌅 Generated 24 hourly facts for {date_str}")
         
-        if success:
-            logger.info("Daily batch successfully generated and committed!")
-        else:
-            logger.error("Failed to commit daily batch to GitHub")
+        # One parent span, so Steps A-E show up as its children
+        with span("daily_batch", date=date_str):
+            month = now.month
+            day = now.day
+            
+            staged = await asyncio.to_thread(range_generator.staged, date_str)
+            if staged:
+                logger.info(f"Promoting pre-generated schedule for {date_str}")
+                if await asyncio.to_thread(publish_schedule, staged, date_str, f"🌅 Published pre-generated facts for {date_str}"):
+                    logger.info("Daily schedule promoted and committed!")
+                    await asyncio.to_thread(range_generator.discard, date_str)
+                    return
+                logger.error("Failed to commit the pre-generated schedule, regenerating")
+            
+            logger.info(f"Generating 24 hourly facts for {date_str} ({month}/{day})")
+            
+            # Step A: Fetch historical events from Wikipedia
+            logger.info("Fetching historical events from Wikipedia...")
+            events = await fetch_wikipedia_events(month, day)
+            logger.info(f"Fetched {len(events)} events")
+            
+            if not events:
+                logger.warning("No events fetched from Wikipedia")
+                return
+            
+            # Step B: Load episodes
+            logger.info("Loading Sedna FM episodes...")
+            episodes = load_episodes()
+            logger.info(f"Loaded {len(episodes)} episodes")
+            
+            # Step C: Use GPT-5.1 to generate 24 fact/episode pairs. With streaming,
+            # hour 0 is committed as soon as it arrives while the rest generates
+            first_commit: list[asyncio.Task] = []
+            
+            async def commit_first_hour(match: dict[str, Any]) -> None:
+                if first_commit:
+                    return
+                early_schedule = build_schedule([match], date_str, now.isoformat())
+                first_commit.append(asyncio.create_task(asyncio.to_thread(
+                    publish_schedule, early_schedule, date_str, f"🌅 Hour 0 fact for {date_str}"
+                )))
+            
+            logger.info("Generating 24 hourly matches with GPT-5.1...")
+            hourly_matches = await get_daily_match(events, episodes, count=24, on_match=commit_first_hour)
+            if first_commit:
+                await first_commit[0]
+            logger.info(f"Generated {len(hourly_matches)} hourly matches")
+            
+            # Step D: Create the time-indexed schedule; each fact carries its UTC
+            # hour window, so readers resolve the current fact from the clock
+            schedule_data = build_schedule(hourly_matches, date_str, now.isoformat())
+            
+            # Step E: Commit to GitHub
+            logger.info("Committing schedule to GitHub...")
+            success = await asyncio.to_thread(publish_schedule, schedule_data, date_str, f"🌅 Generated 24 hourly facts for {date_str}")
+            
+            if success:
+                logger.info("Daily batch successfully generated and committed!")
+                if staged:
+                    await asyncio.to_thread(range_generator.discard, date_str)
+            else:
+                logger.error("Failed to commit daily batch to GitHub")
             
     except Exception as e:
         logger.error(f"Error in daily batch generator: {e}")
         raise
 
 
+# Timer Trigger: Runs daily at 12:00 UTC to stage the upcoming days' schedules
+@app.timer_trigger(
+    schedule="0 0 12 * * *",
+    arg_name="timer",
+    run_on_startup=False,
+    use_monitor=True
+)
+async def schedule_lookahead(timer: func.TimerRequest) -> None:
+    """
+    Timer-triggered function that generates and stages schedules for the
+    next SCHEDULE_LOOKAHEAD_DAYS days that don't have one yet.
+    """
+    logger.info("Schedule Lookahead function started")
+    results = await range_generator.lookahead()
+    logger.info(f"Schedule lookahead: {results}")
+
+
+# Timer Trigger: Every 10 minutes, generates a few queued dates (lookahead/backfill)
+@app.timer_trigger(
+    schedule="0 */10 * * * *",
+    arg_name="timer",
+    run_on_startup=False,
+    use_monitor=True
+)
+async def schedule_backfill(timer: func.TimerRequest) -> None:
+    """
+    Timer-triggered function that generates up to SCHEDULE_RANGE_BATCH_DAYS
+    queued dates per run, so long ranges never run past the host timeout.
+    """
+    results = await range_generator.drain()
+    if results:
+        logger.info(f"Schedule backfill: {results}")
+
+
+# Only needed to advance legacy queue-based schedules; time-indexed
+# schedules resolve the current fact from the clock
+HOURLY_PUBLISHER_ENABLED = os.environ.get("HOURLY_PUBLISHER_ENABLED", "false").lower() == "true"
+
+
 # Timer Trigger: Runs every hour at :00 to publish next fact from queue
 # CRON expression: 0 0 * * * * = At minute 0 of every hour
 @app.timer_trigger(
@@ -694,7 +1377,13 @@ async def hourly_fact_publisher(timer: func.TimerRequest) -> None:
     """
     Timer-triggered function that runs every hour to publish
     the next fact from the queue. No AI calls - just pops from queue.
+    
+    A no-op unless HOURLY_PUBLISHER_ENABLED is set, and even then only
+    legacy queue-based schedules are rewritten.
     """
+    if not HOURLY_PUBLISHER_ENABLED:
+        return
+    
     logger.info("Hourly Fact Publisher function started")
     
     if timer.past_due:
@@ -711,11 +1400,11 @@ async def hourly_fact_publisher(timer: func.TimerRequest) -> None:
             return
         
         # Get current schedule from GitHub
-        logger.info("Fetching current schedule from GitHub...")
-        schedule = get_github_file("data/daily_match.json")
+        logger.info("Loading current schedule state...")
+        schedule = await asyncio.to_thread(load_schedule)
         
         if not schedule:
-            logger.warning("No schedule found in GitHub")
+            logger.warning("No schedule found")
             return
         
         # Check if schedule is for today
@@ -723,25 +1412,26 @@ async def hourly_fact_publisher(timer: func.TimerRequest) -> None:
             logger.warning(f"Schedule is for {schedule.get('date')}, not today ({date_str})")
             return
         
-        queue = schedule.get("queue", [])
-        published = schedule.get("published", [])
+        if is_time_indexed(schedule):
+            current = resolve_current_fact(schedule, now)
+            logger.info(f"Time-indexed schedule, nothing to publish (hour {current_hour}: {(current or {}).get('fact_year')})")
+            return
         
-        if not queue:
+        if not schedule.get("queue"):
             logger.warning("Queue is empty - no more facts to publish")
             return
         
-        # Pop next fact from queue
-        next_fact = queue.pop(0)
-        
-        # Update schedule
-        schedule["current_hour"] = current_hour
-        schedule["current_fact"] = next_fact
-        schedule["queue"] = queue
-        schedule["published"] = published + [next_fact]
+        # Pop next fact from queue with a compare-and-swap, so only one
+        # instance publishes each hour
+        schedule, popped = await asyncio.to_thread(pop_next_fact, current_hour)
+        if not popped:
+            logger.info(f"Hour {current_hour} already published")
+            return
         
         # Commit updated schedule
         logger.info(f"Publishing fact for hour {current_hour}...")
-        success = commit_to_github(
+        success = await asyncio.to_thread(
+            commit_to_github,
             schedule, 
             date_str, 
             f"⏰ Hourly fact #{current_hour} for {date_str}"
@@ -768,8 +1458,13 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
     - GET /api/generate-daily-fact?commit=true        → Generate & commit single fact
     - GET /api/generate-daily-fact?batch=true         → Generate 24 hourly facts (preview)
     - GET /api/generate-daily-fact?batch=true&commit=true → Generate & commit full schedule
-    - GET /api/generate-daily-fact?publish=true       → Publish next fact from queue
+    - GET /api/generate-daily-fact?publish=true       → Current fact (publishes next from a legacy queue)
     - GET /api/generate-daily-fact?date=2025-12-20    → Specify date
+    - GET /api/generate-daily-fact?start=2025-12-01&end=2025-12-07 → Stage schedules for a
+      date range (backfill; add force=true to regenerate staged dates). Ranges
+      longer than SCHEDULE_RANGE_BATCH_DAYS are queued for schedule_backfill (202)
+    - GET /api/generate-daily-fact?lookahead=true     → Queue the next SCHEDULE_LOOKAHEAD_DAYS days
+      and stage the first of them
     """
     logger.info("Manual daily fact generation triggered")
     
@@ -783,6 +1478,43 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
         # Get mode from query params
         batch_mode = req.params.get("batch", "false").lower() == "true"
         publish_mode = req.params.get("publish", "false").lower() == "true"
+        
+        # Mode: Stage schedules for a date range or the lookahead window
+        if req.params.get("lookahead", "false").lower() == "true":
+            results = await range_generator.lookahead()
+            return func.HttpResponse(json.dumps({"staged": results}, indent=2), status_code=200, headers=headers)
+        
+        if req.params.get("start"):
+            try:
+                start = datetime.strptime(req.params["start"], "%Y-%m-%d").date()
+                end = datetime.strptime(req.params.get("end", req.params["start"]), "%Y-%m-%d").date()
+            except ValueError:
+                return func.HttpResponse(
+                    json.dumps({"error": "Invalid date format. Use YYYY-MM-DD"}),
+                    status_code=400,
+                    headers=headers
+                )
+            dates = date_range(start, end)
+            if not dates or len(dates) > MAX_RANGE_DAYS:
+                return func.HttpResponse(
+                    json.dumps({"error": f"Range must cover 1 to {MAX_RANGE_DAYS} days"}),
+                    status_code=400,
+                    headers=headers
+                )
+            force = req.params.get("force", "false").lower() == "true"
+            if len(dates) > BATCH_DAYS:
+                # Too long for one request (the HTTP limit is 230s): the timer generates them
+                if not range_generator.shared:
+                    logger.warning(f"Not queuing {len(dates)} dates: the state store isn't shared between instances")
+                    return func.HttpResponse(
+                        json.dumps({"error": f"Queuing ranges needs a shared (Blob) state store; request at most {BATCH_DAYS} days"}),
+                        status_code=503,
+                        headers=headers
+                    )
+                pending = await asyncio.to_thread(range_generator.enqueue, dates, force)
+                return func.HttpResponse(json.dumps({"queued": [d.isoformat() for d in dates], "pending": pending}, indent=2), status_code=202, headers=headers)
+            results = await range_generator.generate_range(dates, force=force)
+            return func.HttpResponse(json.dumps({"staged": results}, indent=2), status_code=200, headers=headers)
         commit_param = req.params.get("commit", "false").lower() == "true"
         
         # Get date from query params or use today
@@ -806,7 +1538,7 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
         
         # Mode: Publish next from queue
         if publish_mode:
-            schedule = get_github_file("data/daily_match.json")
+            schedule = await asyncio.to_thread(load_schedule)
             
             if not schedule:
                 return func.HttpResponse(
@@ -815,24 +1547,34 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
                     headers=headers
                 )
             
-            queue = schedule.get("queue", [])
-            if not queue:
+            # Time-indexed schedules need no publishing; report what is live now
+            if is_time_indexed(schedule):
+                now = datetime.now(timezone.utc)
+                return func.HttpResponse(
+                    json.dumps({
+                        "current_hour": now.hour,
+                        "current_fact": resolve_current_fact(schedule, now),
+                        "date": schedule.get("date"),
+                        "schema_version": schedule.get("schema_version")
+                    }, indent=2, ensure_ascii=False),
+                    status_code=200,
+                    headers=headers
+                )
+            
+            if not schedule.get("queue"):
                 return func.HttpResponse(
                     json.dumps({"error": "Queue is empty", "schedule": schedule}),
                     status_code=404,
                     headers=headers
                 )
             
-            # Pop and publish
-            next_fact = queue.pop(0)
-            schedule["current_hour"] = current_hour
-            schedule["current_fact"] = next_fact
-            schedule["queue"] = queue
-            schedule["published"] = schedule.get("published", []) + [next_fact]
-            
+            # Pop and publish (the preview leaves the stored state untouched)
             if commit_param:
-                commit_to_github(schedule, date_str, f"⏰ Manual publish hour {current_hour}")
+                schedule, _ = await asyncio.to_thread(pop_next_fact, current_hour, False)
+                await asyncio.to_thread(commit_to_github, schedule, date_str, f"⏰ Manual publish hour {current_hour}")
                 schedule["committed"] = True
+            else:
+                schedule = publish_next_fact(schedule, current_hour, once_per_hour=False)
             
             return func.HttpResponse(
                 json.dumps(schedule, indent=2, ensure_ascii=False),
@@ -855,21 +1597,11 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
         
         # Mode: Batch (24 facts)
         if batch_mode:
-            hourly_matches = await get_daily_match(events, episodes, count=24)
-            
-            current_fact = hourly_matches[0] if hourly_matches else None
-            queue = hourly_matches[1:] if len(hourly_matches) > 1 else []
-            
-            schedule_data = {
-                "current_hour": 0,
-                "current_fact": current_fact,
-                "queue": queue,
-                "published": [current_fact] if current_fact else [],
-                "generated_at": datetime.now(timezone.utc).isoformat()
-            }
+            hourly_matches = await get_daily_match(events, episodes, count=24, target_date=target_date)
+            schedule_data = build_schedule(hourly_matches, date_str)
             
             if commit_param:
-                commit_to_github(schedule_data, date_str, f"🌅 Manual batch for {date_str}")
+                await asyncio.to_thread(publish_schedule, schedule_data, date_str, f"🌅 Manual batch for {date_str}")
                 schedule_data["committed"] = True
             
             return func.HttpResponse(
@@ -879,17 +1611,12 @@ async def generate_daily_fact_manual(req: func.HttpRequest) -> func.HttpResponse
             )
         
         # Mode: Single fact (default)
-        daily_match = await get_daily_match(events, episodes, count=1)
+        daily_match = await get_daily_match(events, episodes, count=1, target_date=target_date)
         
         if commit_param:
-            # Wrap single fact in schedule structure for compatibility
-            schedule_data = {
-                "current_hour": current_hour,
-                "current_fact": daily_match,
-                "queue": [],
-                "published": [daily_match]
-            }
-            commit_to_github(schedule_data, date_str)
+            # Wrap single fact in a schedule covering the whole day
+            schedule_data = build_schedule([daily_match], date_str)
+            await asyncio.to_thread(publish_schedule, schedule_data, date_str)
             daily_match["committed"] = True
         
         return func.HttpResponse(
@@ -0,0 +1,201 @@
+"""
+Sedna FM GitHub Store
+- JSON file persistence in the site repository through the GitHub contents API
+- One long-lived authenticated client per worker
+- Remembers each file's blob sha so writes skip the lookup, revalidates
+  reads with If-None-Match, and backs off on the rate-limit headers
+- Counts API round trips per call
+- httpx is imported with the first store, so HTTP-only cold starts skip it
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from telemetry import record_retries
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+DEFAULT_REPO = "yasminSarbaoui93/yasminSarbaoui93.github.io"
+# Longest rate-limit wait worth sleeping through before giving up
+MAX_BACKOFF = float(os.environ.get("GITHUB_MAX_BACKOFF_SECONDS", "60"))
+
+
+class GitHubError(Exception):
+    """A GitHub API call failed."""
+
+
+class GitHubStore:
+    """Read and write JSON files on one branch of a repository.
+
+    Args:
+        token: GitHub token with contents write access
+        repo: "owner/name"
+        branch: Branch to read from and commit to
+        api_url: API root (a local fake in benchmarks)
+        max_retries: Retries after a rate-limited response
+        max_backoff: Longest wait in seconds before a retry
+    """
+
+    def __init__(self, token: str, repo: str = DEFAULT_REPO, branch: str = "main", api_url: str = GITHUB_API_URL,
+                 max_retries: int = 2, max_backoff: float = MAX_BACKOFF):
+        self.repo = repo
+        self.branch = branch
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.round_trips = 0
+        self.rate_remaining: int | None = None
+        self._shas: dict[str, str] = {}
+        self._etags: dict[str, tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Only the timers write to GitHub, so httpx is loaded with the first store
+        import httpx
+        self._client = httpx.Client(
+            base_url=api_url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "SednaFM/1.0",
+            },
+            timeout=httpx.Timeout(30, connect=5),
+        )
+
+    def _contents_url(self, path: str) -> str:
+        return f"/repos/{self.repo}/contents/{path}"
+
+    def _rate_limit_wait(self, response: "httpx.Response") -> float | None:
+        """Seconds to wait before retrying a rate-limited response, else None."""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset", time.time()))
+            return max(0.0, reset - time.time()) + 1
+        return None
+
+    def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """Send one API request, sleeping through short rate-limit windows."""
+        for attempt in range(self.max_retries + 1):
+            response = self._client.request(method, url, **kwargs)
+            self.round_trips += 1
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None and remaining.isdigit():
+                self.rate_remaining = int(remaining)
+
+            wait = self._rate_limit_wait(response)
+            if wait is None or attempt == self.max_retries:
+                record_retries("github", attempt)
+                return response
+            if wait > self.max_backoff:
+                logger.warning(f"GitHub rate limit resets in {wait:.0f}s, not waiting")
+                record_retries("github", attempt)
+                return response
+            logger.warning(f"GitHub rate limited, retrying in {wait:.1f}s")
+            time.sleep(wait)
+        return response
+
+    def _get(self, path: str) -> bytes | None:
+        """Conditional GET of a file's content; refreshes the remembered sha."""
+        headers = {}
+        cached = self._etags.get(path)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = self._request("GET", self._contents_url(path), params={"ref": self.branch}, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+        if response.status_code == 404:
+            self._shas.pop(path, None)
+            self._etags.pop(path, None)
+            return None
+        if response.status_code != 200:
+            raise GitHubError(f"GET {path} failed: {response.status_code} {response.text[:200]}")
+
+        body = response.json()
+        content = base64.b64decode(body["content"])
+        self._shas[path] = body["sha"]
+        if response.headers.get("ETag"):
+            self._etags[path] = (response.headers["ETag"], content)
+        return content
+
+    def read_json(self, path: str) -> Any | None:
+        """Return the parsed JSON file, or None if it doesn't exist.
+
+        A 304 answer to the conditional request serves the copy from the
+        previous read (and doesn't count against the rate limit).
+        """
+        with self._lock:
+            start = self.round_trips
+            content = self._get(path)
+            logger.info(f"Read {path} from {self.repo} ({self.round_trips - start} round trips)")
+        return json.loads(content.decode("utf-8")) if content is not None else None
+
+    def write_bytes(self, path: str, content: bytes, message: str) -> None:
+        """Create or update a file in one commit.
+
+        The blob sha from the last read or write is sent with the update, so
+        a warm worker commits in a single round trip. If someone else changed
+        the file in the meantime, the sha is refreshed and the write retried
+        once.
+        """
+        encoded = base64.b64encode(content).decode("ascii")
+        with self._lock:
+            start = self.round_trips
+            if path not in self._shas:
+                self._get(path)
+
+            for attempt in range(2):
+                body = {"message": message, "content": encoded, "branch": self.branch}
+                if path in self._shas:
+                    body["sha"] = self._shas[path]
+                response = self._request("PUT", self._contents_url(path), json=body)
+                # 409: sha is stale, 422: sha missing for an existing file
+                if response.status_code in (409, 422) and attempt == 0:
+                    self._etags.pop(path, None)
+                    self._get(path)
+                    continue
+                break
+
+            if response.status_code not in (200, 201):
+                raise GitHubError(f"PUT {path} failed: {response.status_code} {response.text[:200]}")
+            self._shas[path] = response.json()["content"]["sha"]
+            # The next read has to fetch the new content
+            self._etags.pop(path, None)
+            action = "Created" if response.status_code == 201 else "Updated"
+            logger.info(f"{action} {path} in {self.repo}, {len(content)} bytes ({self.round_trips - start} round trips)")
+
+
+_store: GitHubStore | None = None
+_store_key: tuple | None = None
+_store_lock = threading.Lock()
+
+
+def get_github_store() -> GitHubStore | None:
+    """Return the worker's GitHubStore for the GITHUB_* settings, or None without a token."""
+    global _store, _store_key
+    token = os.environ.get("GITHUB_TOKEN")
+    if not token:
+        return None
+    key = (
+        token,
+        os.environ.get("GITHUB_REPO", DEFAULT_REPO),
+        os.environ.get("GITHUB_BRANCH", "main"),
+        os.environ.get("GITHUB_API_URL", GITHUB_API_URL),
+    )
+    with _store_lock:
+        if _store is None or _store_key != key:
+            _store = GitHubStore(token, key[1], key[2], key[3])
+            _store_key = key
+        return _store
@@ -0,0 +1,118 @@
+"""
+Sedna FM Keyword Scorer
+- Relevance scoring of Wikipedia "On this day" events against weighted keyword categories
+- All keywords matched in one pass per field with a single compiled trie regex
+- Categories, keyword weights and field weights loaded from keywords.json
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+KEYWORDS_PATH = os.environ.get("KEYWORDS_CONFIG_PATH", os.path.join(os.path.dirname(__file__), "keywords.json"))
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """Regex matching the longest of `words` starting at the current position."""
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            # Greedy optional: prefer the longer keyword, fall back to this one
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordScorer:
+    """Score events by the distinct keywords found in their text and linked pages.
+
+    Matching is case-insensitive substring matching (so "star" also counts
+    in "starship"), each distinct keyword counting once per field. A field's
+    score is the sum of its keywords' weights times the field weight; with
+    all weights at 1 and field weights text=2, description=1, extract=1 this
+    equals the original nested-loop scoring.
+
+    Args:
+        weights: Keyword -> weight
+        field_weights: Weight for "text", "description" and "extract" hits
+    """
+
+    def __init__(self, weights: dict[str, float], field_weights: dict[str, float] | None = None):
+        self.weights = {kw.lower(): w for kw, w in weights.items()}
+        self.field_weights = {"text": 2, "description": 1, "extract": 1, **(field_weights or {})}
+        # Each hit is the longest keyword at its position; every other keyword
+        # matching there is one of its prefixes
+        self._pattern = re.compile(_trie_pattern(list(self.weights)))
+        self._prefixes = {
+            kw: [other for other in self.weights if kw.startswith(other)]
+            for kw in self.weights
+        }
+
+    @classmethod
+    def from_config(cls, path: str = KEYWORDS_PATH) -> "KeywordScorer":
+        """Build a scorer from a keywords.json file.
+
+        A keyword listed in several categories gets its highest category weight.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        weights: dict[str, float] = {}
+        for category in config.get("categories", {}).values():
+            weight = category.get("weight", 1)
+            for keyword in category.get("keywords", []):
+                weights[keyword] = max(weight, weights.get(keyword, weight))
+        return cls(weights, config.get("field_weights"))
+
+    def find(self, text: str) -> set[str]:
+        """Distinct keywords occurring in text (already lowercased)."""
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            found.update(self._prefixes[match.group()])
+            # Resume one character later (not at the match end) so keywords
+            # overlapping this one, like "forest" in "rainforest", are found too
+            match = search(text, match.start() + 1)
+        return found
+
+    def field_score(self, text: str, field: str) -> float:
+        if not text:
+            return 0
+        return self.field_weights[field] * sum(self.weights[kw] for kw in self.find(text.lower()))
+
+    def score(self, event: dict[str, Any]) -> float:
+        """Relevance score of one "On this day" event."""
+        score = self.field_score(event.get("text", ""), "text")
+        for page in event.get("pages", []):
+            score += self.field_score(page.get("description", ""), "description")
+            score += self.field_score(page.get("extract", ""), "extract")
+        return score
+
+
+_scorer: KeywordScorer | None = None
+
+
+def get_keyword_scorer() -> KeywordScorer:
+    """Return the scorer built from keywords.json (compiled once per worker)."""
+    global _scorer
+    if _scorer is None:
+        _scorer = KeywordScorer.from_config()
+        logger.info(f"Compiled keyword scorer with {len(_scorer.weights)} keywords")
+    return _scorer
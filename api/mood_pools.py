@@ -0,0 +1,113 @@
+"""
+Sedna FM Mood Pools
+- Ready-made (episode, reason) recommendations per mood
+- Served instantly by /api/recommend when one fits the caller's exclusions
+- Refilled asynchronously once a pool drops below its low-water mark
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from catalog import EpisodeCatalog
+from session_token import SessionToken
+
+logger = logging.getLogger(__name__)
+
+
+POOL_SIZE = int(os.environ.get("MOOD_POOL_SIZE", "8"))
+LOW_WATER = int(os.environ.get("MOOD_POOL_LOW_WATER", "3"))
+ENTRY_TTL = float(os.environ.get("MOOD_POOL_TTL_SECONDS", "21600"))
+
+# (mood, catalog, count, exclude_ids) -> list of {"episode_id", "reason"}
+Generator = Callable[[str, EpisodeCatalog, int, set[int]], Awaitable[list[dict[str, Any]]]]
+
+
+class MoodPools:
+    """Per-mood queues of pre-generated recommendations.
+
+    Args:
+        generator: Coroutine producing fresh {"episode_id", "reason"} entries
+        size: Target entries per mood (0 disables pooling)
+        low_water: Refill is scheduled when a pool drops below this
+        ttl: Seconds after which an unused entry is discarded
+    """
+
+    def __init__(self, generator: Generator, size: int = POOL_SIZE, low_water: int = LOW_WATER, ttl: float = ENTRY_TTL):
+        self.generator = generator
+        self.size = size
+        self.low_water = low_water
+        self.ttl = ttl
+        self._pools: dict[str, deque[dict[str, Any]]] = {}
+        self._refilling: dict[str, asyncio.Task] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def level(self, mood: str) -> int:
+        return len(self._pools.get(mood, ()))
+
+    def take(self, mood: str, catalog: EpisodeCatalog, excluded: SessionToken) -> dict[str, Any] | None:
+        """Pop the oldest pooled entry for a mood that the caller hasn't played.
+
+        Expired entries and entries for episodes no longer in the catalog are
+        dropped on the way. Returns {"episode", "reason"} or None.
+        """
+        pool = self._pools.get(mood)
+        if not pool:
+            return None
+
+        now = time.monotonic()
+        for entry in list(pool):
+            episode = catalog.get(entry["episode_id"])
+            if episode is None or now - entry["created_at"] > self.ttl:
+                pool.remove(entry)
+                continue
+            if entry["episode_id"] not in excluded:
+                pool.remove(entry)
+                return {"episode": episode, "reason": entry["reason"]}
+        return None
+
+    def schedule_refill(self, mood: str, catalog: EpisodeCatalog) -> None:
+        """Start a background refill if the pool is low and none is running."""
+        if not self.enabled or self.level(mood) >= self.low_water:
+            return
+        task = self._refilling.get(mood)
+        if task is not None and not task.done():
+            return
+        self._refilling[mood] = asyncio.get_running_loop().create_task(self.refill(mood, catalog))
+
+    async def refill(self, mood: str, catalog: EpisodeCatalog) -> int:
+        """Top a mood's pool up to its target size. Returns entries added."""
+        pool = self._pools.setdefault(mood, deque())
+        missing = self.size - len(pool)
+        if missing <= 0:
+            return 0
+
+        # Ask for episodes not already waiting in the pool, for variety
+        pooled = {entry["episode_id"] for entry in pool}
+        try:
+            entries = await self.generator(mood, catalog, missing, pooled)
+        except Exception as e:
+            logger.warning(f"Mood pool refill for '{mood}' failed: {e}")
+            return 0
+
+        now = time.monotonic()
+        added = 0
+        for entry in entries:
+            if added >= missing or entry.get("episode_id") in pooled or catalog.get(entry.get("episode_id")) is None:
+                continue
+            pool.append({"episode_id": entry["episode_id"], "reason": entry.get("reason", ""), "created_at": now})
+            pooled.add(entry["episode_id"])
+            added += 1
+
+        logger.info(f"Refilled mood pool '{mood}' with {added} entries ({len(pool)}/{self.size})")
+        return added
+
+    async def refill_all(self, moods: list[str], catalog: EpisodeCatalog) -> None:
+        """Refill every mood's pool concurrently."""
+        await asyncio.gather(*(self.refill(mood, catalog) for mood in moods))
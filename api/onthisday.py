@@ -0,0 +1,323 @@
+"""
+Sedna FM On This Day
+- Wikipedia "On this day" feed client with a persistent on-disk cache keyed by MM-DD;
+  on Azure it lives in the instances' shared /home storage, so the dates the
+  lookahead job generates are already cached for every cold instance
+- Revalidates with If-None-Match once an entry is older than the TTL
+- Serves the cached payload when Wikipedia is slow or unreachable
+- Concurrent multi-feed fetch over one long-lived pooled client, with
+  per-request timeouts, jittered exponential backoff and a total deadline
+- Prefetch command to warm all 366 dates ahead of time
+
+Usage:
+    python onthisday.py prefetch [--feeds events] [--concurrency 8] [--force]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import weakref
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+from telemetry import record_retries
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> str:
+    """$HOME/data on Azure (persistent and shared by all instances), the temp dir elsewhere."""
+    if os.environ.get("WEBSITE_INSTANCE_ID") and os.environ.get("HOME"):
+        return os.path.join(os.environ["HOME"], "data", "sedna-onthisday")
+    return os.path.join(tempfile.gettempdir(), "sedna-onthisday")
+
+
+WIKIPEDIA_API_BASE = os.environ.get("WIKIPEDIA_API_BASE", "https://en.wikipedia.org/api/rest_v1")
+USER_AGENT = "SednaFM/1.0"
+
+# WIKIPEDIA_CACHE_DIR overrides the default, e.g. for a mounted file share
+CACHE_DIR = os.environ.get("WIKIPEDIA_CACHE_DIR") or default_cache_dir()
+CACHE_TTL = float(os.environ.get("WIKIPEDIA_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+REQUEST_TIMEOUT = float(os.environ.get("WIKIPEDIA_TIMEOUT_SECONDS", "10"))
+MAX_RETRIES = int(os.environ.get("WIKIPEDIA_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.environ.get("WIKIPEDIA_BACKOFF_SECONDS", "0.5"))
+# Total time budget for fetching every feed of a date
+FETCH_DEADLINE = float(os.environ.get("WIKIPEDIA_DEADLINE_SECONDS", "15"))
+
+FEEDS = [f.strip() for f in os.environ.get("WIKIPEDIA_FEEDS", "events,births,deaths,selected,holidays").split(",") if f.strip()]
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Async connection pools belong to the event loop that created them
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_wikipedia_client() -> "httpx.AsyncClient":
+    """Return the long-lived pooled Wikipedia client for the running event loop."""
+    # Loaded with the first fetch; only the daily fact paths talk to Wikipedia
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=60),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=5),
+            headers={"User-Agent": USER_AGENT},
+        )
+        _clients[loop] = client
+        logger.info(f"Created pooled Wikipedia client ({WIKIPEDIA_API_BASE})")
+    return client
+
+
+def feed_url(feed: str, month: int, day: int) -> str:
+    return f"{WIKIPEDIA_API_BASE}/feed/onthisday/{feed}/{month:02d}/{day:02d}"
+
+
+def all_dates() -> list[tuple[int, int]]:
+    """Every (month, day) of a leap year, so Feb 29 is included."""
+    start = date(2024, 1, 1)
+    return [((start + timedelta(days=i)).month, (start + timedelta(days=i)).day) for i in range(366)]
+
+
+class OnThisDayCache:
+    """On-disk cache of raw "On this day" payloads, one JSON file per feed and MM-DD.
+
+    Each file holds {"etag", "fetched_at", "payload"}. Fresh entries are
+    served without a request; older ones are revalidated with If-None-Match
+    (a 304 just renews them), and any upstream failure falls back to the
+    cached payload when there is one.
+
+    Args:
+        directory: Cache root directory
+        ttl: Seconds an entry is served without revalidation
+        timeout: Per-request timeout in seconds for Wikipedia calls
+        max_retries: Retries after a transport error, 429 or 5xx
+        backoff: Base delay in seconds for jittered exponential backoff
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = CACHE_TTL, timeout: float = REQUEST_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, backoff: float = BACKOFF_BASE):
+        self.directory = directory
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def path(self, feed: str, month: int, day: int) -> str:
+        return os.path.join(self.directory, feed, f"{month:02d}-{day:02d}.json")
+
+    def read(self, feed: str, month: int, day: int) -> dict[str, Any] | None:
+        try:
+            with open(self.path(feed, month, day), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {feed}/{month:02d}-{day:02d}: {e}")
+            return None
+
+    def write(self, feed: str, month: int, day: int, entry: dict[str, Any]) -> None:
+        """Write an entry atomically so readers never see a partial file."""
+        path = self.path(feed, month, day)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # A read-only or full disk only costs us the cache, not the request
+            logger.warning(f"Could not write cache entry {feed}/{month:02d}-{day:02d}: {e}")
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    async def _get(self, client: "httpx.AsyncClient", url: str, headers: dict[str, str], deadline: float | None) -> "httpx.Response":
+        """GET with retries on transport errors, 429 and 5xx, never past `deadline` (monotonic)."""
+        import httpx
+
+        attempt = 0
+        while True:
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise httpx.TimeoutException(f"Deadline exceeded for {url}")
+
+            response, error = None, None
+            try:
+                response = await client.get(url, headers=headers, timeout=timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    record_retries("wikipedia", attempt)
+                    return response
+            except httpx.TransportError as e:
+                error = e
+
+            # Full jitter; a Retry-After header raises the floor
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            if response is not None and response.headers.get("Retry-After", "").isdigit():
+                delay = max(delay, float(response.headers["Retry-After"]))
+            if attempt >= self.max_retries or (deadline is not None and time.monotonic() + delay >= deadline):
+                record_retries("wikipedia", attempt)
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def fetch(self, client: "httpx.AsyncClient", month: int, day: int, feed: str = "events", force: bool = False,
+                    deadline: float | None = None) -> dict[str, Any]:
+        """Return the feed payload for a date, from cache when possible.
+
+        Args:
+            client: HTTP client used for Wikipedia requests
+            month: Month (1-12)
+            day: Day of month (1-31)
+            feed: Feed name (events, births, deaths, selected, holidays)
+            force: Revalidate even if the cached entry is still fresh
+            deadline: time.monotonic() by which the request must be done
+        """
+        import httpx
+
+        entry = self.read(feed, month, day)
+        if entry is not None and not force and self.is_fresh(entry):
+            return entry["payload"]
+
+        headers = {"User-Agent": USER_AGENT}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        try:
+            response = await self._get(client, feed_url(feed, month, day), headers, deadline)
+            if response.status_code == 304 and entry is not None:
+                entry["fetched_at"] = time.time()
+                self.write(feed, month, day, entry)
+                return entry["payload"]
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            if entry is None:
+                raise
+            logger.warning(f"Wikipedia {feed}/{month:02d}-{day:02d} unavailable, serving cached copy: {e!r}")
+            return entry["payload"]
+
+        self.write(feed, month, day, {
+            "etag": response.headers.get("ETag"),
+            "fetched_at": time.time(),
+            "payload": payload
+        })
+        return payload
+
+    async def prefetch(self, client: "httpx.AsyncClient", feeds: list[str], concurrency: int = 8, force: bool = False) -> tuple[int, int]:
+        """Warm the cache for every date of the year. Returns (ok, failed)."""
+        semaphore = asyncio.Semaphore(concurrency)
+        failed = 0
+
+        async def warm(feed: str, month: int, day: int) -> None:
+            nonlocal failed
+            async with semaphore:
+                try:
+                    await self.fetch(client, month, day, feed, force=force)
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Prefetch of {feed}/{month:02d}-{day:02d} failed: {e!r}")
+
+        jobs = [warm(feed, month, day) for feed in feeds for month, day in all_dates()]
+        await asyncio.gather(*jobs)
+        return len(jobs) - failed, failed
+
+
+onthisday_cache = OnThisDayCache()
+
+
+async def fetch_feeds(month: int, day: int, feeds: list[str] = FEEDS, deadline: float = FETCH_DEADLINE,
+                      cache: OnThisDayCache = onthisday_cache) -> dict[str, list[dict[str, Any]]]:
+    """Fetch several "On this day" feeds for a date concurrently.
+
+    All feeds share the pooled client and one total deadline. A feed that
+    fails or misses the deadline falls back to its cached copy (however old)
+    or is left out; only if every feed comes back empty-handed is the first
+    error raised.
+
+    Args:
+        month: Month (1-12)
+        day: Day of month (1-31)
+        feeds: Feed names (events, births, deaths, selected, holidays)
+        deadline: Seconds for the whole fetch
+        cache: Cache to read through
+
+    Returns:
+        Feed name -> list of entries
+    """
+    import httpx
+
+    client = get_wikipedia_client()
+    start = time.monotonic()
+    tasks = {
+        feed: asyncio.create_task(cache.fetch(client, month, day, feed, deadline=start + deadline))
+        for feed in feeds
+    }
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    results, errors = {}, []
+    for feed, task in tasks.items():
+        if task in done and task.exception() is None:
+            results[feed] = task.result().get(feed, [])
+            continue
+        error = task.exception() if task in done else httpx.TimeoutException(f"{feed} missed the {deadline:.0f}s deadline")
+        errors.append(error)
+        entry = cache.read(feed, month, day)
+        if entry is not None:
+            logger.warning(f"Wikipedia {feed} feed failed ({error!r}), using cached copy")
+            results[feed] = entry["payload"].get(feed, [])
+        else:
+            logger.warning(f"Wikipedia {feed} feed failed ({error!r}), skipping it")
+
+    if not results and errors:
+        raise errors[0]
+    logger.info(
+        f"Fetched {sum(len(items) for items in results.values())} entries from "
+        f"{len(results)}/{len(feeds)} feeds in {time.monotonic() - start:.2f}s"
+    )
+    return results
+
+
+async def _prefetch_main(args: argparse.Namespace) -> int:
+    import httpx
+
+    cache = OnThisDayCache(args.cache_dir)
+    start = time.perf_counter()
+    async with httpx.AsyncClient() as client:
+        ok, failed = await cache.prefetch(client, args.feeds, args.concurrency, args.force)
+    logger.info(f"Prefetched {ok} entries into {cache.directory} ({failed} failed) in {time.perf_counter() - start:.1f}s")
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wikipedia 'On this day' cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    prefetch = commands.add_parser("prefetch", help="Warm the cache for all 366 dates")
+    prefetch.add_argument("--feeds", nargs="+", default=FEEDS)
+    prefetch.add_argument("--concurrency", type=int, default=8)
+    prefetch.add_argument("--cache-dir", default=CACHE_DIR)
+    prefetch.add_argument("--force", action="store_true", help="Revalidate entries that are still fresh")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(_prefetch_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Sedna FM Azure OpenAI Clients
+- Module-level registry of pooled clients, reused across invocations
+- Keyed by endpoint, API key and API version (MOOD and DAILY env-var sets)
+- Tuned httpx pool: keep-alive, HTTP/2 when h2 is installed, explicit timeouts
+- SDK retries per call are recorded from the x-stainless-retry-count header
+- openai and httpx are imported with the first client, not at cold start
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import weakref
+from typing import TYPE_CHECKING
+
+from telemetry import record_retries
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncAzureOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+API_VERSION = "2025-01-01-preview"
+
+CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+READ_TIMEOUT = float(os.environ.get("OPENAI_READ_TIMEOUT_SECONDS", "300"))
+MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "120"))
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Async connection pools belong to the event loop that created them
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def openai_settings(feature: str) -> tuple[str | None, str | None]:
+    """Return (endpoint, api_key) for a feature, falling back to the shared vars.
+
+    Args:
+        feature: Env-var suffix, "MOOD" or "DAILY"
+    """
+    endpoint = os.environ.get(f"AZURE_OPENAI_ENDPOINT_{feature}", os.environ.get("AZURE_OPENAI_ENDPOINT"))
+    api_key = os.environ.get(f"AZURE_OPENAI_API_KEY_{feature}", os.environ.get("AZURE_OPENAI_API_KEY"))
+    return endpoint, api_key
+
+
+def _pool_options() -> dict:
+    import httpx
+
+    return {
+        "http2": HTTP2,
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+    }
+
+
+# Statuses the SDK retries (plus anything it is told to retry via x-should-retry)
+RETRY_STATUSES = {408, 409, 429}
+
+
+def _record_final_attempt(response: "httpx.Response", max_retries: int) -> None:
+    """Record the retries of a call once its last attempt comes back."""
+    retries = int(response.request.headers.get("x-stainless-retry-count", "0") or 0)
+    retryable = response.status_code in RETRY_STATUSES or response.status_code >= 500
+    if not retryable or retries >= max_retries:
+        record_retries("openai", retries)
+
+
+def build_async_http_client(max_retries: int = 2) -> "httpx.AsyncClient":
+    """Create the pooled transport shared by one AsyncAzureOpenAI client."""
+    import httpx
+
+    async def on_response(response: httpx.Response) -> None:
+        _record_final_attempt(response, max_retries)
+
+    return httpx.AsyncClient(**_pool_options(), event_hooks={"response": [on_response]})
+
+
+def get_async_openai_client(feature: str, max_retries: int = 2) -> "AsyncAzureOpenAI":
+    """Return the warm AsyncAzureOpenAI client for a feature on the running loop.
+
+    Clients are created once per (endpoint, key, API version, retries) and
+    reused, so warm requests skip client construction and the TLS handshake.
+    Pools are kept per event loop because httpx async connections cannot be
+    shared across loops.
+
+    Args:
+        feature: Env-var suffix, "MOOD" or "DAILY"
+        max_retries: Retries for failed requests
+    """
+    endpoint, api_key = openai_settings(feature)
+    key = (endpoint, api_key, API_VERSION, max_retries)
+    loop = asyncio.get_running_loop()
+
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        from openai import AsyncAzureOpenAI
+        client = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=API_VERSION,
+            azure_endpoint=endpoint,
+            max_retries=max_retries,
+            http_client=build_async_http_client(max_retries),
+        )
+        clients[key] = client
+        logger.info(f"Created pooled async Azure OpenAI client for {feature} ({endpoint}, http2={HTTP2})")
+    return client
@@ -0,0 +1,194 @@
+"""
+Sedna FM Prompt Encoder
+- Compact, token-budgeted encoding of events and episodes for the daily-match prompts
+- Short field keys, no indentation, relevance-truncated descriptions, summarized genres
+- Local token counting (tiktoken when available, character estimate otherwise);
+  the encoding loads off the request path from a cache bundled at deploy
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+# Token budget for events + catalog in the daily prompts (0 = legacy indent=2 JSON)
+DAILY_PROMPT_TOKEN_BUDGET = int(os.environ.get("DAILY_PROMPT_TOKEN_BUDGET", "6000"))
+
+EVENTS_LEGEND = "Events (y=year, x=text, p=pages as [title, url, description]):"
+EPISODES_LEGEND = "Episodes (i=id, t=title, g=genres, d=description excerpt):"
+
+# The deploy workflows bundle the o200k_base file here, so loading it never
+# downloads on the Function host
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tiktoken_cache"))
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_thread: threading.Thread | None = None
+
+
+def _load_encoding() -> None:
+    global _encoding
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, estimating token counts: {e}")
+
+
+def preload_encoding(wait: bool = False) -> None:
+    """Start loading the tiktoken encoding in a background thread (once).
+
+    wait=True blocks until it is loaded (or found unavailable), for callers
+    off the event loop that need exact counts from the start.
+    """
+    global _encoding_thread
+    with _encoding_lock:
+        if _encoding_thread is None:
+            _encoding_thread = threading.Thread(target=_load_encoding, name="tiktoken-load", daemon=True)
+            _encoding_thread.start()
+    if wait:
+        _encoding_thread.join()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken's o200k_base encoding, or estimate ~4 chars/token.
+
+    Never blocks on loading the encoding: until preload_encoding() has
+    finished (it is started on first use), counts are estimated.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    preload_encoding()
+    return (len(text) + 3) // 4
+
+
+# Legacy (indent=2) token count of the last episode list seen. The list is
+# kept alive, so a new catalog version (a new list) is counted exactly once
+_legacy_episodes: tuple[list[dict[str, Any]], int] | None = None
+
+
+def legacy_episode_tokens(episodes: list[dict[str, Any]]) -> int:
+    """Tokens of the catalog as legacy indent=2 JSON, the baseline for tokens_saved."""
+    global _legacy_episodes
+    cached = _legacy_episodes
+    if cached is not None and cached[0] is episodes:
+        return cached[1]
+    tokens = count_tokens(json.dumps(episodes, indent=2))
+    _legacy_episodes = (episodes, tokens)
+    return tokens
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z]{4,}")
+
+
+def relevant_excerpt(description: str, terms: set[str], max_chars: int) -> str:
+    """Keep the description sentences that best match `terms`, within max_chars.
+
+    Sentences keep their original order; "Mood:" lines are always preferred
+    because they summarize the episode's vibe.
+    """
+    if len(description) <= max_chars:
+        return description
+
+    sentences = [s.strip() for s in _SENTENCE_RE.split(description) if s.strip()]
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (
+            not sentences[i].startswith("Mood:"),
+            -len(terms.intersection(_WORD_RE.findall(sentences[i].lower()))),
+            i,
+        ),
+    )
+
+    keep, used = set(), 0
+    for i in ranked:
+        if used + len(sentences[i]) + 1 > max_chars:
+            continue
+        keep.add(i)
+        used += len(sentences[i]) + 1
+    if not keep:
+        return description[:max_chars].rsplit(" ", 1)[0] + "…"
+    return " ".join(sentences[i] for i in sorted(keep))
+
+
+def encode_events(events: list[dict[str, Any]], with_page_descriptions: bool = True) -> str:
+    """One compact JSON object per line for each event."""
+    lines = []
+    for event in events:
+        pages = [
+            [p.get("title"), p.get("url")] + ([p.get("description")] if with_page_descriptions and p.get("description") else [])
+            for p in event.get("pages", [])
+        ]
+        lines.append(_compact({"y": event.get("year"), "x": event.get("text"), "p": pages}))
+    return "\n".join(lines)
+
+
+def encode_episodes(episodes: list[dict[str, Any]], terms: set[str], max_description: int, max_genres: int = 3) -> str:
+    """One compact JSON object per line for each episode."""
+    lines = []
+    for ep in episodes:
+        item = {"i": ep["id"], "t": ep["title"], "g": "/".join(ep.get("music-genres", [])[:max_genres])}
+        if max_description > 0:
+            item["d"] = relevant_excerpt(ep.get("description", ""), terms, max_description)
+        lines.append(_compact(item))
+    return "\n".join(lines)
+
+
+@dataclass
+class EncodedPrompt:
+    """Prompt sections plus token accounting for one daily-match call."""
+    events_text: str
+    episodes_text: str
+    tokens: int
+    legacy_tokens: int
+    events_used: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.legacy_tokens - self.tokens
+
+
+def encode_daily_prompt(events: list[dict[str, Any]], episodes: list[dict[str, Any]], budget: int = DAILY_PROMPT_TOKEN_BUDGET, min_events: int = 1) -> EncodedPrompt:
+    """Encode events and catalog for the daily-match prompt within a token budget.
+
+    Shrinks in steps until the budget is met: shorter description excerpts,
+    then no page descriptions, then fewer (lowest-scored, i.e. last) events.
+
+    Args:
+        events: Scored events from fetch_wikipedia_events (best first)
+        episodes: Sedna FM episodes
+        budget: Max tokens for both sections; 0 keeps the legacy indent=2 JSON
+        min_events: Never drop below this many events
+    """
+    legacy_events = json.dumps(events, indent=2)
+    legacy_tokens = count_tokens(legacy_events) + legacy_episode_tokens(episodes)
+    if budget <= 0:
+        return EncodedPrompt(legacy_events, json.dumps(episodes, indent=2), legacy_tokens, legacy_tokens, len(events))
+
+    # Words from the events drive which description sentences are kept
+    terms = set(_WORD_RE.findall(" ".join(e.get("text") or "" for e in events).lower()))
+
+    n_events = len(events)
+    steps = [(desc, True) for desc in (400, 240, 140, 0)] + [(0, False)]
+    while True:
+        for max_description, page_descriptions in steps:
+            events_text = EVENTS_LEGEND + "\n" + encode_events(events[:n_events], page_descriptions)
+            episodes_text = EPISODES_LEGEND + "\n" + encode_episodes(episodes, terms, max_description)
+            tokens = count_tokens(events_text) + count_tokens(episodes_text)
+            if tokens <= budget:
+                return EncodedPrompt(events_text, episodes_text, tokens, legacy_tokens, n_events)
+        if n_events <= min_events:
+            logger.warning(f"Daily prompt exceeds token budget ({tokens} > {budget})")
+            return EncodedPrompt(events_text, episodes_text, tokens, legacy_tokens, n_events)
+        n_events = max(min_events, n_events * 3 // 4)
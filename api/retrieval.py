@@ -0,0 +1,259 @@
+"""
+Sedna FM Mood Retrieval
+- NumPy TF-IDF matrix over episode descriptions, songs and music-genres
+- Mood-lexicon query vectors for the eight listener moods
+- Top-K candidate selection so the mood prompt stays a fixed size
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from catalog import EpisodeCatalog
+from session_token import SessionToken
+
+logger = logging.getLogger(__name__)
+
+
+# Weighted vocabulary describing each mood. Terms are matched against the
+# tokenized catalog, so only words that actually appear in episodes count.
+MOOD_LEXICON: dict[str, dict[str, float]] = {
+    "Happy": {
+        "happy": 3, "joy": 3, "joyful": 3, "sunny": 2, "sun": 1, "bright": 2, "upbeat": 3,
+        "celebration": 2, "celebrate": 2, "smile": 2, "fun": 2, "playful": 2, "uplifting": 3,
+        "optimism": 2, "optimistic": 2, "hopeful": 1, "golden": 1, "funk": 1, "disco": 2,
+        "pop": 1, "dance": 1, "groove": 1, "good": 1, "light": 1,
+    },
+    "Calm": {
+        "calm": 3, "peaceful": 3, "peace": 2, "gentle": 2, "soft": 2, "slow": 2, "quiet": 2,
+        "serene": 3, "stillness": 3, "still": 1, "breathe": 2, "relax": 2, "relaxing": 2,
+        "ambient": 3, "chill": 2, "lounge": 2, "acoustic": 1, "soothing": 3, "morning": 1,
+        "coffee": 1, "float": 1, "tranquil": 3,
+    },
+    "Reflective": {
+        "reflective": 3, "reflection": 3, "reflect": 2, "introspective": 3, "introspection": 3,
+        "memory": 2, "memories": 2, "nostalgia": 3, "nostalgic": 3, "thoughtful": 2,
+        "contemplative": 3, "journey": 1, "identity": 1, "lessons": 1, "learning": 1,
+        "story": 1, "past": 1, "time": 1, "transition": 2, "transitional": 2, "deep": 1,
+    },
+    "Sad": {
+        "sad": 3, "sadness": 3, "melancholy": 3, "melancholic": 3, "loss": 3, "grief": 3,
+        "lonely": 3, "loneliness": 3, "tears": 2, "heartbreak": 3, "broken": 2, "missing": 2,
+        "misses": 2, "fragile": 2, "rain": 1, "blues": 2, "goodbye": 2, "sorrow": 3,
+    },
+    "Energetic": {
+        "energetic": 3, "energy": 3, "dance": 2, "dancing": 2, "power": 2, "powerful": 2,
+        "raw": 2, "drive": 2, "driving": 2, "fast": 2, "pulse": 2, "rhythm": 2, "rhythms": 2,
+        "house": 2, "techno": 3, "electronic": 2, "rock": 1, "punk": 2, "hip": 1, "hop": 1,
+        "afrobeat": 2, "revolution": 2, "revolutionary": 2, "rebellion": 2, "fire": 1,
+    },
+    "Intimate": {
+        "intimate": 3, "intimacy": 3, "love": 3, "tender": 3, "tenderness": 3, "romance": 3,
+        "romantic": 3, "personal": 2, "heart": 2, "heartfelt": 3, "close": 1, "warm": 2,
+        "warmth": 2, "soul": 2, "r&b": 2, "confessions": 2, "family": 1, "friends": 1,
+        "friendship": 2, "honest": 2,
+    },
+    "Moody": {
+        "moody": 3, "dark": 3, "mysterious": 3, "mystery": 2, "night": 2, "shadow": 2,
+        "shadows": 2, "fog": 2, "foggy": 2, "haunting": 3, "cinematic": 2, "trip": 1,
+        "hop": 1, "trip-hop": 3, "psychedelic": 2, "textured": 2, "brooding": 3, "noir": 3,
+        "electronic": 1, "tension": 2,
+    },
+    "Carefree": {
+        "carefree": 3, "free": 2, "freedom": 3, "liberating": 3, "summer": 2, "road": 2,
+        "travel": 2, "trip": 1, "adventure": 2, "wander": 2, "go": 1, "breeze": 2, "beach": 2,
+        "holiday": 2, "spontaneous": 2, "easy": 2, "reggae": 2, "latin": 1, "tropical": 2,
+        "escape": 2,
+    },
+}
+
+# Field weights: genres are the strongest signal, song titles the weakest
+FIELD_WEIGHTS = {"description": 1.0, "title": 1.0, "music-genres": 2.0, "songs": 0.5}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "this to was we with our your you their they he she his her i me my s".split()
+)
+
+# Softmax temperature for affinity sampling; lower = stick to the best matches
+AFFINITY_TEMPERATURE = float(os.environ.get("MOOD_AFFINITY_TEMPERATURE", "0.05"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9à-ÿ&]+(?:-[a-z0-9à-ÿ]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase and split text into terms, dropping stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def episode_terms(episode: dict[str, Any]) -> Counter:
+    """Weighted term counts for an episode across all indexed fields."""
+    counts: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = episode.get(field, "")
+        if isinstance(value, list):
+            value = " ".join(value)
+        for term in tokenize(value):
+            counts[term] += weight
+            # Index hyphenated genres ("trip-hop") under their parts as well
+            if "-" in term:
+                for part in term.split("-"):
+                    counts[part] += weight
+    return counts
+
+
+class MoodRetriever:
+    """TF-IDF index over a catalog snapshot with precomputed mood scores.
+
+    Only the lexicon columns of the TF-IDF matrix are materialized (rows are
+    still normalized over the full vocabulary), so memory stays at
+    episodes x lexicon size even for catalogs with thousands of episodes.
+    """
+
+    def __init__(self, catalog: EpisodeCatalog):
+        self.version = catalog.version
+        self.episodes = catalog.episodes
+        self.ids = np.array([ep["id"] for ep in self.episodes], dtype=np.int64)
+
+        term_counts = [episode_terms(ep) for ep in self.episodes]
+        vocab: dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, terms in enumerate(term_counts):
+            for term, count in terms.items():
+                rows.append(row)
+                cols.append(vocab.setdefault(term, len(vocab)))
+                counts.append(count)
+        self.vocab = vocab
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+
+        # Sublinear TF with smoothed IDF, rows L2-normalized
+        n_docs = len(self.episodes)
+        df = np.bincount(cols, minlength=len(vocab))
+        self.idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        weights = np.log1p(np.array(counts, dtype=np.float32)) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_docs))
+        norms[norms == 0] = 1
+
+        # Dense episode x lexicon-term slice of the TF-IDF matrix
+        lexicon_terms = sorted({t for terms in MOOD_LEXICON.values() for t in terms if t in vocab})
+        lexicon_cols = {vocab[t]: i for i, t in enumerate(lexicon_terms)}
+        self.lexicon_terms = lexicon_terms
+        self.matrix = np.zeros((n_docs, len(lexicon_terms)), dtype=np.float32)
+        mask = np.isin(cols, list(lexicon_cols))
+        self.matrix[rows[mask], [lexicon_cols[c] for c in cols[mask]]] = weights[mask]
+        self.matrix /= norms[:, None].astype(np.float32)
+
+        # Mood x episode cosine scores are fixed per catalog version
+        self.moods = list(MOOD_LEXICON)
+        self.mood_scores = np.vstack([self.matrix @ self.mood_vector(m) for m in self.moods])
+
+        # Sampling weights (softmax over scores) for the LLM-free fast path
+        scaled = (self.mood_scores - self.mood_scores.max(axis=1, keepdims=True)) / AFFINITY_TEMPERATURE
+        self.affinity = np.exp(scaled)
+
+    def mood_vector(self, mood: str) -> np.ndarray:
+        """Build the normalized query vector for a mood from its lexicon."""
+        lexicon = MOOD_LEXICON[mood]
+        vec = np.array(
+            [lexicon.get(t, 0) * self.idf[self.vocab[t]] for t in self.lexicon_terms],
+            dtype=np.float32,
+        )
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def scores(self, mood: str) -> np.ndarray:
+        """Relevance score of every episode (catalog order) for a mood."""
+        return self.mood_scores[self.moods.index(mood)]
+
+    def played_mask(self, exclude_ids: SessionToken | set[int]) -> np.ndarray:
+        """Bool array over the catalog, True for excluded episodes."""
+        if isinstance(exclude_ids, SessionToken):
+            return exclude_ids.mask(self.ids)
+        return np.isin(self.ids, list(exclude_ids))
+
+    def top_k(self, mood: str, k: int, exclude_ids: SessionToken | set[int] | None = None) -> list[dict[str, Any]]:
+        """Return the k best-matching episodes for a mood, best first.
+
+        Args:
+            mood: The listener's mood
+            k: Number of candidates to return
+            exclude_ids: Episode IDs that must not be returned
+        """
+        scores = self.scores(mood).copy()
+        if exclude_ids:
+            scores[self.played_mask(exclude_ids)] = -np.inf
+
+        available = int(np.isfinite(scores).sum())
+        k = min(k, available)
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.episodes[i] for i in top]
+
+    def sample(self, mood: str, exclude_ids: SessionToken | set[int] | None = None, rng: np.random.Generator | None = None) -> dict[str, Any] | None:
+        """Draw one episode for a mood, weighted by its affinity.
+
+        Args:
+            mood: The listener's mood
+            exclude_ids: Episode IDs that must not be returned
+            rng: Random generator (pass a seeded one for reproducible picks)
+        """
+        weights = self.affinity[self.moods.index(mood)]
+        if exclude_ids:
+            weights = np.where(self.played_mask(exclude_ids), 0.0, weights)
+
+        cumulative = np.cumsum(weights)
+        if cumulative.size == 0 or cumulative[-1] <= 0:
+            return None
+
+        rng = rng or _rng
+        index = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right"))
+        return self.episodes[min(index, len(self.episodes) - 1)]
+
+    def playlist(self, steps: list[tuple[str, str, float]], exclude_ids: SessionToken | set[int] | None = None,
+                 rng: np.random.Generator | None = None) -> list[dict[str, Any]]:
+        """Draw one episode per playlist step, never repeating one.
+
+        Each step is (from mood, to mood, blend) and samples from the two
+        moods' affinity rows mixed by `blend` (see fast_recommender.mood_arc).
+        Stops early once every remaining episode is excluded.
+        """
+        available = ~self.played_mask(exclude_ids) if exclude_ids else np.ones(len(self.ids), dtype=bool)
+        rng = rng or _rng
+        picks = []
+        for start, end, blend in steps:
+            weights = (1 - blend) * self.affinity[self.moods.index(start)] + blend * self.affinity[self.moods.index(end)]
+            cumulative = np.cumsum(np.where(available, weights, 0.0))
+            if cumulative.size == 0 or cumulative[-1] <= 0:
+                break
+            index = min(int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")), len(self.episodes) - 1)
+            available[index] = False
+            picks.append(self.episodes[index])
+        return picks
+
+
+_rng = np.random.default_rng()
+_lock = threading.Lock()
+_retriever: MoodRetriever | None = None
+
+
+def get_retriever(catalog: EpisodeCatalog) -> MoodRetriever:
+    """Return the retriever for a catalog, rebuilding it when the catalog changes."""
+    global _retriever
+    retriever = _retriever
+    if retriever is not None and retriever.version == catalog.version:
+        return retriever
+
+    with _lock:
+        if _retriever is None or _retriever.version != catalog.version:
+            _retriever = MoodRetriever(catalog)
+            logger.info(f"Built mood retrieval index for catalog {catalog.version} ({len(_retriever.vocab)} terms)")
+        return _retriever
@@ -0,0 +1,149 @@
+"""
+Sedna FM Daily Schedule
+- Time-indexed schedule format: every fact carries its UTC hour window
+- Written once a day; the current fact is resolved from the clock, so
+  nothing has to be republished every hour
+- Facts reference episodes by id through one deduplicated episode table,
+  serialized minified; precompressed gzip/brotli siblings are opt-in
+- Same resolution rules as fetchDailyMatch in scripts/modules/dailyFact.js
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+SCHEDULE_VERSION = 3
+
+# Episode fields the page needs; the full entry stays in data/episodes.json
+EPISODE_FIELDS = ("id", "title", "soundcloudUrl")
+
+# Precompressed siblings written next to daily_match.json ("gzip", "br"; off by
+# default). Each one is an extra commit and Pages build, the page only fetches
+# daily_match.json, and Pages doesn't serve them with Content-Encoding
+SCHEDULE_COMPRESSION = [c.strip() for c in os.environ.get("SCHEDULE_COMPRESSION", "").split(",") if c.strip()]
+
+
+def build_schedule(matches: list[dict[str, Any]], date_str: str, generated_at: str | None = None) -> dict[str, Any]:
+    """Spread the day's facts over 24 UTC hours.
+
+    With 24 matches every fact gets one hour; with fewer, the windows are
+    widened evenly so the day is still fully covered. Each fact's episode is
+    replaced by its id, and the episodes are stored once in `episodes`.
+
+    Args:
+        matches: Fact/episode matches in publishing order
+        date_str: Schedule date (YYYY-MM-DD, UTC)
+        generated_at: ISO timestamp of the generation run
+    """
+    facts, episodes = [], {}
+    for i, match in enumerate(matches):
+        fact = dict(match)
+        episode = fact.get("episode")
+        if isinstance(episode, dict) and "id" in episode:
+            episodes.setdefault(str(episode["id"]), {k: episode[k] for k in EPISODE_FIELDS if k in episode})
+            fact["episode"] = episode["id"]
+        fact["hour"] = i * 24 // len(matches)
+        fact["end_hour"] = (i + 1) * 24 // len(matches)
+        facts.append(fact)
+
+    return {
+        "schema_version": SCHEDULE_VERSION,
+        "date": date_str,
+        "timezone": "UTC",
+        "generated_at": generated_at or datetime.now(timezone.utc).isoformat(),
+        "episodes": episodes,
+        "facts": facts
+    }
+
+
+def expand_fact(schedule: dict[str, Any], fact: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Return a copy of a fact with its episode reference replaced by the table entry."""
+    if fact is None or isinstance(fact.get("episode"), dict):
+        return fact
+    episode = schedule.get("episodes", {}).get(str(fact.get("episode")))
+    return {**fact, "episode": episode} if episode is not None else dict(fact)
+
+
+def serialize_schedule(schedule: dict[str, Any]) -> bytes:
+    """Minified JSON for normalized schedules, the old indented layout otherwise."""
+    if schedule.get("schema_version", 0) >= 3:
+        return json.dumps(schedule, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(schedule, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def compressed_siblings(content: bytes, encodings: list[str] = SCHEDULE_COMPRESSION) -> dict[str, bytes]:
+    """Precompressed copies keyed by file suffix (".gz", ".br").
+
+    Empty unless SCHEDULE_COMPRESSION is set. Brotli needs the optional
+    brotli package and is skipped without it.
+    """
+    siblings = {}
+    if "gzip" in encodings:
+        siblings[".gz"] = gzip.compress(content, compresslevel=9, mtime=0)
+    if "br" in encodings:
+        try:
+            import brotli
+            siblings[".br"] = brotli.compress(content, quality=11)
+        except ImportError:
+            pass
+    return siblings
+
+
+def is_time_indexed(schedule: dict[str, Any]) -> bool:
+    return isinstance(schedule.get("facts"), list)
+
+
+def resolve_current_fact(schedule: dict[str, Any], now: datetime | None = None) -> dict[str, Any] | None:
+    """Return the fact to show at `now` (UTC), with its episode expanded.
+
+    Legacy queue-based files return their current_fact. A schedule from an
+    earlier day keeps showing its last fact until the new one is committed,
+    like the old publisher did when its queue ran out.
+    """
+    if not is_time_indexed(schedule):
+        return schedule.get("current_fact") or (schedule if "fact_text" in schedule else None)
+
+    facts = schedule["facts"]
+    if not facts:
+        return None
+
+    now = now or datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    date = schedule.get("date", today)
+    if date < today:
+        return expand_fact(schedule, facts[-1])
+    if date > today:
+        return expand_fact(schedule, facts[0])
+
+    current = facts[0]
+    for fact in facts:
+        if fact.get("hour", 0) <= now.hour:
+            current = fact
+        if fact.get("hour", 0) <= now.hour < fact.get("end_hour", 24):
+            return expand_fact(schedule, fact)
+    return expand_fact(schedule, current)
+
+
+def publish_next_fact(schedule: dict[str, Any] | None, hour: int, once_per_hour: bool = True) -> dict[str, Any] | None:
+    """Legacy queue schedules: return a copy with the next queued fact made current.
+
+    Returns None when there is nothing to do (no queue, a time-indexed
+    schedule, or, with once_per_hour, this hour was already published), so
+    it can be used directly as a StateStore.update() function.
+    """
+    if not schedule or is_time_indexed(schedule) or not schedule.get("queue"):
+        return None
+    if once_per_hour and schedule.get("current_hour") == hour:
+        return None
+
+    queue = list(schedule["queue"])
+    next_fact = queue.pop(0)
+    return {
+        **schedule,
+        "current_hour": hour,
+        "current_fact": next_fact,
+        "queue": queue,
+        "published": schedule.get("published", []) + [next_fact]
+    }
@@ -0,0 +1,235 @@
+"""
+Sedna FM Schedule Engine
+- Generates daily schedules for a range of dates (lookahead and backfill)
+- Bounded concurrency and paced starts to stay within model rate limits
+- Results are pre-staged per date in the state store; the midnight job
+  only has to promote today's and then discards it
+- Ranges too long for one invocation are queued in the state store and
+  drained a few dates per timer run, so no run outlives the host timeout
+- Queued dates are claimed, not removed, while generating: failures and
+  runs that die are retried (up to SCHEDULE_RANGE_MAX_ATTEMPTS)
+- Staging and the queue need a shared state store (Blob); with a
+  per-instance store they are skipped, since midnight may run elsewhere
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+
+LOOKAHEAD_DAYS = int(os.environ.get("SCHEDULE_LOOKAHEAD_DAYS", "7"))
+# Dates generated at the same time (each one runs DAILY_SHARDS model calls)
+RANGE_CONCURRENCY = int(os.environ.get("SCHEDULE_RANGE_CONCURRENCY", "2"))
+# Minimum gap between two generations starting
+RANGE_MIN_INTERVAL = float(os.environ.get("SCHEDULE_RANGE_MIN_INTERVAL_SECONDS", "5"))
+MAX_RANGE_DAYS = 31
+# Dates generated within one HTTP request or timer run; longer ranges are queued
+# (a date takes roughly a minute: Wikipedia fetch, DAILY_SHARDS model calls, repair)
+BATCH_DAYS = int(os.environ.get("SCHEDULE_RANGE_BATCH_DAYS", "2"))
+
+# Dates waiting to be generated: date string -> {"force", "attempts", "claimed_until"}
+PENDING_KEY = "range/pending"
+# A drain run that dies (host timeout, restart) releases its dates after this
+RANGE_CLAIM_SECONDS = int(os.environ.get("SCHEDULE_RANGE_CLAIM_SECONDS", "900"))
+# Generation attempts per queued date before it is dropped
+RANGE_MAX_ATTEMPTS = int(os.environ.get("SCHEDULE_RANGE_MAX_ATTEMPTS", "3"))
+
+# target_date (UTC midnight) -> schedule from build_schedule
+Generator = Callable[[datetime], Awaitable[dict[str, Any]]]
+
+
+def staged_key(date_str: str) -> str:
+    return f"staged/{date_str}"
+
+
+def date_range(start: date, end: date) -> list[date]:
+    """Every date from start to end, inclusive."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class Pacer:
+    """Spaces out starts so at most one begins every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class RangeGenerator:
+    """Generate and stage schedules for many dates.
+
+    Args:
+        generator: Coroutine producing the schedule for one date
+        store: State store for staged schedules (the worker's store by default)
+        concurrency: Max dates generating at the same time
+        min_interval: Min seconds between two generations starting
+    """
+
+    def __init__(self, generator: Generator, store: StateStore | None = None,
+                 concurrency: int = RANGE_CONCURRENCY, min_interval: float = RANGE_MIN_INTERVAL):
+        self.generator = generator
+        self._store = store
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+
+    @property
+    def store(self) -> StateStore:
+        return self._store or get_state_store()
+
+    def staged(self, date_str: str) -> dict[str, Any] | None:
+        """Return the staged schedule for a date, if one was generated."""
+        entry = self.store.get(staged_key(date_str))
+        return entry[0] if entry is not None else None
+
+    def discard(self, date_str: str) -> None:
+        """Delete a date's staged schedule (once it has been published)."""
+        self.store.delete(staged_key(date_str))
+
+    @property
+    def shared(self) -> bool:
+        """Whether staged schedules and the queue are visible to every instance."""
+        return self.store.shared
+
+    def enqueue(self, dates: list[date], force: bool = False) -> list[str]:
+        """Queue dates for drain(); returns every pending date string."""
+        def add(pending: dict[str, dict[str, Any]] | None) -> dict[str, dict[str, Any]]:
+            pending = dict(pending or {})
+            for day in dates:
+                entry = pending.get(day.isoformat(), {"force": False, "attempts": 0, "claimed_until": 0})
+                pending[day.isoformat()] = {**entry, "force": entry["force"] or force}
+            return pending
+
+        pending, _ = self.store.update(PENDING_KEY, add)
+        return sorted(pending)
+
+    def _claim(self, limit: int) -> dict[str, bool]:
+        """Claim up to `limit` of the earliest pending dates nobody else is generating.
+
+        Claimed dates stay queued until _settle(); if the run dies first, the
+        claim expires after RANGE_CLAIM_SECONDS and a later run takes them.
+
+        Returns:
+            date string -> force
+        """
+        claimed: dict[str, bool] = {}
+
+        def claim(pending: dict[str, dict[str, Any]] | None) -> dict[str, dict[str, Any]] | None:
+            nonlocal claimed
+            # update() may retry after a conflict; only the written call counts
+            now = time.time()
+            keys = sorted(key for key, entry in (pending or {}).items() if entry["claimed_until"] <= now)[:limit]
+            claimed = {key: pending[key]["force"] for key in keys}
+            if not claimed:
+                return None
+            return {**pending, **{
+                key: {**pending[key], "attempts": pending[key]["attempts"] + 1, "claimed_until": now + RANGE_CLAIM_SECONDS}
+                for key in keys
+            }}
+
+        self.store.update(PENDING_KEY, claim)
+        return claimed
+
+    def _settle(self, results: dict[str, str]) -> list[str]:
+        """Remove generated dates from the queue and release failed ones for the next run.
+
+        Returns the failed dates that ran out of attempts and were dropped.
+        """
+        dropped: list[str] = []
+
+        def settle(pending: dict[str, dict[str, Any]] | None) -> dict[str, dict[str, Any]]:
+            nonlocal dropped
+            pending = dict(pending or {})
+            dropped = []
+            for key, result in results.items():
+                entry = pending.pop(key, None)
+                if entry is None or not result.startswith("failed"):
+                    continue
+                if entry["attempts"] < RANGE_MAX_ATTEMPTS:
+                    pending[key] = {**entry, "claimed_until": 0}
+                else:
+                    dropped.append(key)
+            return pending
+
+        self.store.update(PENDING_KEY, settle)
+        return dropped
+
+    async def drain(self, limit: int = BATCH_DAYS) -> dict[str, str]:
+        """Generate up to `limit` queued dates; the rest wait for the next run."""
+        if not self.shared:
+            return {}
+        claimed = await asyncio.to_thread(self._claim, limit)
+        results = {}
+        for force in (False, True):
+            dates = [date.fromisoformat(key) for key, forced in claimed.items() if forced is force]
+            if dates:
+                results.update(await self.generate_range(dates, force=force))
+        if results:
+            dropped = await asyncio.to_thread(self._settle, results)
+            if dropped:
+                logger.error(f"Giving up on {dropped} after {RANGE_MAX_ATTEMPTS} failed attempts")
+        return results
+
+    async def generate_range(self, dates: list[date], force: bool = False) -> dict[str, str]:
+        """Generate and stage a schedule for each date.
+
+        Dates that are already staged are skipped unless force is set. A
+        failing date doesn't stop the others.
+
+        Returns:
+            date string -> "generated", "staged" (already there), "failed: <reason>"
+            or "skipped" (the state store isn't shared)
+        """
+        if not self.shared:
+            logger.warning(f"Not staging {len(dates)} schedule(s): the state store isn't shared between instances (configure Blob storage)")
+            return {day.isoformat(): "skipped" for day in dates}
+
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        pacer = Pacer(self.min_interval)
+
+        async def generate(day: date) -> str:
+            date_str = day.isoformat()
+            if not force and await asyncio.to_thread(self.staged, date_str) is not None:
+                return "staged"
+
+            async with semaphore:
+                await pacer.wait()
+                start = time.perf_counter()
+                try:
+                    schedule = await self.generator(datetime(day.year, day.month, day.day, tzinfo=timezone.utc))
+                    if not schedule.get("facts"):
+                        raise ValueError("no facts generated")
+                    await asyncio.to_thread(self.store.replace, staged_key(date_str), schedule)
+                except Exception as e:
+                    logger.error(f"Generating schedule for {date_str} failed: {e}")
+                    return f"failed: {e}"
+                logger.info(f"Staged schedule for {date_str} ({len(schedule['facts'])} facts) in {time.perf_counter() - start:.1f}s")
+                return "generated"
+
+        results = await asyncio.gather(*(generate(day) for day in dates))
+        return {day.isoformat(): result for day, result in zip(dates, results)}
+
+    async def lookahead(self, days: int = LOOKAHEAD_DAYS, today: date | None = None) -> dict[str, str]:
+        """Queue the next `days` days after today and generate the first batch.
+
+        Dates that are already staged are skipped when their turn comes.
+        """
+        if not self.shared:
+            logger.warning("Skipping schedule lookahead: the state store isn't shared between instances (configure Blob storage)")
+            return {}
+        today = today or datetime.now(timezone.utc).date()
+        await asyncio.to_thread(self.enqueue, date_range(today + timedelta(days=1), today + timedelta(days=days)))
+        return await self.drain()
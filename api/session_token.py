@@ -0,0 +1,97 @@
+"""
+Sedna FM Session Token
+- Opaque record of the episodes a listener has played in a session:
+  a bitmap of episode ids (bit n = episode n) plus the catalog version it
+  was issued for, base64url-encoded
+- Its size depends on the highest episode id, not on the session length
+- Membership and catalog-wide counts are integer bit operations; the
+  retriever tests every episode at once with a numpy mask
+"""
+
+import base64
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+TOKEN_PREFIX = "s1"
+
+# Bounds the bitmap (128 KiB) so a forged token can't make us allocate more
+MAX_EPISODE_ID = (1 << 20) - 1
+
+
+class SessionToken:
+    """Played episode ids of one listener session. Immutable; add() returns a new token.
+
+    Args:
+        bits: Bitmap with bit n set when episode n was played
+        version: Catalog version the token was issued for
+    """
+
+    __slots__ = ("bits", "version")
+
+    def __init__(self, bits: int = 0, version: str = ""):
+        self.bits = bits
+        self.version = version
+
+    @classmethod
+    def from_ids(cls, episode_ids: Iterable[int], version: str = "") -> "SessionToken":
+        """Build a token from episode ids; ids outside 0..MAX_EPISODE_ID are ignored."""
+        return cls(version=version).add(*episode_ids)
+
+    @classmethod
+    def decode(cls, token: str) -> "SessionToken":
+        """Parse a token made by encode(). Raises ValueError when it is malformed."""
+        prefix, _, rest = token.partition(".")
+        version, separator, payload = rest.rpartition(".")
+        if prefix != TOKEN_PREFIX or not separator:
+            raise ValueError("Not a session token")
+        # binascii.Error is a ValueError too
+        raw = base64.b64decode(payload + "=" * (-len(payload) % 4), altchars=b"-_", validate=True)
+        if len(raw) * 8 > MAX_EPISODE_ID + 1:
+            raise ValueError("Session token bitmap is too large")
+        return cls(int.from_bytes(raw, "little"), version)
+
+    def encode(self) -> str:
+        raw = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+        return f"{TOKEN_PREFIX}.{self.version}.{base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')}"
+
+    def add(self, *episode_ids: int) -> "SessionToken":
+        bits = self.bits
+        for episode_id in episode_ids:
+            if isinstance(episode_id, int) and 0 <= episode_id <= MAX_EPISODE_ID:
+                bits |= 1 << episode_id
+        return SessionToken(bits, self.version)
+
+    def restrict(self, bits: int, version: str) -> "SessionToken":
+        """Keep only the ids set in `bits` (e.g. a catalog's ids), re-issued for `version`."""
+        return SessionToken(self.bits & bits, version)
+
+    def ids(self) -> list[int]:
+        return [i for i in range(self.bits.bit_length()) if self.bits >> i & 1]
+
+    def mask(self, episode_ids: "np.ndarray") -> "np.ndarray":
+        """Vectorized membership test: a bool array, True where the id was played."""
+        import numpy as np
+
+        raw = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+        played = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little").astype(bool)
+        if played.size == 0:
+            return np.zeros(len(episode_ids), dtype=bool)
+        return (episode_ids < played.size) & played[np.minimum(episode_ids, played.size - 1)]
+
+    def __contains__(self, episode_id: object) -> bool:
+        return isinstance(episode_id, int) and 0 <= episode_id <= MAX_EPISODE_ID and bool(self.bits >> episode_id & 1)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SessionToken) and (self.bits, self.version) == (other.bits, other.version)
+
+    def __repr__(self) -> str:
+        return f"SessionToken({len(self)} played, version={self.version!r})"
@@ -0,0 +1,295 @@
+"""
+Sedna FM State Store
+- Versioned key/value storage for schedule state with compare-and-swap writes
+- Backends: local filesystem, SQLite, Azure Blob Storage (Azurite locally)
+- update() runs read-modify-write loops that are race-free across threads
+  and processes of one instance; only the Blob backend is race-free across
+  scaled-out Function App instances
+- "auto" uses Blob whenever a storage connection string is configured
+  (AzureWebJobsStorage on Azure); the deploy workflows run
+  benchmarks/state_store_contention.py against Azurite first
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Any, Callable
+
+from telemetry import record_retries
+
+logger = logging.getLogger(__name__)
+
+
+# "file", "sqlite", "blob" or "auto" (= blob with a connection string, file otherwise)
+STATE_BACKEND = os.environ.get("SCHEDULE_STATE_BACKEND", "auto")
+
+
+def _default_state_dir() -> str:
+    """$HOME/data on Azure (persistent, like the onthisday cache), the temp dir elsewhere."""
+    if os.environ.get("WEBSITE_INSTANCE_ID") and os.environ.get("HOME"):
+        return os.path.join(os.environ["HOME"], "data", "sedna-state")
+    return os.path.join(tempfile.gettempdir(), "sedna-state")
+
+
+STATE_DIR = os.environ.get("SCHEDULE_STATE_DIR", _default_state_dir())
+STATE_SQLITE_PATH = os.environ.get("SCHEDULE_STATE_SQLITE_PATH", os.path.join(STATE_DIR, "state.db"))
+STATE_CONTAINER = os.environ.get("SCHEDULE_STATE_CONTAINER", "sedna-state")
+
+
+class VersionConflict(Exception):
+    """The stored version no longer matches the expected one."""
+
+
+class StateStore(ABC):
+    """Versioned key/value store with compare-and-swap writes.
+
+    Versions are opaque strings. put() with expected_version=None only
+    succeeds if the key does not exist yet. `shared` is True when every
+    Function App instance sees the same data with working CAS.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[Any, str] | None:
+        """Return (value, version), or None if the key doesn't exist."""
+
+    @abstractmethod
+    def put(self, key: str, value: Any, expected_version: str | None) -> str:
+        """Write value if the key is still at expected_version. Returns the new version."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key; a missing key is not an error."""
+
+    def update(self, key: str, fn: Callable[[Any], Any], retries: int = 10) -> tuple[Any, bool]:
+        """Apply fn to the current value (None if missing) and store the result.
+
+        fn may be called several times if other writers get in between, so it
+        must not have side effects. Returning the value unchanged (or None)
+        skips the write.
+
+        Returns:
+            (value, written): the value now stored and whether this call wrote it
+        """
+        for attempt in range(retries):
+            current = self.get(key)
+            value, version = current if current is not None else (None, None)
+            new_value = fn(value)
+            if new_value is None or new_value == value:
+                record_retries("state_store", attempt)
+                return value, False
+            try:
+                self.put(key, new_value, version)
+                record_retries("state_store", attempt)
+                return new_value, True
+            except VersionConflict:
+                continue
+        raise VersionConflict(f"Gave up updating '{key}' after {retries} conflicting writes")
+
+    def replace(self, key: str, value: Any) -> None:
+        """Overwrite a key regardless of its current version."""
+        self.update(key, lambda _: value)
+
+
+class FileStateStore(StateStore):
+    """One JSON file per key holding {"version", "value"}.
+
+    Writes take an exclusive lock on a sidecar lock file (flock), so CAS is
+    safe across processes on the same machine. flock is not reliable on the
+    SMB share behind $HOME on Azure, so this is not race-free across instances.
+    """
+
+    def __init__(self, directory: str = STATE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace("/", "__") + ".json")
+
+    def _read(self, path: str) -> dict[str, Any] | None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get(self, key: str) -> tuple[Any, str] | None:
+        entry = self._read(self._path(key))
+        return (entry["value"], str(entry["version"])) if entry is not None else None
+
+    def put(self, key: str, value: Any, expected_version: str | None) -> str:
+        path = self._path(key)
+        with self._lock, open(path + ".lock", "a") as lock_file:
+            try:
+                import fcntl
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except ImportError:
+                # No flock (Windows): still safe across threads of this process
+                pass
+
+            entry = self._read(path)
+            current = str(entry["version"]) if entry is not None else None
+            if current != expected_version:
+                raise VersionConflict(f"'{key}' is at version {current}, expected {expected_version}")
+
+            version = (entry["version"] if entry is not None else 0) + 1
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": version, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return str(version)
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        with self._lock, open(path + ".lock", "a") as lock_file:
+            try:
+                import fcntl
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except ImportError:
+                pass
+            # The lock file stays: removing it would race with a writer waiting on it
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class SQLiteStateStore(StateStore):
+    """Rows of (key, version, value) in a SQLite database; CAS via conditional UPDATE."""
+
+    def __init__(self, path: str = STATE_SQLITE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as db, db:
+            db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, version INTEGER NOT NULL, value TEXT NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """A new connection; callers close it (closing()) and use it as a transaction (with db)."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> tuple[Any, str] | None:
+        with closing(self._connect()) as db, db:
+            row = db.execute("SELECT value, version FROM state WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), str(row[1])) if row is not None else None
+
+    def put(self, key: str, value: Any, expected_version: str | None) -> str:
+        data = json.dumps(value, ensure_ascii=False)
+        with closing(self._connect()) as db, db:
+            if expected_version is None:
+                try:
+                    db.execute("INSERT INTO state (key, version, value) VALUES (?, 1, ?)", (key, data))
+                except sqlite3.IntegrityError:
+                    raise VersionConflict(f"'{key}' already exists")
+                return "1"
+            updated = db.execute(
+                "UPDATE state SET version = version + 1, value = ? WHERE key = ? AND version = ?",
+                (data, key, int(expected_version)),
+            ).rowcount
+            if updated == 0:
+                raise VersionConflict(f"'{key}' is no longer at version {expected_version}")
+            return str(int(expected_version) + 1)
+
+    def delete(self, key: str) -> None:
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM state WHERE key = ?", (key,))
+
+
+class BlobStateStore(StateStore):
+    """One blob per key; the blob ETag is the version (If-Match / If-None-Match: *).
+
+    Needs the azure-storage-blob package. Use "UseDevelopmentStorage=true"
+    as the connection string to run against Azurite.
+    """
+
+    shared = True
+
+    def __init__(self, connection_string: str, container: str = STATE_CONTAINER):
+        from azure.core.exceptions import ResourceExistsError
+        from azure.storage.blob import BlobServiceClient
+
+        self._container = BlobServiceClient.from_connection_string(connection_string).get_container_client(container)
+        try:
+            self._container.create_container()
+        except ResourceExistsError:
+            pass
+
+    def get(self, key: str) -> tuple[Any, str] | None:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            downloader = self._container.get_blob_client(f"{key}.json").download_blob()
+        except ResourceNotFoundError:
+            return None
+        return json.loads(downloader.readall()), downloader.properties.etag
+
+    def put(self, key: str, value: Any, expected_version: str | None) -> str:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+
+        blob = self._container.get_blob_client(f"{key}.json")
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            if expected_version is None:
+                result = blob.upload_blob(data, overwrite=False)
+            else:
+                result = blob.upload_blob(
+                    data, overwrite=True, etag=expected_version, match_condition=MatchConditions.IfNotModified
+                )
+        except (ResourceExistsError, ResourceModifiedError, ResourceNotFoundError) as e:
+            raise VersionConflict(f"'{key}' changed concurrently: {e}")
+        return result["etag"]
+
+    def delete(self, key: str) -> None:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            self._container.get_blob_client(f"{key}.json").delete_blob()
+        except ResourceNotFoundError:
+            pass
+
+
+_store: StateStore | None = None
+_store_lock = threading.Lock()
+
+
+def _blob_sdk_available() -> bool:
+    try:
+        import azure.storage.blob  # noqa: F401
+    except ImportError:
+        logger.warning("azure-storage-blob is not installed; schedule state falls back to local files")
+        return False
+    return True
+
+
+def build_state_store(backend: str = STATE_BACKEND) -> StateStore:
+    """Create the configured backend ("file", "sqlite", "blob" or "auto")."""
+    connection_string = os.environ.get("SCHEDULE_STATE_CONNECTION_STRING", os.environ.get("AzureWebJobsStorage"))
+    if backend == "auto":
+        backend = "blob" if connection_string and _blob_sdk_available() else "file"
+
+    if backend == "blob":
+        if not connection_string:
+            raise ValueError("SCHEDULE_STATE_BACKEND=blob needs SCHEDULE_STATE_CONNECTION_STRING or AzureWebJobsStorage")
+        return BlobStateStore(connection_string)
+    if backend == "sqlite":
+        return SQLiteStateStore()
+    if backend == "file":
+        return FileStateStore()
+    raise ValueError(f"Unknown SCHEDULE_STATE_BACKEND '{backend}'")
+
+
+def get_state_store() -> StateStore:
+    """Return the worker's state store (created on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = build_state_store()
+            logger.info(f"Using {type(_store).__name__} for schedule state")
+        return _store
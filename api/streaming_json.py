@@ -0,0 +1,70 @@
+"""
+Sedna FM Streaming JSON
+- Incremental parser for a streamed top-level JSON array
+- Yields each element as soon as its closing brace arrives
+"""
+
+import json
+from typing import Any
+
+
+class JSONArrayStreamParser:
+    """Parse `[{...}, {...}, ...]` from text chunks as they arrive.
+
+    Anything before the opening bracket (e.g. a ```json fence) is skipped.
+    Complete elements are returned from feed(); a truncated trailing element
+    is simply never returned, so everything parsed before a cut-off is kept.
+    Malformed elements are skipped and counted in `errors`.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.errors = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element: list[str] = []
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume a chunk of text and return the elements completed by it."""
+        completed = []
+        for ch in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                if ch == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._depth == 1:
+                if ch in "{[":
+                    self._element = [ch]
+                    self._depth = 2
+                elif ch == "]":
+                    self.finished = True
+                continue
+
+            self._element.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    try:
+                        completed.append(json.loads("".join(self._element)))
+                    except json.JSONDecodeError:
+                        # Skip a malformed element but keep parsing the rest
+                        self.errors += 1
+                    self._element = []
+        return completed
@@ -0,0 +1,118 @@
+"""
+Sedna FM Structured Output
+- JSON schemas for the model's answers (mood picks, daily matches, hourly
+  schedules), sent as `response_format` so the output is schema-constrained
+- Tolerant parsing: code fences and surrounding text are ignored, and a
+  damaged array response still yields every complete entry
+- Validation of daily matches, so callers keep the good hours and only
+  regenerate the missing ones
+"""
+
+import json
+import os
+import re
+from typing import Any, Container
+
+from streaming_json import JSONArrayStreamParser
+
+
+# Send response_format JSON schemas (off for deployments without structured outputs)
+STRUCTURED_OUTPUTS = os.environ.get("LLM_STRUCTURED_OUTPUTS", "true").lower() == "true"
+
+
+class InvalidModelOutput(ValueError):
+    """The model answered, but nothing usable could be parsed from it."""
+
+
+def _object(properties: dict[str, Any]) -> dict[str, Any]:
+    """Strict-mode object schema: every property required, nothing else allowed."""
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+MOOD_SCHEMA = _object({
+    "episode_id": {"type": "integer"},
+    "reason": {"type": "string"},
+})
+
+# Pool refills and playlists: several picks under "recommendations"
+MOOD_LIST_SCHEMA = _object({
+    "recommendations": {"type": "array", "items": MOOD_SCHEMA},
+})
+
+_MATCH_PROPERTIES = {
+    "fact_text": {"type": "string"},
+    "fact_year": {"type": "integer"},
+    "fact_wikipedia_url": {"type": "string"},
+    "episode": _object({"id": {"type": "integer"}, "title": {"type": "string"}}),
+    "match_reason": {"type": "string"},
+}
+
+MATCH_SCHEMA = _object(_MATCH_PROPERTIES)
+
+# Batch schedules: the hourly matches under "matches" (schemas need an object root)
+SCHEDULE_SCHEMA = _object({
+    "matches": {"type": "array", "items": _object({"hour": {"type": "integer"}, **_MATCH_PROPERTIES})},
+})
+
+
+def structured_output(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+    """Keyword arguments for chat.completions.create constraining the output to a schema."""
+    if not STRUCTURED_OUTPUTS:
+        return {}
+    return {"response_format": {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}}
+
+
+def extract_json(text: str) -> Any:
+    """Parse the first JSON value in a model response, ignoring fences and surrounding text.
+
+    Raises ValueError when there is no parseable JSON value.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON in model response")
+    value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+    return value
+
+
+def salvage_entries(text: str, key: str) -> tuple[list[Any], bool]:
+    """Entries of an array response, bare or under `key`.
+
+    Returns (entries, intact). A response that doesn't parse as a whole is
+    scanned for its array, keeping every complete, well-formed element.
+    """
+    try:
+        value = extract_json(text)
+    except ValueError:
+        return JSONArrayStreamParser().feed(text), False
+    if isinstance(value, dict) and isinstance(value.get(key), list):
+        return value[key], True
+    if isinstance(value, list):
+        return value, True
+    # A single entry where a list was expected
+    return ([value], True) if isinstance(value, dict) else ([], False)
+
+
+def salvage_int_field(text: str, field: str) -> int | None:
+    """Last resort for a damaged object: the integer value of `field`, if it appears."""
+    found = re.search(rf'"{re.escape(field)}"\s*:\s*(-?\d+)', text)
+    return int(found.group(1)) if found else None
+
+
+def valid_match(match: Any, episode_ids: Container[int]) -> bool:
+    """A usable daily match: a fact text, a year, a Wikipedia URL field and a catalog episode."""
+    if not isinstance(match, dict):
+        return False
+    episode = match.get("episode")
+    return (
+        isinstance(match.get("fact_text"), str) and bool(match["fact_text"].strip())
+        and "fact_year" in match
+        and isinstance(match.get("fact_wikipedia_url", ""), str)
+        and isinstance(episode, dict) and episode.get("id") in episode_ids
+    )
+
+
+def parse_outcome(intact: bool, kept: int, requested: int) -> str:
+    """Classify a parsed response: "ok", "salvaged" (partly usable) or "failed"."""
+    if kept == 0:
+        return "failed"
+    return "ok" if intact and kept >= requested else "salvaged"
@@ -0,0 +1,178 @@
+"""
+Sedna FM Telemetry
+- OpenTelemetry spans around the pipeline stages (catalog load, Wikipedia
+  fetch, scoring, LLM call, JSON parse, GitHub commit)
+- Histograms for stage latency, prompt/completion/cached tokens and retries
+- Counters for model-response parse outcomes and salvaged/regenerated entries
+- Exported to Application Insights (azure-monitor-opentelemetry) or to the
+  console for local runs; everything is a no-op when OpenTelemetry is off
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+# auto = Application Insights when APPLICATIONINSIGHTS_CONNECTION_STRING is set, off otherwise
+TELEMETRY_EXPORTER = os.environ.get("TELEMETRY_EXPORTER", "auto")  # auto | azure | console | none
+CONSOLE_EXPORT_INTERVAL = float(os.environ.get("TELEMETRY_CONSOLE_INTERVAL_SECONDS", "60"))
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "sedna-fm-api")
+
+
+class Telemetry:
+    """Tracer and metric instruments. Without a meter every record is skipped."""
+
+    def __init__(self, tracer: Any = None, meter: Any = None, current_span: Any = None):
+        self.tracer = tracer
+        self.enabled = meter is not None
+        self.current_span = current_span
+        if meter is None:
+            return
+        self.duration = meter.create_histogram(
+            "sedna.stage.duration", unit="ms", description="Duration of a pipeline stage")
+        self.prompt_tokens = meter.create_histogram(
+            "sedna.llm.prompt_tokens", unit="{token}", description="Prompt tokens per model call")
+        self.completion_tokens = meter.create_histogram(
+            "sedna.llm.completion_tokens", unit="{token}", description="Completion tokens per model call")
+        self.cached_tokens = meter.create_histogram(
+            "sedna.llm.cached_tokens", unit="{token}", description="Prompt tokens served from the prompt cache")
+        self.retries = meter.create_histogram(
+            "sedna.retries", unit="{retry}", description="Retries per outbound call")
+        self.responses = meter.create_counter(
+            "sedna.llm.responses", unit="{response}", description="Model responses by parse outcome (ok, salvaged, failed)")
+        self.entries = meter.create_counter(
+            "sedna.llm.entries", unit="{entry}", description="Requested output entries by status (kept, missing, regenerated)")
+
+
+def _console_providers() -> None:
+    from opentelemetry import metrics, trace
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+    resource = Resource.create({"service.name": SERVICE_NAME})
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    trace.set_tracer_provider(tracer_provider)
+    reader = PeriodicExportingMetricReader(ConsoleMetricExporter(), export_interval_millis=CONSOLE_EXPORT_INTERVAL * 1000)
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[reader]))
+
+
+def build_telemetry(exporter: str = TELEMETRY_EXPORTER) -> Telemetry:
+    """Set up the configured exporter ("azure", "console", "none" or "auto")."""
+    connection_string = os.environ.get("APPLICATIONINSIGHTS_CONNECTION_STRING")
+    if exporter == "auto":
+        exporter = "azure" if connection_string else "none"
+    if exporter == "none":
+        return Telemetry()
+
+    try:
+        if exporter == "azure":
+            from azure.monitor.opentelemetry import configure_azure_monitor
+            configure_azure_monitor(connection_string=connection_string)
+        elif exporter == "console":
+            _console_providers()
+        else:
+            raise ValueError(f"Unknown TELEMETRY_EXPORTER '{exporter}'")
+        from opentelemetry import metrics, trace
+    except ImportError as e:
+        logger.warning(f"OpenTelemetry packages missing, telemetry disabled: {e}")
+        return Telemetry()
+
+    logger.info(f"Telemetry exporting to {exporter}")
+    return Telemetry(trace.get_tracer("sedna"), metrics.get_meter("sedna"), trace.get_current_span)
+
+
+_telemetry: Telemetry | None = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Return the worker's telemetry (exporters are set up on first use)."""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = build_telemetry()
+    return _telemetry
+
+
+@contextmanager
+def span(stage: str, **attributes: Any) -> Iterator[Any]:
+    """Trace a pipeline stage and record its duration in sedna.stage.duration.
+
+    Works around sync and async code alike; nested stages become child
+    spans. Yields the span (None when tracing is off).
+    """
+    telemetry = get_telemetry()
+    attributes = {k: v for k, v in attributes.items() if v is not None}
+    scope = telemetry.tracer.start_as_current_span(f"sedna.{stage}", attributes=attributes) if telemetry.tracer else nullcontext()
+    outcome = "ok"
+    start = time.perf_counter()
+    with scope as current:
+        try:
+            yield current
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if telemetry.enabled:
+                telemetry.duration.record(elapsed_ms, {"stage": stage, "outcome": outcome})
+            logger.debug(f"{stage} took {elapsed_ms:.0f} ms ({outcome})")
+
+
+def record_usage(operation: str, usage: Any) -> None:
+    """Record the prompt, completion and cached tokens of an OpenAI `usage` object."""
+    telemetry = get_telemetry()
+    if usage is None or not telemetry.enabled:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    tokens = {
+        "prompt": usage.prompt_tokens or 0,
+        "completion": usage.completion_tokens or 0,
+        "cached": getattr(details, "cached_tokens", 0) or 0,
+    }
+    attributes = {"operation": operation}
+    telemetry.prompt_tokens.record(tokens["prompt"], attributes)
+    telemetry.completion_tokens.record(tokens["completion"], attributes)
+    telemetry.cached_tokens.record(tokens["cached"], attributes)
+    current = telemetry.current_span()
+    for kind, value in tokens.items():
+        current.set_attribute(f"llm.{kind}_tokens", value)
+
+
+def record_retries(operation: str, retries: int) -> None:
+    """Record how many retries one outbound call needed (0 included, for the distribution)."""
+    telemetry = get_telemetry()
+    if telemetry.enabled:
+        telemetry.retries.record(retries, {"operation": operation})
+
+
+def record_parse(operation: str, outcome: str, requested: int, kept: int) -> None:
+    """Record how a model response parsed and how many of the requested entries were usable.
+
+    Parse failure rate is failed / all responses; salvage rate is salvaged /
+    (salvaged + failed).
+    """
+    telemetry = get_telemetry()
+    if not telemetry.enabled:
+        return
+    attributes = {"operation": operation}
+    telemetry.responses.add(1, {**attributes, "outcome": outcome})
+    telemetry.entries.add(kept, {**attributes, "status": "kept"})
+    telemetry.entries.add(max(requested - kept, 0), {**attributes, "status": "missing"})
+
+
+def record_regenerated(operation: str, entries: int) -> None:
+    """Record entries filled in by a follow-up generation."""
+    telemetry = get_telemetry()
+    if telemetry.enabled:
+        telemetry.entries.add(entries, {"operation": operation, "status": "regenerated"})
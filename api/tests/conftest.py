@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: the function app modules live flat in api/, run from there.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
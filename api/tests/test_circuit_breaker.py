@@ -0,0 +1,104 @@
+"""
+Tests for CircuitBreaker: opening, and every half-open path
+"""
+
+import pytest
+
+import fast_recommender
+from fast_recommender import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(fast_recommender.time, "monotonic", lambda: now[0])
+    return now
+
+
+def open_breaker(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", error_rate=0.5, min_calls=4, window=60, cooldown=30)
+    for ok in (True, False, True, False):
+        breaker.record(ok)
+    assert breaker.is_open
+    return breaker
+
+
+def test_opens_at_the_error_rate_with_enough_calls(clock):
+    breaker = CircuitBreaker("test", error_rate=0.5, min_calls=4)
+    for _ in range(3):
+        breaker.record(False)
+    assert not breaker.is_open  # fewer than min_calls
+    breaker.record(False)
+    assert breaker.is_open and not breaker.allow()
+
+
+def test_stays_closed_below_the_error_rate(clock):
+    breaker = CircuitBreaker("test", error_rate=0.5, min_calls=4)
+    for ok in (True, True, True, False, False):
+        breaker.record(ok)
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open
+
+
+def test_old_failures_leave_the_window(clock):
+    breaker = CircuitBreaker("test", error_rate=0.5, min_calls=4, window=60)
+    for _ in range(3):
+        breaker.record(False)
+    clock[0] += 61
+    breaker.record(False)
+    assert not breaker.is_open
+
+
+def test_no_trial_before_the_cooldown(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 29
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+    assert not breaker.allow()  # one trial at a time
+    breaker.record(True)
+    assert not breaker.is_open
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_for_another_cooldown(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.is_open
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_released_trial_lets_the_next_call_try(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.is_open
+    assert breaker.allow()
+    breaker.record(True)
+    assert not breaker.is_open
+
+
+def test_release_after_record_is_a_no_op(clock):
+    breaker = open_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(False)
+    breaker.release()
+    assert breaker.is_open and not breaker.allow()
+
+
+def test_release_while_closed_changes_nothing(clock):
+    breaker = CircuitBreaker("test")
+    breaker.release()
+    assert not breaker.is_open and breaker.allow()
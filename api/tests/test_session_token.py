@@ -0,0 +1,54 @@
+"""
+Tests for SessionToken encoding, growth and catalog restriction
+"""
+
+import pytest
+
+from session_token import MAX_EPISODE_ID, SessionToken
+
+
+def test_round_trip():
+    token = SessionToken.from_ids([0, 7, 8, 1000], version="abc123")
+    decoded = SessionToken.decode(token.encode())
+    assert decoded == token
+    assert decoded.ids() == [0, 7, 8, 1000]
+    assert decoded.version == "abc123"
+
+
+def test_empty_round_trip():
+    token = SessionToken(version="v")
+    assert SessionToken.decode(token.encode()) == token
+    assert not token and len(token) == 0
+
+
+def test_size_grows_with_the_highest_id_not_the_session_length():
+    few = SessionToken.from_ids([500])
+    many = SessionToken.from_ids(range(501))
+    assert len(few.encode()) == len(many.encode())
+    assert len(SessionToken.from_ids([5000]).encode()) > len(few.encode())
+
+
+def test_add_is_immutable_and_ignores_out_of_range_ids():
+    token = SessionToken.from_ids([1])
+    grown = token.add(2, -1, MAX_EPISODE_ID + 1, "3")
+    assert token.ids() == [1]
+    assert grown.ids() == [1, 2]
+    assert 2 in grown and -1 not in grown and MAX_EPISODE_ID + 1 not in grown
+
+
+def test_restrict_drops_ids_outside_the_catalog():
+    token = SessionToken.from_ids([1, 2, 9], version="old")
+    restricted = token.restrict(SessionToken.from_ids([1, 2, 3]).bits, "new")
+    assert restricted == SessionToken.from_ids([1, 2], version="new")
+
+
+@pytest.mark.parametrize("bad", ["", "s1", "s2.v.AQ", "s1.v.!!", "s1.v.A"])
+def test_malformed_tokens_are_rejected(bad):
+    with pytest.raises(ValueError):
+        SessionToken.decode(bad)
+
+
+def test_oversized_bitmap_is_rejected():
+    huge = SessionToken(1 << (MAX_EPISODE_ID + 8)).encode()
+    with pytest.raises(ValueError):
+        SessionToken.decode(huge)
@@ -0,0 +1,97 @@
+"""
+Tests for the state store compare-and-swap contract (file and SQLite backends)
+"""
+
+import threading
+
+import pytest
+
+from state_store import FileStateStore, SQLiteStateStore, VersionConflict, build_state_store
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileStateStore(str(tmp_path))
+    return SQLiteStateStore(str(tmp_path / "state.db"))
+
+
+def test_put_requires_the_current_version(store):
+    version = store.put("k", {"n": 1}, None)
+    with pytest.raises(VersionConflict):
+        store.put("k", {"n": 2}, None)
+    with pytest.raises(VersionConflict):
+        store.put("k", {"n": 2}, version + "0")
+    new_version = store.put("k", {"n": 2}, version)
+    with pytest.raises(VersionConflict):
+        store.put("k", {"n": 3}, version)
+    assert store.get("k") == ({"n": 2}, new_version)
+
+
+def test_delete_then_create_again(store):
+    store.put("k", 1, None)
+    store.delete("k")
+    store.delete("k")
+    assert store.get("k") is None
+    store.put("k", 2, None)
+    assert store.get("k")[0] == 2
+
+
+def test_update_retries_after_a_conflicting_write(store):
+    store.put("k", 0, None)
+    calls = []
+
+    def increment(value):
+        calls.append(value)
+        if len(calls) == 1:
+            # Another writer gets in between this read and our write
+            store.replace("k", 10)
+        return value + 1
+
+    assert store.update("k", increment) == (11, True)
+    assert calls == [0, 10]
+    assert store.get("k")[0] == 11
+
+
+def test_update_skips_the_write_when_unchanged(store):
+    store.put("k", 5, None)
+    version = store.get("k")[1]
+    assert store.update("k", lambda value: value) == (5, False)
+    assert store.update("k", lambda value: None) == (5, False)
+    assert store.get("k")[1] == version
+
+
+def test_update_gives_up_after_the_retries(store):
+    store.put("k", 0, None)
+
+    def always_conflict(value):
+        store.replace("k", value + 100)
+        return value + 1
+
+    with pytest.raises(VersionConflict):
+        store.update("k", always_conflict, retries=3)
+
+
+def test_concurrent_updates_lose_nothing(store):
+    store.put("k", [], None)
+
+    def append(worker):
+        for i in range(25):
+            store.update("k", lambda items: items + [f"{worker}-{i}"], retries=1000)
+
+    threads = [threading.Thread(target=append, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    items = store.get("k")[0]
+    assert len(items) == len(set(items)) == 100
+
+
+def test_auto_backend_without_a_connection_string_uses_files(monkeypatch):
+    monkeypatch.delenv("SCHEDULE_STATE_CONNECTION_STRING", raising=False)
+    monkeypatch.delenv("AzureWebJobsStorage", raising=False)
+    assert isinstance(build_state_store("auto"), FileStateStore)
+    with pytest.raises(ValueError):
+        build_state_store("blob")
+    assert not FileStateStore.shared and not SQLiteStateStore.shared
@@ -0,0 +1,64 @@
+"""
+Tests for JSONArrayStreamParser: chunk boundaries, escapes and truncation
+"""
+
+import json
+
+from streaming_json import JSONArrayStreamParser
+
+TRICKY = [
+    {"fact_text": 'He said "hi" and left', "hour": 0},
+    {"fact_text": "Braces {inside} [strings] stay text", "hour": 1},
+    {"fact_text": 'A backslash \\ then a quote \\"', "hour": 2},
+    {"nested": {"list": [1, {"x": "}"}]}, "hour": 3},
+]
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[JSONArrayStreamParser, list]:
+    parser = JSONArrayStreamParser()
+    elements = []
+    for i in range(0, len(text), size):
+        elements += parser.feed(text[i:i + size])
+    return parser, elements
+
+
+def test_every_chunk_size_yields_the_same_elements():
+    text = "```json\n" + json.dumps(TRICKY) + "\n```"
+    for size in range(1, 12):
+        parser, elements = feed_in_chunks(text, size)
+        assert elements == TRICKY, size
+        assert parser.finished and parser.errors == 0
+
+
+def test_escape_split_across_chunks():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"t": "a \\') == []
+    assert parser.feed('"} still in the string"}, ') == [{"t": 'a "} still in the string'}]
+    assert parser.feed('{"t": "b"}]') == [{"t": "b"}]
+
+
+def test_elements_are_returned_as_soon_as_they_close():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"hour": 0}, {"hour"') == [{"hour": 0}]
+    assert parser.feed(': 1}') == [{"hour": 1}]
+    assert not parser.finished
+
+
+def test_truncated_array_keeps_the_complete_elements():
+    text = json.dumps(TRICKY)
+    cut = text[:text.index('{"nested"') + 12]
+    parser, elements = feed_in_chunks(cut, 7)
+    assert elements == TRICKY[:3]
+    assert not parser.finished and parser.errors == 0
+
+
+def test_malformed_element_is_skipped():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}, {"b": tru}, {"c": 3}]') == [{"a": 1}, {"c": 3}]
+    assert parser.errors == 1
+
+
+def test_text_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}] trailing {"b": 2}') == [{"a": 1}]
+    assert parser.feed('{"c": 3}') == []
@@ -0,0 +1,60 @@
+"""
+Tests for model output parsing and salvage
+"""
+
+import json
+
+import pytest
+
+from structured_output import extract_json, parse_outcome, salvage_entries, salvage_int_field, valid_match
+
+MATCHES = [
+    {"hour": 0, "fact_text": 'Quote "inside" {braces}', "fact_year": 1969,
+     "fact_wikipedia_url": "https://en.wikipedia.org/wiki/Apollo_11", "episode": {"id": 3, "title": "A"}},
+    {"hour": 1, "fact_text": "Second", "fact_year": 1970,
+     "fact_wikipedia_url": "", "episode": {"id": 4, "title": "B"}},
+]
+
+
+def test_extract_json_ignores_fences_and_prose():
+    assert extract_json('Sure! ```json\n{"episode_id": 5}\n``` Enjoy') == {"episode_id": 5}
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+def test_salvage_entries_intact_object_or_bare_list():
+    assert salvage_entries(json.dumps({"matches": MATCHES}), "matches") == (MATCHES, True)
+    assert salvage_entries(json.dumps(MATCHES), "matches") == (MATCHES, True)
+    assert salvage_entries(json.dumps(MATCHES[0]), "matches") == ([MATCHES[0]], True)
+
+
+def test_salvage_entries_from_a_truncated_response():
+    text = json.dumps({"matches": MATCHES})
+    entries, intact = salvage_entries(text[:-20], "matches")
+    assert entries == MATCHES[:1]
+    assert not intact
+
+
+def test_salvage_entries_with_nothing_usable():
+    assert salvage_entries('{"matches": [{"hour": 0, "fact_te', "matches") == ([], False)
+    assert salvage_entries('"just a string"', "matches") == ([], False)
+
+
+def test_salvage_int_field_from_a_damaged_object():
+    assert salvage_int_field('{"reason": "cut \\"off", "episode_id": 42, "rea', "episode_id") == 42
+    assert salvage_int_field('{"episode_id": "x"}', "episode_id") is None
+
+
+def test_valid_match_needs_fact_year_url_and_a_catalog_episode():
+    assert valid_match(MATCHES[0], {3, 4})
+    assert not valid_match(MATCHES[0], {4})
+    assert not valid_match({**MATCHES[0], "fact_text": "  "}, {3})
+    assert not valid_match({k: v for k, v in MATCHES[0].items() if k != "fact_year"}, {3})
+    assert not valid_match("not a dict", {3})
+
+
+def test_parse_outcome():
+    assert parse_outcome(True, 24, 24) == "ok"
+    assert parse_outcome(True, 20, 24) == "salvaged"
+    assert parse_outcome(False, 24, 24) == "salvaged"
+    assert parse_outcome(True, 0, 24) == "failed"
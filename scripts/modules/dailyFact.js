@@ -6,6 +6,46 @@ let dailyFactEpisode = null;
 let dailyFactWidget = null;
 let isDailyFactPlaying = false;
 
+/**
+ * Replace a fact's episode id with the entry from the schedule's episode table
+ * @param {Object} schedule - Schedule with an `episodes` table keyed by id
+ * @param {Object} fact - Fact whose `episode` may be an id
+ * @returns {Object} The fact with a full episode object
+ */
+function expandFact(schedule, fact) {
+  if (!fact || typeof fact.episode === 'object') return fact;
+  const episode = schedule.episodes?.[String(fact.episode)];
+  return episode ? { ...fact, episode } : fact;
+}
+
+/**
+ * Pick the fact to show now from a time-indexed schedule (same rules as
+ * resolve_current_fact in api/schedule.py)
+ * @param {Object} schedule - Schedule with a `facts` array of UTC hour windows
+ * @param {Date} now - Current time
+ * @returns {Object|null} The current fact or null if the schedule is empty
+ */
+function resolveCurrentFact(schedule, now = new Date()) {
+  const facts = schedule.facts || [];
+  if (facts.length === 0) return null;
+
+  const today = now.toISOString().split('T')[0];
+  const date = schedule.date || today;
+  // Yesterday's schedule keeps its last fact until today's is committed
+  if (date < today) return expandFact(schedule, facts[facts.length - 1]);
+  if (date > today) return expandFact(schedule, facts[0]);
+
+  const hour = now.getUTCHours();
+  let current = facts[0];
+  for (const fact of facts) {
+    const start = fact.hour ?? 0;
+    const end = fact.end_hour ?? 24;
+    if (start <= hour) current = fact;
+    if (start <= hour && hour < end) return expandFact(schedule, fact);
+  }
+  return expandFact(schedule, current);
+}
+
 /**
  * Fetch the daily match data from the JSON file
  * @returns {Promise<Object|null>} The daily match data or null if failed
@@ -23,7 +63,17 @@ async function fetchDailyMatch() {
     
     const data = await response.json();
     
-    // Handle new schedule structure (current_fact) or legacy format
+    // Time-indexed schedule: pick the current fact from the clock
+    if (Array.isArray(data.facts)) {
+      const fact = resolveCurrentFact(data, now);
+      return fact ? {
+        ...fact,
+        date: data.date,
+        current_hour: now.getUTCHours()
+      } : null;
+    }
+    
+    // Handle queue-based schedule structure (current_fact) or legacy format
     if (data.current_fact) {
       // New hourly format - extract current fact and merge with metadata
       return {
@@ -266,4 +316,4 @@ export async function initDailyFact() {
 }
 
 // Export for use in main.js
-export { fetchDailyMatch, toggleDailyFactPlayPause };
+export { fetchDailyMatch, resolveCurrentFact, toggleDailyFactPlayPause };
@@ -3,16 +3,30 @@
 
 // Production branch - always use production API
 const API_URL = 'https://sedna-website-func-ch.azurewebsites.net/api/recommend';
+const PLAYLIST_API_URL = `${API_URL}/playlist`;
 
-// Session storage key for tracking played episodes
+// Episodes fetched ahead per playlist call; a new batch is requested once
+// no more than PREFETCH_LOW_WATER queued episodes are left
+const PREFETCH_LENGTH = 5;
+const PREFETCH_LOW_WATER = 1;
+
+// Session storage key for tracking played episodes (lists from older API versions)
 const SESSION_STORAGE_KEY = 'sedna_played_episodes';
 
+// Session storage key for the per-mood session tokens issued by the API
+const SESSION_TOKEN_KEY = 'sedna_session_tokens';
+
 // State
 let currentMoodEpisode = null;
 let moodWidget = null;
 let isMoodPlaying = false;
 let currentMood = null;
 
+// Prefetched playlist entries ({episode, reason}) waiting to be played, per mood
+const upcomingEpisodes = {};
+// In-flight playlist requests, per mood
+const prefetching = {};
+
 /**
  * Get played episodes from session storage
  * @returns {Object} - Object with mood keys and arrays of played episode IDs
@@ -78,17 +92,49 @@ function clearPlayedEpisodesForMood(mood) {
   savePlayedEpisodes(playedEpisodes);
 }
 
+/**
+ * Get the session token for a specific mood
+ * @param {string} mood - The mood category
+ * @returns {string|null} - The opaque token returned by the last recommendation
+ */
+function getSessionToken(mood) {
+  try {
+    const stored = sessionStorage.getItem(SESSION_TOKEN_KEY);
+    return (stored ? JSON.parse(stored) : {})[mood] || null;
+  } catch (e) {
+    console.warn('Error reading session storage:', e);
+    return null;
+  }
+}
+
+/**
+ * Save the session token for a specific mood
+ * @param {string} mood - The mood category
+ * @param {string} token - The token returned with the recommendation
+ */
+function saveSessionToken(mood, token) {
+  try {
+    const stored = sessionStorage.getItem(SESSION_TOKEN_KEY);
+    const tokens = stored ? JSON.parse(stored) : {};
+    tokens[mood] = token;
+    sessionStorage.setItem(SESSION_TOKEN_KEY, JSON.stringify(tokens));
+  } catch (e) {
+    console.warn('Error saving to session storage:', e);
+  }
+}
+
 /**
  * Request an episode recommendation based on mood
  * @param {string} mood - The selected mood
- * @param {number[]} excludeEpisodes - Array of episode IDs to exclude from recommendation
+ * @param {string|null} sessionToken - Token of the episodes already played for this mood
+ * @param {number[]} excludeEpisodes - Played episode IDs not yet folded into a token
  * @returns {Promise<Object>} - The recommended episode
  */
-async function getRecommendation(mood, excludeEpisodes = []) {
+async function getRecommendation(mood, sessionToken = null, excludeEpisodes = []) {
   // Capitalize first letter to match API expectations
   const capitalizedMood = mood.charAt(0).toUpperCase() + mood.slice(1).toLowerCase();
   
-  console.log(`[Mood] Requesting recommendation for "${capitalizedMood}" excluding episodes:`, excludeEpisodes);
+  console.log(`[Mood] Requesting recommendation for "${capitalizedMood}" (session: ${sessionToken ? 'yes' : 'new'}) excluding episodes:`, excludeEpisodes);
   
   const response = await fetch(API_URL, {
     method: 'POST',
@@ -97,6 +143,7 @@ async function getRecommendation(mood, excludeEpisodes = []) {
     },
     body: JSON.stringify({ 
       mood: capitalizedMood,
+      session: sessionToken,
       exclude: excludeEpisodes 
     }),
   });
@@ -110,6 +157,75 @@ async function getRecommendation(mood, excludeEpisodes = []) {
   return result;
 }
 
+/**
+ * Request an ordered playlist of episodes for a mood in one call
+ * @param {string} mood - The selected mood
+ * @param {string|null} sessionToken - Token of the episodes already played for this mood
+ * @param {number} length - Number of episodes
+ * @returns {Promise<Object>} - The playlist and the updated session token
+ */
+async function getPlaylist(mood, sessionToken = null, length = PREFETCH_LENGTH) {
+  const capitalizedMood = mood.charAt(0).toUpperCase() + mood.slice(1).toLowerCase();
+  
+  const response = await fetch(PLAYLIST_API_URL, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ 
+      mood: capitalizedMood,
+      length: length,
+      session: sessionToken
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status}`);
+  }
+
+  const result = await response.json();
+  console.log(`[Mood] Prefetched ${result.playlist?.length || 0} episodes for "${capitalizedMood}", Memory reset: ${result.memoryReset}`);
+  return result;
+}
+
+/**
+ * Fetch the next episodes for a mood in the background when the queue runs low
+ * @param {string} mood - The mood category
+ */
+function prefetchPlaylist(mood) {
+  const queue = upcomingEpisodes[mood] || [];
+  const token = getSessionToken(mood);
+  // Without a session token the API predates playlists, so there is nothing to prefetch
+  if (!token || prefetching[mood] || queue.length > PREFETCH_LOW_WATER) return;
+  
+  let stale = false;
+  prefetching[mood] = getPlaylist(mood, token)
+    .then((result) => {
+      // A recommendation fetched meanwhile moved the token on; this playlist could repeat its episode
+      stale = getSessionToken(mood) !== token;
+      if (!stale && result.playlist && result.session) {
+        // The token now covers the queued episodes too, so no call repeats them
+        saveSessionToken(mood, result.session);
+        upcomingEpisodes[mood] = [...(upcomingEpisodes[mood] || []), ...result.playlist];
+      }
+    })
+    .catch((error) => console.warn('Error prefetching playlist:', error))
+    .finally(() => {
+      delete prefetching[mood];
+      if (stale) prefetchPlaylist(mood);
+    });
+}
+
+/**
+ * Take the next prefetched episode for a mood; never waits for a prefetch in flight
+ * @param {string} mood - The mood category
+ * @returns {Object|null} - A {episode, reason} entry, or null when none is queued yet
+ */
+function takeUpcomingEpisode(mood) {
+  const queue = upcomingEpisodes[mood] || [];
+  return queue.length ? queue.shift() : null;
+}
+
 /**
  * Update the mood player UI with episode info
  * @param {Object} episode - The episode object
@@ -274,19 +390,28 @@ async function handleMoodClick(mood) {
   });
 
   try {
-    // Get list of already played episodes for this mood
-    const excludeEpisodes = getExcludedEpisodes(mood);
-    
-    const result = await getRecommendation(mood, excludeEpisodes);
+    // Play a prefetched episode when one is queued, otherwise ask the API right
+    // away (a playlist in flight can take up to its 20s deadline and keeps
+    // filling the queue). The session token carries the already played episodes
+    const upcoming = takeUpcomingEpisode(mood);
+    const result = upcoming
+      ? { ...upcoming, session: getSessionToken(mood) }
+      : await getRecommendation(mood, getSessionToken(mood), getExcludedEpisodes(mood));
     
     if (result.episode) {
       currentMoodEpisode = result.episode;
       
-      // Track this episode as played for the current mood
-      addPlayedEpisode(mood, result.episode.id);
+      if (result.session) {
+        // The new token includes this episode (and any memory reset)
+        saveSessionToken(mood, result.session);
+        clearPlayedEpisodesForMood(mood);
+      } else {
+        // Older API without session tokens: track the played list ourselves
+        addPlayedEpisode(mood, result.episode.id);
+      }
       
       // Check if memory was reset (all episodes played)
-      if (result.memoryReset) {
+      if (result.memoryReset && !result.session) {
         clearPlayedEpisodesForMood(mood);
         // Re-add the current episode since it's now playing
         addPlayedEpisode(mood, result.episode.id);
@@ -297,6 +422,9 @@ async function handleMoodClick(mood) {
       
       // Embed the SoundCloud player with auto-play enabled
       embedMoodPlayer(result.episode.soundcloudUrl, true);
+      
+      // Queue up the next episodes so "next" doesn't wait for the API
+      prefetchPlaylist(mood);
     } else {
       throw new Error('No episode returned');
     }
@@ -352,5 +480,6 @@ export {
   handleMoodClick,
   handleNextClick,
   toggleMoodPlayPause,
-  getRecommendation
+  getRecommendation,
+  getPlaylist
 };